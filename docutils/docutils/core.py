@@ -15,15 +15,25 @@ from __future__ import print_function
 
 __docformat__ = 'reStructuredText'
 
+import os
 import sys
 import pprint
 from docutils import __version__, __version_details__, SettingsSpec
+from docutils import ApplicationError
 from docutils import frontend, io, utils, readers, writers
 from docutils.frontend import OptionParser
 from docutils.transforms import Transformer
 from docutils.utils.error_reporting import ErrorOutput, ErrorString
+from docutils.utils import binary_doctree
+from docutils.utils.doctree_cache import DoctreeCache
+from docutils.utils.stage_profile import StageProfiler
 import docutils.readers.doctree
 
+
+class PublishCancelled(ApplicationError):
+    """Processing stopped because `Publisher.cancel_event` was set."""
+
+
 class Publisher(object):
 
     """
@@ -72,9 +82,21 @@ class Publisher(object):
         self.destination_class = destination_class
         """The class for dynamically created destination objects."""
 
+        if isinstance(settings, frontend.FrozenValues):
+            settings = settings.copy()
         self.settings = settings
         """An object containing Docutils settings as instance attributes.
-        Set by `self.process_command_line()` or `self.get_settings()`."""
+        Set by `self.process_command_line()` or `self.get_settings()`.
+        A `frontend.FrozenValues` object passed as `settings` is copied."""
+
+        self.profiler = None
+        """A `docutils.utils.stage_profile.StageProfiler` measuring the
+        processing stages, or None.  Set by `self.set_profiler()`."""
+
+        self.cancel_event = None
+        """A `threading.Event` or None.  Once the event is set, processing
+        stops before the next stage (reading, transforms, writing) with
+        `PublishCancelled`."""
 
         self._stderr = ErrorOutput()
 
@@ -99,9 +121,8 @@ class Publisher(object):
         if self.writer is None:
             self.set_writer(writer_name)
 
-    def setup_option_parser(self, usage=None, description=None,
-                            settings_spec=None, config_section=None,
-                            **defaults):
+    def settings_components(self, settings_spec=None, config_section=None):
+        """Return the components contributing settings specifications."""
         if config_section:
             if not settings_spec:
                 settings_spec = SettingsSpec()
@@ -110,8 +131,14 @@ class Publisher(object):
             if len(parts) > 1 and parts[-1] == 'application':
                 settings_spec.config_section_dependencies = ['applications']
         #@@@ Add self.source & self.destination to components in future?
+        return (self.parser, self.reader, self.writer, settings_spec)
+
+    def setup_option_parser(self, usage=None, description=None,
+                            settings_spec=None, config_section=None,
+                            **defaults):
         option_parser = OptionParser(
-            components=(self.parser, self.reader, self.writer, settings_spec),
+            components=self.settings_components(settings_spec,
+                                                config_section),
             defaults=defaults, read_config_files=True,
             usage=usage, description=description)
         return option_parser
@@ -133,13 +160,20 @@ class Publisher(object):
     def process_programmatic_settings(self, settings_spec,
                                       settings_overrides,
                                       config_section):
+        """
+        Set default settings (overrides in `settings_overrides` dict),
+        unless `self.settings` is already set.
+
+        The option parser and the configuration file settings are cached
+        per set of components (see `frontend.get_component_settings`).
+        """
         if self.settings is None:
             defaults = (settings_overrides or {}).copy()
             # Propagate exceptions by default when used programmatically:
             defaults.setdefault('traceback', True)
-            self.get_settings(settings_spec=settings_spec,
-                              config_section=config_section,
-                              **defaults)
+            component_settings = frontend.get_component_settings(
+                self.settings_components(settings_spec, config_section))
+            self.settings = component_settings.get_default_values(defaults)
 
     def process_command_line(self, argv=None, usage=None, description=None,
                              settings_spec=None, config_section=None,
@@ -197,8 +231,142 @@ class Publisher(object):
         self.document.transformer.populate_from_components(
             (self.source, self.reader, self.reader.parser, self.writer,
              self.destination))
+        self.document.transformer.profiler = self.profiler
         self.document.transformer.apply_transforms()
 
+    def read(self):
+        """Read the source into `self.document`."""
+        if self.profiler is None:
+            self.document = self.reader.read(self.source, self.parser,
+                                             self.settings)
+        else:
+            with self.profiler.stage('read',
+                                     name=component_name(self.reader)):
+                self.document = self.reader.read(self.source, self.parser,
+                                                 self.settings)
+
+    def check_cancelled(self):
+        """Raise `PublishCancelled` if `self.cancel_event` is set."""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise PublishCancelled('processing cancelled')
+
+    def set_profiler(self):
+        """
+        Set `self.profiler` if the "profile_stages" or "profile_stages_json"
+        setting is true (unless already set) and pass it to the writer.
+        """
+        if self.profiler is None and (
+            getattr(self.settings, 'profile_stages', None)
+            or getattr(self.settings, 'profile_stages_json', None)):
+            self.profiler = StageProfiler()
+        if self.profiler is not None:
+            self.writer.profiler = self.profiler
+            self.profiler.start()
+
+    def report_profile(self):
+        """
+        Write the records of `self.profiler` as JSON to the file given by
+        the "profile_stages_json" setting or as a table to the warning
+        stream.
+        """
+        if self.profiler is None:
+            return
+        self.profiler.stop()
+        json_path = getattr(self.settings, 'profile_stages_json', None)
+        if json_path:
+            f = open(json_path, 'w')
+            try:
+                f.write(self.profiler.as_json())
+            finally:
+                f.close()
+        else:
+            ErrorOutput(self.settings.warning_stream,
+                        self.settings.error_encoding,
+                        self.settings.error_encoding_error_handler
+                       ).write(self.profiler.report())
+
+    def get_doctree_cache(self):
+        """
+        Return a `DoctreeCache` for the "doctree_cache" setting or None, if
+        caching is disabled or `self.reader` rereads an existing document
+        tree.
+        """
+        directory = getattr(self.settings, 'doctree_cache', None)
+        if not directory or isinstance(self.reader, readers.ReReader):
+            return None
+        return DoctreeCache(directory,
+                            self.settings.doctree_cache_size * 2**20)
+
+    def read_cached(self, cache):
+        """
+        Get the document tree read from the source from `cache` or read it
+        (with the transforms of the source, reader, and parser) and store
+        it in `cache`.  Then load it through the `docutils.readers.doctree`
+        reader (with a fresh reporter and transformer) and apply the
+        writer's transforms.
+
+        A stored document tree is used if the source text, the content of
+        its dependencies, the values of the settings used while reading,
+        and the formats supported by the writer are unchanged (see
+        `read_variant()`).  Warnings reported while reading are stored
+        with the document tree and reported again.  Document trees that
+        cannot be serialized safely (e.g. containing local functions or
+        values that would be pickled) are used but not stored.
+
+        With a profiler, getting the document tree is measured as the
+        "read" stage.
+        """
+        if self.profiler is None:
+            source, reader = self.load_cached(cache)
+        else:
+            with self.profiler.stage('read', name='doctree cache'):
+                source, reader = self.load_cached(cache)
+        self.document.transformer.populate_from_components(
+            (source, reader, reader.parser, self.writer, self.destination))
+        self.document.transformer.profiler = self.profiler
+        self.document.transformer.apply_transforms()
+
+    def load_cached(self, cache):
+        """
+        Set `self.document` to the document tree from `cache` (see
+        `read_cached()`).  Return the source and reader used to load it.
+        """
+        text = self.source.read()
+        key = cache.key(__version__, __version_details__, sys.version,
+                        binary_doctree.FORMAT_VERSION,
+                        component_name(self.reader),
+                        component_name(self.reader.parser or self.parser),
+                        os.getcwd(), self.source.source_path,
+                        cache.text_digest(text))
+        variants = cache.get(key)
+        for variant in variants:
+            if variant_matches(variant, self.writer, self.settings, cache):
+                try:
+                    document = binary_doctree.loads(variant['document'],
+                                                    safe=True)
+                except Exception:       # unusable entry
+                    continue
+                break
+        else:
+            variant, document = read_variant(self, text, cache)
+            if variant['document'] is not None:
+                try:
+                    cache.put(key, [variant] + variants)
+                except (EnvironmentError,
+                        binary_doctree.SerializationError):
+                    pass                # caching is optional
+        self.settings.__dict__.update(
+            frontend.copy_list_settings(variant['changes']))
+        for path, digest in variant['dependencies']:
+            self.settings.record_dependencies.add(path)
+        source = io.DocTreeInput(document)
+        reader = docutils.readers.doctree.Reader(parser_name='null')
+        self.document = reader.read(source, None, self.settings)
+        if variant['warnings']:
+            self.document.reporter.stream.write(variant['warnings'])
+        self.document.reporter.max_level = variant['max_level']
+        return source, reader
+
     def publish(self, argv=None, usage=None, description=None,
                 settings_spec=None, settings_overrides=None,
                 config_section=None, enable_exit_status=False):
@@ -214,14 +382,25 @@ class Publisher(object):
                     argv, usage, description, settings_spec, config_section,
                     **(settings_overrides or {}))
             self.set_io()
-            self.document = self.reader.read(self.source, self.parser,
-                                             self.settings)
-            self.apply_transforms()
+            self.set_profiler()
+            self.check_cancelled()
+            cache = self.get_doctree_cache()
+            if cache is None:
+                self.read()
+                self.check_cancelled()
+                self.apply_transforms()
+            else:
+                self.read_cached(cache)
+            self.check_cancelled()
             output = self.writer.write(self.document, self.destination)
             self.writer.assemble_parts()
         except SystemExit as error:
             exit = 1
             exit_status = error.code
+        except PublishCancelled:
+            if self.profiler is not None:
+                self.profiler.stop()
+            raise
         except Exception as error:
             if not self.settings:       # exception too early to report nicely
                 raise
@@ -231,6 +410,7 @@ class Publisher(object):
             self.report_Exception(error)
             exit = True
             exit_status = 1
+        self.report_profile()
         self.debugging_dumps()
         if (enable_exit_status and self.document
             and (self.document.reporter.max_level
@@ -328,6 +508,13 @@ default_description = ('Reads from <source> (default is stdin) and writes to '
                        '<http://docutils.sf.net/docs/user/config.html> for '
                        'the full reference.')
 
+default_formats_usage = ('%prog [options] --writer=<writer>[:<file>] ... '
+                         '[<source>]')
+default_formats_description = (
+    'Reads from <source> (default is stdin) and writes the document with '
+    'every <writer> given with the "--writer" option.  See '
+    '<http://docutils.sf.net/docs/user/config.html> for the full reference.')
+
 def publish_cmdline(reader=None, reader_name='standalone',
                     parser=None, parser_name='restructuredtext',
                     writer=None, writer_name='pseudoxml',
@@ -521,6 +708,510 @@ def publish_from_doctree(document, destination_path=None,
     pub.set_destination(None, destination_path)
     return pub.publish(enable_exit_status=enable_exit_status)
 
+def validate_writer_destinations(setting, value, option_parser,
+                                 config_parser=None, config_section=None):
+    """
+    Split ``<writer>[:<file>]`` values into ``(writer, file)`` tuples
+    (`file` is None for "-" or if not given).  Configuration file values
+    are comma separated.
+    """
+    if not isinstance(value, list):
+        value = [item.strip() for item in value.split(',') if item.strip()]
+    destinations = []
+    for item in value:
+        if not isinstance(item, tuple):
+            writer_name, sep, path = item.partition(':')
+            if not writer_name:
+                raise ValueError('writer name missing in "%s"' % item)
+            item = (writer_name, path if path not in ('', '-') else None)
+        destinations.append(item)
+    return destinations
+
+class FormatsSettingsSpec(SettingsSpec):
+
+    """
+    Runtime settings and command-line options of `publish_cmdline_formats`.
+    """
+
+    settings_spec = (
+        'Multiple Output Formats Options',
+        None,
+        (('Write the document with <writer> to <file> (default: stdout).  '
+          'May be used more than once.',
+          ['--writer'],
+          {'metavar': '<writer>[:<file>]', 'action': 'append',
+           'dest': 'writers', 'validator': validate_writer_destinations}),
+         ('Number of worker processes writing in parallel.  '
+          'Default: 1 (write one format after another).',
+          ['--jobs', '-j'],
+          {'metavar': '<N>', 'type': 'int', 'default': 1,
+           'validator': frontend.validate_nonnegative_int}),))
+
+
+def publish_formats(source=None, source_path=None,
+                    source_class=io.StringInput,
+                    writers=('pseudoxml',), destination_paths=None,
+                    destination_class=io.StringOutput,
+                    reader=None, reader_name='standalone',
+                    parser=None, parser_name='restructuredtext',
+                    settings_spec=None, settings_overrides=None,
+                    config_section=None, enable_exit_status=False,
+                    processes=1):
+    """
+    Set up & run a `Publisher` for every writer in `writers`, reading and
+    parsing the source only once.  Return the list of outputs, in the
+    order of `writers`.
+
+    Settings are set up for every writer as usual.  The source is read,
+    parsed and transformed by the reader's and parser's transforms once
+    for all writers that agree on the settings used while reading (see
+    `read_formats`).  Every writer works on a copy of the resulting
+    document tree (see `copy_documents`), applies its own transforms and
+    writes it.  If a document tree cannot be serialized, the source is
+    read again for every writer that needs a copy.
+
+    Parameters: see `publish_programmatically` for the remainder.
+
+    - `writers`: Sequence of writer names or `docutils.writers.Writer`
+      instances.
+    - `destination_paths`: Sequence of destination paths, one per writer
+      (default: None for every writer).
+    - `processes`: Number of worker processes writing in parallel.  The
+      document trees are serialized with `docutils.utils.binary_doctree`,
+      the writers and their settings are pickled.
+      Default: 1 (write one after another in this process).
+    """
+    pub = Publisher(reader, parser, None, source_class=source_class)
+    pub.set_components(reader_name, parser_name, 'null')
+    writer_settings = []
+    for writer in writers:
+        writer_pub = writer_publisher(pub, writer)
+        writer_pub.process_programmatic_settings(
+            settings_spec, settings_overrides, config_section)
+        writer_settings.append((writer_pub.writer, writer_pub.settings))
+    return publish_writers(pub, source, source_path, writer_settings,
+                           destination_paths, destination_class, processes,
+                           enable_exit_status)
+
+def publish_cmdline_formats(reader=None, reader_name='standalone',
+                            parser=None, parser_name='restructuredtext',
+                            settings_spec=None, settings_overrides=None,
+                            config_section=None, enable_exit_status=True,
+                            argv=None, usage=default_formats_usage,
+                            description=default_formats_description):
+    """
+    Set up & run `publish_formats` for command-line-based file I/O.  The
+    input file path and the writers with their output file paths are
+    taken from the command line.  Return the list of outputs.
+
+    Only general, reader and parser settings are available as command
+    line options; writer settings are taken from configuration files.
+    Settings from the command line override configuration file settings
+    for every writer.
+
+    Parameters: see `publish_programmatically` and `publish_cmdline`.
+    """
+    pub = Publisher(reader, parser, None)
+    pub.set_components(reader_name, parser_name, 'null')
+    option_parser = OptionParser(
+        components=(pub.settings_components(settings_spec, config_section)
+                    + (FormatsSettingsSpec,)),
+        defaults=settings_overrides, read_config_files=True,
+        usage=usage, description=description)
+    if argv is None:
+        argv = sys.argv[1:]
+        # converting to Unicode (Python 3 does this automatically):
+        if sys.version_info < (3, 0):
+            argv_encoding = (frontend.locale_encoding or 'ascii')
+            argv = [a.decode(argv_encoding) for a in argv]
+    defaults = option_parser.get_default_values()
+    settings = option_parser.parse_args(argv)
+    if settings._destination:
+        option_parser.error('Use the "--writer" option to specify '
+                            'destinations.')
+    if not settings.writers:
+        option_parser.error('Specify at least one writer ("--writer").')
+    # Settings given on the command line:
+    command_line_settings = dict(
+        (name, value) for (name, value) in settings.__dict__.items()
+        if getattr(defaults, name, None) != value)
+    writer_settings = []
+    destination_paths = []
+    for writer_name, destination_path in settings.writers:
+        writer_pub = writer_publisher(pub, writer_name)
+        writer_pub.process_programmatic_settings(
+            settings_spec, settings_overrides, config_section)
+        writer_pub.settings.__dict__.update(
+            frontend.copy_list_settings(command_line_settings))
+        writer_settings.append((writer_pub.writer, writer_pub.settings))
+        destination_paths.append(destination_path)
+    try:
+        return publish_writers(pub, None, settings._source, writer_settings,
+                               destination_paths, io.FileOutput,
+                               settings.jobs, enable_exit_status)
+    finally:
+        if settings.record_dependencies.file is not None:
+            settings.record_dependencies.close()
+
+def writer_publisher(pub, writer):
+    """
+    Return a `Publisher` with the reader and parser of `pub` and `writer`
+    (a writer name or `docutils.writers.Writer` instance), used to set up
+    the writer's settings.
+    """
+    if isinstance(writer, writers.Writer):
+        return Publisher(pub.reader, pub.parser, writer)
+    writer_pub = Publisher(pub.reader, pub.parser, None)
+    writer_pub.set_writer(writer)
+    return writer_pub
+
+def publish_writers(pub, source, source_path, writer_settings,
+                    destination_paths, destination_class, processes,
+                    enable_exit_status):
+    """
+    Read the source with the reader and parser of `pub`, then write it for
+    every ``(writer, settings)`` pair in `writer_settings` (see
+    `publish_formats`).  Return the list of outputs.
+    """
+    if not writer_settings:
+        return []
+    if destination_paths is None:
+        destination_paths = [None] * len(writer_settings)
+    pub.settings = writer_settings[0][1]
+    pub.set_source(source, source_path)
+    text = pub.source.read()
+    documents = read_formats(pub, writer_settings, text)
+    max_level = max([document.reporter.max_level for document in documents])
+    parallel = processes > 1 and len(writer_settings) > 1
+    try:
+        copies = copy_documents(documents, parallel)
+    except binary_doctree.SerializationError:
+        # Write in this process and read the source again for every
+        # writer that needs a copy of a document tree:
+        parallel = False
+        copies = list(documents)
+        for i, (writer, settings) in enumerate(writer_settings):
+            if documents[i] in documents[i+1:]:
+                read_settings = frontend.Values(settings.__dict__)
+                read_settings.record_dependencies = utils.DependencyList()
+                read_settings.warning_stream = False    # reported already
+                copies[i] = read_formats(pub, [(writer, read_settings)],
+                                         text)[0]
+    jobs = []
+    dependency_lists = []
+    # The document settings are replaced by the writers' settings:
+    for (writer, settings), document, destination_path in zip(
+        writer_settings, copies, destination_paths):
+        # Dependencies are recorded by the job and added afterwards:
+        dependency_lists.append(settings.record_dependencies)
+        settings.record_dependencies = utils.DependencyList()
+        jobs.append((document, writer, settings,
+                     destination_class, destination_path))
+    if parallel:
+        import multiprocessing
+        pool = multiprocessing.Pool(min(processes, len(jobs)))
+        try:
+            results = pool.map(write_doctree_job, jobs)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [write_doctree_job(job) for job in jobs]
+    outputs = []
+    for (output, level, dependencies, exit_status), dependency_list in zip(
+        results, dependency_lists):
+        for path in dependencies:
+            dependency_list.add(path)
+        if exit_status is not None:
+            sys.exit(exit_status)
+        max_level = max(max_level, level)
+        outputs.append(output)
+    if (enable_exit_status
+        and max_level >= writer_settings[0][1].exit_status_level):
+        sys.exit(max_level + 10)
+    return outputs
+
+def copy_documents(documents, parallel):
+    """
+    Return the list of document trees for the write jobs of `documents`
+    (see `publish_writers`).
+
+    Document trees sent to worker processes (if `parallel` is true) are
+    serialized, as are the trees shared by several jobs, except for the
+    last job, which gets the original.  Serializing may raise
+    `binary_doctree.SerializationError`.
+    """
+    serialized = {}
+    copies = []
+    for i, document in enumerate(documents):
+        if parallel or document in documents[i+1:]:
+            if id(document) not in serialized:
+                serialized[id(document)] = binary_doctree.dumps(document)
+            copies.append(serialized[id(document)])
+        else:
+            copies.append(document)
+    return copies
+
+def read_formats(pub, writer_settings, text=None):
+    """
+    Read the source of `pub` (or `text`, the source text already read) for
+    every ``(writer, settings)`` pair in `writer_settings`.  Return the
+    list of the document trees (some may be the same object).
+
+    The source is read once for the first pair, with a `RecordingWriter`
+    in place of the writer and `RecordingValues` settings.  Pairs that
+    agree on the formats supported and on the values of the settings used
+    while reading share the document tree.  The remaining pairs are
+    handled the same way.  Settings changed while reading (e.g. by the
+    `transforms.parts.SectNum` transform) are updated in all settings
+    sharing the document tree.
+    """
+    if text is None:
+        text = pub.source.read()
+    source_path = pub.source.source_path
+    documents = [None] * len(writer_settings)
+    for i, (writer, settings) in enumerate(writer_settings):
+        if documents[i] is not None:
+            continue
+        read_settings = RecordingValues(
+            frontend.copy_list_settings(settings.__dict__))
+        read_settings.record_dependencies = utils.DependencyList()
+        read_writer = RecordingWriter(writer)
+        read_pub = Publisher(
+            pub.reader, pub.parser, read_writer, settings=read_settings,
+            source=io.StringInput(text, source_path, encoding='unicode'),
+            destination=io.NullOutput())
+        read_pub.publish()
+        names = read_settings.recorded_names() - set(['record_dependencies'])
+        changes = {}
+        for name, value in read_settings.__dict__.items():
+            if (name not in ('_recorded', 'record_dependencies')
+                and settings.__dict__.get(name, read_formats) != value):
+                changes[name] = value
+        for j in range(i, len(writer_settings)):
+            other_writer, other = writer_settings[j]
+            if documents[j] is not None or not read_writer.agrees(
+                other_writer):
+                continue
+            for name in names:
+                if (other.__dict__.get(name, read_formats)
+                    != settings.__dict__.get(name, read_formats)):
+                    break
+            else:
+                documents[j] = read_pub.document
+                other.__dict__.update(frontend.copy_list_settings(changes))
+                for path in read_settings.record_dependencies.list:
+                    other.record_dependencies.add(path)
+    return documents
+
+def read_variant(pub, text, cache):
+    """
+    Read `text` (the source of `pub`) with the reader and parser of `pub`
+    and apply their transforms (see `Publisher.read_cached`).  Return a
+    ``(variant, document)`` tuple.
+
+    `variant` is a dictionary with the data required to check whether the
+    document tree can be reused (see `variant_matches`) and to use it:
+    the serialized document tree (None if it cannot be serialized), the
+    warnings reported, the maximal level of the system messages, the
+    settings changed, and the dependencies (with their digests).
+    """
+    warnings = WarningsRecorder()
+    read_settings = RecordingValues(
+        frontend.copy_list_settings(pub.settings.__dict__))
+    read_settings.record_dependencies = utils.DependencyList()
+    read_settings.warning_stream = warnings
+    read_settings.doctree_cache = None
+    read_settings.profile_stages = False
+    read_settings.profile_stages_json = None
+    read_writer = RecordingWriter(pub.writer)
+    read_pub = Publisher(
+        pub.reader, pub.parser, read_writer, settings=read_settings,
+        source=io.StringInput(text, pub.source.source_path,
+                              encoding='unicode'),
+        destination=io.NullOutput())
+    try:
+        read_pub.publish()
+    except:
+        # Report the warnings before exiting:
+        ErrorOutput(pub.settings.warning_stream, pub.settings.error_encoding,
+                    pub.settings.error_encoding_error_handler
+                   ).write(warnings.text())
+        raise
+    internal = ('record_dependencies', 'warning_stream', 'doctree_cache',
+                'profile_stages', 'profile_stages_json', 'include_cache_size')
+    names = read_settings.recorded_names() - set(internal)
+    values = {}
+    for name in names:
+        if hasattr(pub.settings, name):
+            values[name] = getattr(pub.settings, name)
+    changes = {}
+    for name, value in read_settings.__dict__.items():
+        if (name not in ('_recorded',) + internal
+            and pub.settings.__dict__.get(name, read_variant) != value):
+            changes[name] = value
+    document = read_pub.document
+    try:
+        data = binary_doctree.dumps(document, safe=True)
+    except binary_doctree.SerializationError:
+        data = None                     # use `document`, but do not cache it
+    variant = {'settings': values,
+               'unset': sorted(names - set(values)),
+               'queries': read_writer.queries,
+               'resolvers': resolver_names(pub.writer),
+               'dependencies': [
+                   (path, cache.file_digest(path))
+                   for path in read_settings.record_dependencies.list],
+               'changes': changes,
+               'warnings': warnings.text(),
+               'max_level': document.reporter.max_level,
+               'document': data}
+    return variant, document
+
+def variant_matches(variant, writer, settings, cache):
+    """
+    Return True if the document tree of `variant` (see `read_variant`) can
+    be used with `writer` and `settings`.
+    """
+    for name, value in variant['settings'].items():
+        if not hasattr(settings, name) or getattr(settings, name) != value:
+            return False
+    for name in variant['unset']:
+        if hasattr(settings, name):
+            return False
+    if resolver_names(writer) != variant['resolvers']:
+        return False
+    for format, supported in variant['queries'].items():
+        if writer.supports(format) != supported:
+            return False
+    for path, digest in variant['dependencies']:
+        if cache.file_digest(path) != digest:
+            return False
+    return True
+
+def component_name(component):
+    """Return the qualified class name of `component`."""
+    return '%s.%s' % (component.__class__.__module__,
+                      component.__class__.__name__)
+
+def resolver_names(writer):
+    """Return the names of the unknown reference resolvers of `writer`."""
+    return ['%s.%s' % (getattr(resolver, '__module__', None),
+                       getattr(resolver, '__name__', resolver))
+            for resolver in writer.unknown_reference_resolvers]
+
+def write_doctree_job(job):
+    """
+    Write one copy of a document tree (see `publish_writers`).
+
+    `job` is a ``(data, writer, settings, destination_class,
+    destination_path)`` tuple; `data` is the serialized document tree (see
+    `docutils.utils.binary_doctree`) or the document tree itself.  Return a
+    ``(output, max_level, dependencies, exit_status)`` tuple: `max_level`
+    is the highest level of the system messages reported while writing,
+    `exit_status` is None unless publishing exited.
+    """
+    data, writer, settings, destination_class, destination_path = job
+    if isinstance(data, bytes):
+        document = binary_doctree.loads(data)
+    else:
+        document = data
+    pub = Publisher(docutils.readers.doctree.Reader(parser_name='null'),
+                    None, writer, source=io.DocTreeInput(document),
+                    destination_class=destination_class, settings=settings)
+    pub.set_destination(None, destination_path)
+    output = exit_status = None
+    try:
+        output = pub.publish()
+    except SystemExit as error:
+        exit_status = error.code
+    return (output, pub.document.reporter.max_level,
+            settings.record_dependencies.list, exit_status)
+
+
+class RecordingValues(frontend.Values, object):
+
+    """
+    Runtime settings recording the names of the settings used (see
+    `read_formats` and `read_variant`).
+    """
+
+    # (`object` is a base class for Python 2, where `optparse.Values` is
+    # an "old-style" class without support for `__getattribute__`.)
+
+    def __init__(self, *args, **kwargs):
+        self.__dict__['_recorded'] = set()
+        frontend.Values.__init__(self, *args, **kwargs)
+        # Start afresh (the defaults may stem from another instance):
+        self.__dict__['_recorded'] = set()
+
+    def __getattribute__(self, name):
+        if not name.startswith('__'):
+            object.__getattribute__(self, '_recorded').add(name)
+        return object.__getattribute__(self, name)
+
+    def recorded_names(self):
+        """Return the set of recorded names."""
+        return set(self.__dict__['_recorded'])
+
+
+class WarningsRecorder(object):
+
+    """
+    Stand-in for the warning stream while reading (see `read_variant`).
+    """
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(data)
+
+    def text(self):
+        """Return the text written so far."""
+        return u''.join(self.parts)
+
+
+class RecordingWriter(writers.UnfilteredWriter):
+
+    """
+    Stand-in for a writer while reading (see `read_formats` and
+    `read_variant`).
+
+    Answers `supports()` queries like `writer` (recording them) and
+    provides its unknown reference resolvers, but adds no transforms and
+    writes nothing.
+    """
+
+    def __init__(self, writer):
+        writers.UnfilteredWriter.__init__(self)
+        self.writer = writer
+        self.unknown_reference_resolvers = writer.unknown_reference_resolvers
+        self.queries = {}
+        """Mapping of queried formats to the answers of `writer`."""
+
+    def supports(self, format):
+        supported = self.writer.supports(format)
+        self.queries[format] = supported
+        return supported
+
+    def agrees(self, writer):
+        """
+        Return True if `writer` gives the same answers to the recorded
+        queries and has the same unknown reference resolvers.
+        """
+        if (writer.unknown_reference_resolvers
+            != self.unknown_reference_resolvers):
+            return False
+        for format, supported in self.queries.items():
+            if writer.supports(format) != supported:
+                return False
+        return True
+
+    def translate(self):
+        pass
+
+
 def publish_cmdline_to_binary(reader=None, reader_name='standalone',
                     parser=None, parser_name='restructuredtext',
                     writer=None, writer_name='pseudoxml',
@@ -554,6 +1245,36 @@ def publish_cmdline_to_binary(reader=None, reader_name='standalone',
         config_section=config_section, enable_exit_status=enable_exit_status)
     return output
 
+def frozen_settings(reader=None, reader_name='standalone',
+                    parser=None, parser_name='restructuredtext',
+                    writer=None, writer_name='pseudoxml',
+                    settings_spec=None, settings_overrides=None,
+                    config_section=None):
+    """
+    Return read-only runtime settings (a `frontend.FrozenValues` object)
+    for programmatic use.
+
+    Pass the result as `settings` to any number of ``publish_*`` calls
+    (with the same components) to skip the settings setup::
+
+        settings = frozen_settings(writer_name='html5',
+                                   settings_overrides={'output_encoding':
+                                                       'unicode'})
+        for source in sources:
+            output = publish_string(source, writer_name='html5',
+                                    settings=settings)
+
+    Each `Publisher` works with a copy of the frozen settings.  Changes to
+    configuration files are not picked up by existing frozen settings.
+
+    Parameters: see `publish_programmatically`.
+    """
+    pub = Publisher(reader, parser, writer)
+    pub.set_components(reader_name, parser_name, writer_name)
+    pub.process_programmatic_settings(
+        settings_spec, settings_overrides, config_section)
+    return pub.settings.freeze()
+
 def publish_programmatically(source_class, source, source_path,
                              destination_class, destination, destination_path,
                              reader, reader_name,
@@ -561,7 +1282,7 @@ def publish_programmatically(source_class, source, source_path,
                              writer, writer_name,
                              settings, settings_spec,
                              settings_overrides, config_section,
-                             enable_exit_status):
+                             enable_exit_status, cancel_event=None):
     """
     Set up & run a `Publisher` for custom programmatic use.  Return the
     encoded string output and the Publisher object.
@@ -653,10 +1374,14 @@ def publish_programmatically(source_class, source, source_path,
       defined by `settings_spec`.  Used only if no `settings` specified.
 
     * `enable_exit_status`: Boolean; enable exit status at end of processing?
+
+    * `cancel_event`: A `threading.Event` stopping the processing once set
+      (see `Publisher.cancel_event`).
     """
     pub = Publisher(reader, parser, writer, settings=settings,
                     source_class=source_class,
                     destination_class=destination_class)
+    pub.cancel_event = cancel_event
     pub.set_components(reader_name, parser_name, writer_name)
     pub.process_programmatic_settings(
         settings_spec, settings_overrides, config_section)
@@ -664,3 +1389,15 @@ def publish_programmatically(source_class, source, source_path,
     pub.set_destination(destination, destination_path)
     output = pub.publish(enable_exit_status=enable_exit_status)
     return output, pub
+
+
+_async_api = ('AsyncPublisher', 'publish_string_async',
+              'publish_parts_async', 'publish_doctree_async')
+"""Names of the `asyncio` publishing API, see `docutils.core_async`."""
+
+def __getattr__(name):
+    # Python >= 3.7: import the asyncio API only when used.
+    if name in _async_api:
+        from docutils import core_async
+        return getattr(core_async, name)
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
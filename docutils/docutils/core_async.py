@@ -0,0 +1,201 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Publishing from `asyncio` applications (Python >= 3.5).
+
+The ``publish_*`` convenience functions of `docutils.core` process a
+document in the calling thread: called from a coroutine, they block the
+event loop for the full render.  An `AsyncPublisher` runs them in a pool
+of worker threads instead and returns awaitable results::
+
+    publisher = AsyncPublisher(max_workers=4, timeout=10)
+    parts = await publisher.publish_parts(source, writer_name='html5')
+
+All blocking work happens in the worker threads: parsing, reading the
+files of the "include", "raw", and "csv-table" directives, running
+external math converters (`docutils.utils.math.tex2mathml_extern`), and
+writing.  At most `max_workers` documents are processed at the same
+time; further requests wait for a free worker.
+
+A request may be cancelled (e.g. with `asyncio.Task.cancel()`) or time
+out (`timeout` argument).  A request still waiting for a worker is
+dropped.  A document being processed stops before its next processing
+stage (reading, transforms, writing); its worker stays busy until then.
+
+Exceptions propagate to the awaiting coroutine: the "traceback" setting
+defaults to True, and `SystemExit` (e.g. from the "halt_level" setting
+with "traceback" off) is converted to `docutils.ApplicationError`.
+
+The functions `publish_string_async()`, `publish_parts_async()`, and
+`publish_doctree_async()` use a shared default `AsyncPublisher`.  They
+are also available from `docutils.core` (with Python >= 3.7).
+"""
+
+__docformat__ = 'reStructuredText'
+
+import asyncio
+import threading
+from concurrent import futures
+
+import docutils.core
+from docutils import ApplicationError, io
+
+
+class AsyncPublisher(object):
+
+    """
+    Run ``publish_*`` calls in a managed pool of worker threads (see the
+    module docstring).
+
+    Use it as an asynchronous context manager or call `shutdown()` to
+    stop the worker threads.
+    """
+
+    def __init__(self, max_workers=None, timeout=None):
+        self.executor = futures.ThreadPoolExecutor(max_workers)
+        """The pool of worker threads."""
+
+        self.timeout = timeout
+        """Default timeout in seconds (None: no timeout)."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def shutdown(self, wait=True):
+        """Stop the worker threads (pending requests are dropped)."""
+        self.executor.shutdown(wait=wait)
+
+    async def publish_programmatically(self, timeout=None, **kwargs):
+        """
+        Call `docutils.core.publish_programmatically()` with the keyword
+        arguments `kwargs` in a worker thread.  Return the encoded string
+        output and the Publisher object.
+
+        Raise `asyncio.TimeoutError` if the call does not finish in
+        `timeout` seconds (default: `self.timeout`).
+        """
+        if timeout is None:
+            timeout = self.timeout
+        overrides = dict(kwargs.get('settings_overrides') or {})
+        overrides.setdefault('traceback', True)
+        kwargs['settings_overrides'] = overrides
+        kwargs['enable_exit_status'] = False
+        kwargs['cancel_event'] = cancel_event = threading.Event()
+        loop = asyncio.get_event_loop()
+        future = loop.run_in_executor(self.executor, run_publisher, kwargs)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # Stop the processing in the worker thread:
+            cancel_event.set()
+            raise
+
+    async def publish_string(self, source, source_path=None,
+                             destination_path=None,
+                             reader=None, reader_name='standalone',
+                             parser=None, parser_name='restructuredtext',
+                             writer=None, writer_name='pseudoxml',
+                             settings=None, settings_spec=None,
+                             settings_overrides=None, config_section=None,
+                             timeout=None):
+        """
+        Asynchronous `docutils.core.publish_string()`: return the encoded
+        output.
+        """
+        output, pub = await self.publish_programmatically(
+            timeout, source_class=io.StringInput, source=source,
+            source_path=source_path,
+            destination_class=io.StringOutput,
+            destination=None, destination_path=destination_path,
+            reader=reader, reader_name=reader_name,
+            parser=parser, parser_name=parser_name,
+            writer=writer, writer_name=writer_name,
+            settings=settings, settings_spec=settings_spec,
+            settings_overrides=settings_overrides,
+            config_section=config_section)
+        return output
+
+    async def publish_parts(self, source, source_path=None,
+                            source_class=io.StringInput,
+                            destination_path=None,
+                            reader=None, reader_name='standalone',
+                            parser=None, parser_name='restructuredtext',
+                            writer=None, writer_name='pseudoxml',
+                            settings=None, settings_spec=None,
+                            settings_overrides=None, config_section=None,
+                            timeout=None):
+        """
+        Asynchronous `docutils.core.publish_parts()`: return a dictionary
+        of document parts.
+        """
+        output, pub = await self.publish_programmatically(
+            timeout, source=source, source_path=source_path,
+            source_class=source_class,
+            destination_class=io.StringOutput,
+            destination=None, destination_path=destination_path,
+            reader=reader, reader_name=reader_name,
+            parser=parser, parser_name=parser_name,
+            writer=writer, writer_name=writer_name,
+            settings=settings, settings_spec=settings_spec,
+            settings_overrides=settings_overrides,
+            config_section=config_section)
+        return pub.writer.parts
+
+    async def publish_doctree(self, source, source_path=None,
+                              source_class=io.StringInput,
+                              reader=None, reader_name='standalone',
+                              parser=None, parser_name='restructuredtext',
+                              settings=None, settings_spec=None,
+                              settings_overrides=None, config_section=None,
+                              timeout=None):
+        """
+        Asynchronous `docutils.core.publish_doctree()`: return the
+        document tree.
+        """
+        output, pub = await self.publish_programmatically(
+            timeout, source=source, source_path=source_path,
+            source_class=source_class,
+            destination_class=io.NullOutput,
+            destination=None, destination_path=None,
+            reader=reader, reader_name=reader_name,
+            parser=parser, parser_name=parser_name,
+            writer=None, writer_name='null',
+            settings=settings, settings_spec=settings_spec,
+            settings_overrides=settings_overrides,
+            config_section=config_section)
+        return pub.document
+
+
+def run_publisher(kwargs):
+    """Call `docutils.core.publish_programmatically()` (in a worker)."""
+    try:
+        return docutils.core.publish_programmatically(**kwargs)
+    except SystemExit as error:
+        raise ApplicationError('processing stopped (exit status %s)'
+                               % (error.code,))
+
+
+_default_publisher = None
+
+def default_publisher():
+    """Return the shared `AsyncPublisher` (created on first use)."""
+    global _default_publisher
+    if _default_publisher is None:
+        _default_publisher = AsyncPublisher()
+    return _default_publisher
+
+async def publish_string_async(source, **kwargs):
+    """`AsyncPublisher.publish_string()` of the default publisher."""
+    return await default_publisher().publish_string(source, **kwargs)
+
+async def publish_parts_async(source, **kwargs):
+    """`AsyncPublisher.publish_parts()` of the default publisher."""
+    return await default_publisher().publish_parts(source, **kwargs)
+
+async def publish_doctree_async(source, **kwargs):
+    """`AsyncPublisher.publish_doctree()` of the default publisher."""
+    return await default_publisher().publish_doctree(source, **kwargs)
@@ -11,6 +11,8 @@ Exports the following classes:
 * `Option`: Customized version of `optparse.Option`; validation support.
 * `Values`: Runtime settings; objects are simple structs
   (``object.attribute``).  Supports cumulative list settings (attributes).
+* `FrozenValues`: Read-only runtime settings, reusable for many runs.
+* `ComponentSettings`: Cached default settings for a set of components.
 * `ConfigParser`: Standard Docutils config file processing.
 
 Also exports the following functions:
@@ -25,6 +27,7 @@ Also exports the following functions:
   `validate_dependency_file`.
 * `make_paths_absolute`.
 * SettingSpec manipulation: `filter_settings_spec`.
+* Cached settings: `get_component_settings`, `clear_settings_cache`.
 """
 
 __docformat__ = 'reStructuredText'
@@ -35,6 +38,7 @@ import sys
 import warnings
 import codecs
 import optparse
+import threading
 from optparse import SUPPRESS_HELP
 if sys.version_info >= (3, 0):
     from configparser import RawConfigParser
@@ -333,6 +337,55 @@ class Values(optparse.Values):
         """Return a shallow copy of `self`."""
         return self.__class__(defaults=self.__dict__)
 
+    def freeze(self):
+        """Return a read-only `FrozenValues` copy of `self`."""
+        return FrozenValues(self.__dict__)
+
+
+class FrozenValues(Values):
+
+    """
+    Read-only runtime settings, to be shared by many publisher runs.
+
+    Settings cannot be changed; `copy()` returns a mutable `Values`
+    instance (with copies of the list settings) for a single run.
+    """
+
+    def __init__(self, defaults=None):
+        settings = copy_list_settings(defaults or {})
+        dependencies = settings.get('record_dependencies')
+        if (dependencies is None
+            or (isinstance(dependencies, docutils.utils.DependencyList)
+                and dependencies.file is None and not dependencies.list)):
+            # Let every copy set up its own dependency list:
+            settings['record_dependencies'] = None
+        self.__dict__.update(settings)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('cannot set "%s": settings are frozen' % name)
+
+    def __delattr__(self, name):
+        raise AttributeError('cannot delete "%s": settings are frozen' % name)
+
+    def _update_loose(self, dict):
+        raise AttributeError('cannot update frozen settings')
+
+    def copy(self):
+        """Return a mutable `Values` copy of `self`."""
+        return Values(defaults=copy_list_settings(self.__dict__))
+
+    def freeze(self):
+        return self
+
+
+def copy_list_settings(settings):
+    """Return a copy of the `settings` dict with copies of list values."""
+    settings = dict(settings)
+    for key, value in settings.items():
+        if isinstance(value, list):
+            settings[key] = list(value)
+    return settings
+
 
 class Option(optparse.Option):
 
@@ -540,6 +593,38 @@ class OptionParser(optparse.OptionParser, docutils.SettingsSpec):
           ['--record-dependencies'],
           {'metavar': '<file>', 'validator': validate_dependency_file,
            'default': None}),           # default set in Values class
+         ('Cache document trees in <directory>.  A cached document tree '
+          'is used if the source, its dependencies, and the settings used '
+          'for reading are unchanged.  Default: no caching.',
+          ['--doctree-cache'], {'metavar': '<directory>'}),
+         ('Do not cache document trees (default).',
+          ['--no-doctree-cache'], {'action': 'store_const', 'const': None,
+                                   'dest': 'doctree_cache'}),
+         ('Maximal size of the doctree cache in MB.  Least recently used '
+          'entries are removed first.  Default: 100.',
+          ['--doctree-cache-size'],
+          {'metavar': '<MB>', 'type': 'int', 'default': 100,
+           'validator': validate_nonnegative_int}),
+         ('Measure wall time, CPU time, and peak memory of the processing '
+          'stages (reading, each transform, translation, and output '
+          'encoding) and report them after the system messages.',
+          ['--profile-stages'], {'action': 'store_true',
+                                 'validator': validate_boolean}),
+         ('Do not measure the processing stages (default).',
+          ['--no-profile-stages'], {'action': 'store_false',
+                                    'dest': 'profile_stages'}),
+         ('Write the stage profile as JSON to <file> (implies '
+          '--profile-stages).',
+          ['--profile-stages-json'], {'metavar': '<file>'}),
+         ('Index the nodes of the document tree by class while applying '
+          'the transforms.  Speeds up searches in large documents.  '
+          'Transforms must change the document tree with the methods of '
+          'the nodes.',
+          ['--node-index'], {'action': 'store_true',
+                             'validator': validate_boolean}),
+         ('Do not index the nodes (default).',
+          ['--no-node-index'], {'action': 'store_false',
+                                'dest': 'node_index'}),
          ('Read configuration settings from <file>, if it exists.',
           ['--config'], {'metavar': '<file>', 'type': 'string',
                          'action': 'callback', 'callback': read_config_file}),
@@ -570,7 +655,8 @@ class OptionParser(optparse.OptionParser, docutils.SettingsSpec):
                          '_config_files': None}
     """Defaults for settings that don't have command-line option equivalents."""
 
-    relative_path_settings = ('warning_stream',)
+    relative_path_settings = ('warning_stream', 'doctree_cache',
+                              'profile_stages_json')
 
     config_section = 'general'
 
@@ -741,6 +827,159 @@ class OptionParser(optparse.OptionParser, docutils.SettingsSpec):
         raise KeyError('No option with dest == %r.' % dest)
 
 
+class ComponentSettings(object):
+
+    """
+    Default runtime settings for a set of Docutils components.
+
+    Set up the `OptionParser` for the components once and cache the
+    settings from the standard configuration files.  The configuration
+    files are read again only if the list of files or the modification
+    time of a file changes.  Use `get_component_settings()` to get the
+    shared instance for a set of components.
+    """
+
+    def __init__(self, components):
+        self.option_parser = OptionParser(components)
+        """An `OptionParser` without defaults and configuration settings."""
+
+        self._lock = threading.Lock()
+        self._config_stamp = None
+        self._config_settings = None
+        self._config_files = None
+
+    def get_config_settings(self):
+        """
+        Return the settings from the standard configuration files (a
+        dictionary) and the list of applied configuration files.
+
+        The dictionary is shared by all callers.  It does not contain the
+        "record_dependencies" `DependencyList` (unless a configuration
+        file sets up a dependency file), so that every `Values` instance
+        gets its own list.
+        """
+        option_parser = self.option_parser
+        stamp = [file_stamp(path)
+                 for path in option_parser.get_standard_config_files()]
+        with self._lock:
+            if stamp != self._config_stamp:
+                option_parser.config_files = []
+                settings = option_parser.get_standard_config_settings()
+                self._config_settings = dict(settings.__dict__)
+                self._config_files = option_parser.config_files
+                dependencies = self._config_settings.pop(
+                    'record_dependencies')
+                if dependencies.file is None:
+                    self._config_stamp = stamp
+                else:
+                    # Recording dependencies truncates the file,
+                    # re-read the configuration files every time:
+                    self._config_settings['record_dependencies'] = (
+                        dependencies)
+                    self._config_stamp = None
+            return self._config_settings, self._config_files
+
+    def get_default_values(self, defaults=None):
+        """
+        Return a new `Values` instance with the default settings,
+        overridden by `defaults` (a dictionary) and the settings from the
+        standard configuration files.
+
+        The result is the same as with ``OptionParser(components,
+        defaults, read_config_files=True).get_default_values()``.
+        """
+        settings = dict(self.option_parser.defaults)
+        settings.update(defaults or {})
+        config_files = []
+        if not settings['_disable_config']:
+            try:
+                config_settings, config_files = self.get_config_settings()
+            except ValueError as error:
+                self.option_parser.error(SafeString(error))
+            settings.update(config_settings)
+        settings['_config_files'] = list(config_files)
+        return Values(copy_list_settings(settings))
+
+
+def file_stamp(path):
+    """
+    Return a tuple identifying the state of the file at `path`: the
+    absolute path, modification time, and size (`None` if the file does
+    not exist).
+    """
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (path, None, None)
+    return (path, stat.st_mtime, stat.st_size)
+
+_component_settings = {}
+_component_settings_lock = threading.Lock()
+
+_settings_spec_attributes = ('settings_spec', 'settings_defaults',
+                             'settings_default_overrides',
+                             'relative_path_settings', 'config_section',
+                             'config_section_dependencies')
+
+def settings_spec_key(component):
+    """
+    Return a key for the settings specification of `component` (a
+    `docutils.SettingsSpec` instance or class): the class and the
+    instance-specific settings specification attributes.
+    """
+    if component is None:
+        return None
+    if isinstance(component, type):
+        return (component,)
+    key = [component.__class__]
+    instance_dict = getattr(component, '__dict__', {})
+    for name in _settings_spec_attributes:
+        if name in instance_dict:
+            value = instance_dict[name]
+            if isinstance(value, list):
+                value = tuple(value)
+            key.append((name, value))
+    return tuple(key)
+
+def get_component_settings(components):
+    """
+    Return the shared `ComponentSettings` instance for `components`.
+
+    `components` is a sequence of Docutils components (see
+    `OptionParser`).  Components are identified by `settings_spec_key()`.
+    If the key is not hashable, a new (uncached) instance is returned.
+    """
+    keys = tuple(settings_spec_key(component) for component in components)
+    try:
+        hash(keys)
+    except TypeError:
+        return ComponentSettings(components)
+    with _component_settings_lock:
+        try:
+            return _component_settings[keys]
+        except KeyError:
+            pass
+        # Do not keep component instances (and their data) alive
+        # unless they have instance-specific settings specifications:
+        spec_components = []
+        for component, key in zip(components, keys):
+            if key and len(key) == 1:
+                component = key[0]      # the class suffices
+            spec_components.append(component)
+        component_settings = ComponentSettings(spec_components)
+        _component_settings[keys] = component_settings
+        return component_settings
+
+def clear_settings_cache():
+    """
+    Clear the cache of `get_component_settings()`, e.g. after changing
+    the settings specification of a component class.
+    """
+    with _component_settings_lock:
+        _component_settings.clear()
+
+
 class ConfigParser(RawConfigParser):
 
     old_settings = {
@@ -77,6 +77,13 @@ class Input(TransformSpec):
     def read(self):
         raise NotImplementedError
 
+    def iterlines(self):
+        """
+        Return an iterator over the lines of the input (Unicode strings
+        without line ends, like ``self.read().splitlines()``).
+        """
+        return iter(self.read().splitlines())
+
     def decode(self, data):
         """
         Decode a string, `data`, heuristically.
@@ -285,6 +292,59 @@ class FileInput(Input):
         """
         return self.read().splitlines(True)
 
+    def iterlines(self):
+        """
+        Generate the lines of a single file (Unicode strings without line
+        ends, like ``self.read().splitlines()``).
+
+        Under Python 3, a text file is read and decoded line by line: the
+        consumer may stop early without reading the rest of the file.  If
+        decoding fails and no encoding is given, the file is decoded with
+        the heuristics of `read()`.  The result must not depend on where
+        decoding fails, so without a given encoding, lines are held back
+        from the first non-ASCII line on until the whole file is decoded.
+        """
+        if (sys.version_info < (3, 0) or self.source is sys.stdin
+            or 'b' in getattr(self.source, 'mode', 'b')):
+            for line in self.read().splitlines():
+                yield line
+            return
+        count = 0                       # number of lines generated
+        held = []                       # lines decoded but not generated
+        may_fall_back = not self.encoding and self.source_path
+        try:
+            try:
+                for data in self.source:
+                    for line in data.splitlines():
+                        if held or (may_fall_back
+                                    and self.non_ascii.search(line)):
+                            # may decode differently with the heuristics
+                            held.append(line)
+                        else:
+                            yield line
+                            count += 1
+                for line in held:
+                    yield line
+                return
+            except (UnicodeError, LookupError):
+                if self.encoding or not self.source_path:
+                    raise
+            # re-read in binary mode and decode with heuristics; the lines
+            # generated are ASCII (decoded the same with all candidates)
+            del held[:]
+            b_source = open(self.source_path, 'rb')
+            data = b_source.read()
+            b_source.close()
+            data = b'\n'.join(data.splitlines()) + b'\n'
+            for line in self.decode(data).splitlines()[count:]:
+                yield line
+        finally:
+            if self.autoclose:
+                self.close()
+
+    non_ascii = re.compile(u'[^\x00-\x7f]')
+    """Matches lines that may decode differently with another encoding."""
+
     def close(self):
         if self.source is not sys.stdin:
             self.source.close()
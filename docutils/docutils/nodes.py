@@ -70,6 +70,8 @@ class Node(object):
 
     """Abstract base class of nodes in a document tree."""
 
+    __slots__ = ()
+
     parent = None
     """Back-reference to the Node immediately containing this Node."""
 
@@ -162,24 +164,33 @@ class Node(object):
         Return true if we should stop the traversal.
         """
         stop = False
-        visitor.document.reporter.debug(
-            'docutils.nodes.Node.walk calling dispatch_visit for %s'
-            % self.__class__.__name__)
+        reporter = visitor.document.reporter
+        stack = []      # iterators over (copies of) the children lists
+        node = self
         try:
-            try:
-                visitor.dispatch_visit(self)
-            except (SkipChildren, SkipNode):
-                return stop
-            except SkipDeparture:           # not applicable; ignore
-                pass
-            children = self.children
-            try:
-                for child in children[:]:
-                    if child.walk(visitor):
-                        stop = True
-                        break
-            except SkipSiblings:
-                pass
+            while True:
+                if node is not None:
+                    if reporter.debug_flag:
+                        reporter.debug('docutils.nodes.Node.walk calling '
+                                       'dispatch_visit for %s'
+                                       % node.__class__.__name__)
+                    try:
+                        visitor.dispatch_visit(node)
+                    except (SkipChildren, SkipNode):
+                        pass
+                    except SkipDeparture:   # not applicable; ignore
+                        stack.append(iter(node.children[:]))
+                    except SkipSiblings:
+                        if not stack:
+                            raise
+                        stack.pop()
+                    else:
+                        stack.append(iter(node.children[:]))
+                if not stack:
+                    break
+                node = next(stack[-1], None)
+                if node is None:
+                    stack.pop()
         except StopTraversal:
             stop = True
         return stop
@@ -196,51 +207,95 @@ class Node(object):
 
         Return true if we should stop the traversal.
         """
-        call_depart = True
-        stop = False
-        visitor.document.reporter.debug(
-            'docutils.nodes.Node.walkabout calling dispatch_visit for %s'
-            % self.__class__.__name__)
-        try:
-            try:
-                visitor.dispatch_visit(self)
-            except SkipNode:
-                return stop
-            except SkipDeparture:
-                call_depart = False
-            children = self.children
-            try:
-                for child in children[:]:
-                    if child.walkabout(visitor):
-                        stop = True
-                        break
-            except SkipSiblings:
-                pass
-        except SkipChildren:
-            pass
-        except StopTraversal:
-            stop = True
-        if call_depart:
+        reporter = visitor.document.reporter
+        # The stack holds one entry per open node: [node, iterator over
+        # (a copy of) its children, call_depart, stop]
+        stack = []
+        node = self
+        while True:
+            error = None
+            if node is not None:
+                frame = [node, iter(()), True, False]
+                stack.append(frame)
+                if reporter.debug_flag:
+                    reporter.debug('docutils.nodes.Node.walkabout calling '
+                                   'dispatch_visit for %s'
+                                   % node.__class__.__name__)
+                try:
+                    visitor.dispatch_visit(node)
+                    frame[1] = iter(node.children[:])
+                except SkipNode:
+                    frame[2] = False
+                except SkipDeparture:
+                    frame[1] = iter(node.children[:])
+                    frame[2] = False
+                except SkipChildren:
+                    pass
+                except StopTraversal:
+                    frame[3] = True
+                except SkipSiblings as exc:
+                    frame[2] = False
+                    error = exc
+            frame = stack[-1]
+            if error is None:
+                node = next(frame[1], None)
+                if node is not None:
+                    continue
+                if frame[2]:
+                    try:
+                        self._depart(visitor, frame[0])
+                    except (SkipSiblings, SkipChildren, StopTraversal) as exc:
+                        error = exc
+            # The node is finished, pass the result on to its parent:
+            node = None
+            stack.pop()
+            if not stack:
+                if error is not None:
+                    raise error
+                return frame[3]
+            if error is None and not frame[3]:
+                continue
+            # stop traversing the parent's children
+            stack[-1][1] = iter(())
+            if (isinstance(error, StopTraversal)
+                or error is None and frame[3]):
+                stack[-1][3] = True
+
+    @staticmethod
+    def _depart(visitor, node):
+        if visitor.document.reporter.debug_flag:
             visitor.document.reporter.debug(
-                'docutils.nodes.Node.walkabout calling dispatch_departure '
-                'for %s' % self.__class__.__name__)
-            visitor.dispatch_departure(self)
-        return stop
+                'docutils.nodes.Node.walkabout calling '
+                'dispatch_departure for %s' % node.__class__.__name__)
+        visitor.dispatch_departure(node)
 
     def _fast_traverse(self, cls):
         """Return iterator that only supports instance checks."""
         if isinstance(self, cls):
             yield self
-        for child in self.children:
-            for subnode in child._fast_traverse(cls):
-                yield subnode
+        stack = [iter(self.children)]
+        while stack:
+            for node in stack[-1]:
+                if isinstance(node, cls):
+                    yield node
+                if node.children:
+                    stack.append(iter(node.children))
+                    break
+            else:
+                stack.pop()
 
     def _all_traverse(self):
         """Return iterator that doesn't check for a condition."""
         yield self
-        for child in self.children:
-            for subnode in child._all_traverse():
-                yield subnode
+        stack = [iter(self.children)]
+        while stack:
+            for node in stack[-1]:
+                yield node
+                if node.children:
+                    stack.append(iter(node.children))
+                    break
+            else:
+                stack.pop()
 
     def traverse(self, condition=None, include_self=True, descend=True,
                  siblings=False, ascend=False):
@@ -313,10 +368,10 @@ class Node(object):
         if include_self and (condition is None or condition(self)):
             yield self
         if descend and len(self.children):
-            for child in self:
-                for subnode in child._traverse(condition=condition,
-                                    include_self=True, descend=True,
-                                    siblings=False, ascend=False):
+            subnodes = self._all_traverse()
+            next(subnodes)              # skip self
+            for subnode in subnodes:
+                if condition is None or condition(subnode):
                     yield subnode
         if siblings or ascend:
             node = self
@@ -383,6 +438,16 @@ def unescape(text, restore_backslashes=False, respect_whitespace=False):
         return text
 
 
+class _ClassName(object):
+
+    """Default value of `Element.tagname`: the name of the node's class."""
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return None
+        return owner.__name__
+
+
 class Text(Node, reprunicode):
 
     """
@@ -513,14 +578,20 @@ class Element(Node):
     known_attributes = list_attributes + ('source', 'rawsource')
     """List attributes that are known to the Element base class."""
 
-    tagname = None
-    """The element generic identifier. If None, it is set as an instance
-    attribute to the name of the class."""
+    tagname = _ClassName()
+    """The element generic identifier. If None, the name of the instance's
+    class is used."""
 
     child_text_separator = '\n\n'
     """Separator for child nodes, used by `astext()` method."""
 
+    __slots__ = ('rawsource', 'children', '_attributes', 'parent', 'document',
+                 'source', 'line', '__dict__', '__weakref__')
+    # Other instance attributes are stored in the (lazily created) __dict__.
+
     def __init__(self, rawsource='', *children, **attributes):
+        self.parent = self.document = self.source = self.line = None
+
         self.rawsource = rawsource
         """The raw text from which this element was constructed.
 
@@ -532,23 +603,47 @@ class Element(Node):
 
         self.extend(children)           # maintain parent info
 
-        self.attributes = {}
-        """Dictionary of attribute {name: value}."""
-
-        # Initialize list attributes.
-        for att in self.list_attributes:
-            self.attributes[att] = []
+        # Dictionary of attribute {name: value}, see `attributes`.
+        # List attributes are only added when they are used.
+        self._attributes = {}
 
         for att, value in attributes.items():
-            att = att.lower()
+            if not att.islower():
+                att = att.lower()
             if att in self.list_attributes:
                 # mutable list; make a copy for this node
-                self.attributes[att] = value[:]
+                self._attributes[att] = value[:]
             else:
-                self.attributes[att] = value
+                self._attributes[att] = value
 
-        if self.tagname is None:
-            self.tagname = self.__class__.__name__
+    def _get_attributes(self):
+        attributes = self._attributes
+        for att in self.list_attributes:
+            if att not in attributes:
+                attributes[att] = []
+        return attributes
+
+    def _set_attributes(self, attributes):
+        self._attributes = attributes
+
+    attributes = property(_get_attributes, _set_attributes, doc="""
+        Dictionary of attribute {name: value}.
+
+        The list attributes are initialized to empty lists.""")
+
+    def __getstate__(self):
+        state = dict(getattr(self, '__dict__', ()))
+        for name in ('rawsource', 'children', 'parent', 'document',
+                     'source', 'line'):
+            state[name] = getattr(self, name)
+        state['attributes'] = self._attributes.copy()
+        for att in self.list_attributes:
+            state['attributes'].setdefault(att, [])
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
 
     def _dom_node(self, domroot):
         element = domroot.createElement(self.tagname)
@@ -623,12 +718,18 @@ class Element(Node):
     def __contains__(self, key):
         # Test for both, children and attributes with operator ``in``.
         if isinstance(key, basestring):
-            return key in self.attributes
+            return key in self._attributes or key in self.list_attributes
         return key in self.children
 
     def __getitem__(self, key):
         if isinstance(key, basestring):
-            return self.attributes[key]
+            try:
+                return self._attributes[key]
+            except KeyError:
+                if key not in self.list_attributes:
+                    raise
+                value = self._attributes[key] = []
+                return value
         elif isinstance(key, int):
             return self.children[key]
         elif isinstance(key, slice):
@@ -640,27 +741,42 @@ class Element(Node):
 
     def __setitem__(self, key, item):
         if isinstance(key, basestring):
-            self.attributes[str(key)] = item
+            self._attributes[str(key)] = item
         elif isinstance(key, int):
             self.setup_child(item)
             self.children[key] = item
+            index = getattr(self.document, 'node_index', None)
+            if index is not None:
+                index.changed(self, [item])
         elif isinstance(key, slice):
             assert key.step in (None, 1), 'cannot handle slice with stride'
             for node in item:
                 self.setup_child(node)
             self.children[key.start:key.stop] = item
+            index = getattr(self.document, 'node_index', None)
+            if index is not None:
+                index.changed(self, item)
         else:
             raise TypeError('element index must be an integer, a slice, or '
                             'an attribute name string')
 
     def __delitem__(self, key):
         if isinstance(key, basestring):
-            del self.attributes[key]
+            if key in self.list_attributes:
+                self._attributes.pop(key, None)
+            else:
+                del self._attributes[key]
         elif isinstance(key, int):
             del self.children[key]
+            index = getattr(self.document, 'node_index', None)
+            if index is not None:
+                index.changed(self)
         elif isinstance(key, slice):
             assert key.step in (None, 1), 'cannot handle slice with stride'
             del self.children[key.start:key.stop]
+            index = getattr(self.document, 'node_index', None)
+            if index is not None:
+                index.changed(self)
         else:
             raise TypeError('element index must be an integer, a simple '
                             'slice, or an attribute name string')
@@ -685,7 +801,7 @@ class Element(Node):
 
     def non_default_attributes(self):
         atts = {}
-        for key, value in self.attributes.items():
+        for key, value in self._attributes.items():
             if self.is_not_default(key):
                 atts[key] = value
         return atts
@@ -695,17 +811,21 @@ class Element(Node):
         return attlist
 
     def get(self, key, failobj=None):
-        return self.attributes.get(key, failobj)
+        if key in self.list_attributes:
+            return self[key]
+        return self._attributes.get(key, failobj)
 
     def hasattr(self, attr):
-        return attr in self.attributes
+        return attr in self
 
     def delattr(self, attr):
-        if attr in self.attributes:
-            del self.attributes[attr]
+        if attr in self:
+            del self[attr]
 
     def setdefault(self, key, failobj=None):
-        return self.attributes.setdefault(key, failobj)
+        if key in self.list_attributes:
+            return self[key]
+        return self._attributes.setdefault(key, failobj)
 
     has_key = hasattr
 
@@ -727,6 +847,9 @@ class Element(Node):
     def append(self, item):
         self.setup_child(item)
         self.children.append(item)
+        index = getattr(self.document, 'node_index', None)
+        if index is not None:
+            index.changed(self, [item])
 
     def extend(self, item):
         for node in item:
@@ -736,20 +859,30 @@ class Element(Node):
         if isinstance(item, Node):
             self.setup_child(item)
             self.children.insert(index, item)
+            node_index = getattr(self.document, 'node_index', None)
+            if node_index is not None:
+                node_index.changed(self, [item])
         elif item is not None:
             self[index:index] = item
 
     def pop(self, i=-1):
-        return self.children.pop(i)
+        item = self.children.pop(i)
+        index = getattr(self.document, 'node_index', None)
+        if index is not None:
+            index.changed(self)
+        return item
 
     def remove(self, item):
         self.children.remove(item)
+        index = getattr(self.document, 'node_index', None)
+        if index is not None:
+            index.changed(self)
 
     def index(self, item):
         return self.children.index(item)
 
     def is_not_default(self, key):
-        if self[key] == [] and key in self.list_attributes:
+        if key in self.list_attributes and self[key] == []:
             return 0
         else:
             return 1
@@ -760,7 +893,7 @@ class Element(Node):
         'dupnames', but not 'source') from node or dictionary `dict_`.
         """
         if isinstance(dict_, Node):
-            dict_ = dict_.attributes
+            dict_ = dict_._attributes
         for att in self.basic_attributes:
             self.append_attr_list(att, dict_.get(att, []))
 
@@ -873,7 +1006,7 @@ class Element(Node):
               the update_fun method to this function.
         """
         if isinstance(dict_, Node):
-            dict_ = dict_.attributes
+            dict_ = dict_._attributes
 
         # Include the source attribute when copying?
         if and_source:
@@ -982,6 +1115,9 @@ class Element(Node):
 
     def clear(self):
         self.children = []
+        index = getattr(self.document, 'node_index', None)
+        if index is not None:
+            index.changed(self)
 
     def replace(self, old, new):
         """Replace one child `Node` with another child or children."""
@@ -1061,7 +1197,7 @@ class Element(Node):
                         for child in self.children])
 
     def copy(self):
-        obj = self.__class__(rawsource=self.rawsource, **self.attributes)
+        obj = self.__class__(rawsource=self.rawsource, **self._attributes)
         obj.document = self.document
         obj.source = self.source
         obj.line = self.line
@@ -1147,7 +1283,7 @@ class FixedTextElement(TextElement):
 
     def __init__(self, rawsource='', text='', *children, **attributes):
         TextElement.__init__(self, rawsource, text, *children, **attributes)
-        self.attributes['xml:space'] = 'preserve'
+        self._attributes['xml:space'] = 'preserve'
 
 
 # ========
@@ -1341,17 +1477,47 @@ class document(Root, Structural, Element):
         self.decoration = None
         """Document's `decoration` node."""
 
+        self.node_index = None
+        """`NodeIndex` of the document tree, or None (see
+        `enable_node_index()`)."""
+
         self.document = self
 
     def __getstate__(self):
         """
         Return dict with unpicklable references removed.
         """
-        state = self.__dict__.copy()
+        state = Element.__getstate__(self)
         state['reporter'] = None
         state['transformer'] = None
+        state['node_index'] = None
         return state
 
+    def enable_node_index(self):
+        """
+        Index the nodes of the document tree by class.
+
+        With the index, ``document.traverse(cls)`` costs time proportional
+        to the number of matching nodes instead of the size of the tree
+        (plus sorting them in tree order).  The index is maintained by
+        the methods of `Element` that change the children of a node
+        (`Element.append()`, `Element.insert()`, `Element.remove()`,
+        `Element.replace()`, `Element.replace_self()`, item assignment
+        and deletion, etc.).  Code that changes the ``children`` list of
+        an element directly must not be run while the index is enabled.
+        """
+        if self.node_index is None:
+            self.node_index = NodeIndex(self)
+
+    def disable_node_index(self):
+        """Drop the node index (see `enable_node_index()`)."""
+        self.node_index = None
+
+    def _fast_traverse(self, cls):
+        if self.node_index is None:
+            return Element._fast_traverse(self, cls)
+        return iter(self.node_index.find(cls))
+
     def asdom(self, dom=None):
         """Return a DOM representation of this document."""
         if dom is None:
@@ -1577,7 +1743,7 @@ class document(Root, Structural, Element):
 
     def copy(self):
         obj = self.__class__(self.settings, self.reporter,
-                              **self.attributes)
+                              **self._attributes)
         obj.source = self.source
         obj.line = self.line
         return obj
@@ -1593,6 +1759,104 @@ class document(Root, Structural, Element):
         return self.decoration
 
 
+class NodeIndex(object):
+
+    """
+    Index of the nodes of a `document` tree by class.
+
+    Created by `document.enable_node_index()` and updated by the methods
+    of `Element` changing the children of a node.  The positions of the
+    children of a node, needed to sort the nodes found in tree order, are
+    computed when needed and kept until the children change.
+
+    Nodes removed from the tree stay in the index (they may be inserted
+    again); `find()` skips them.
+    """
+
+    def __init__(self, document):
+        self.document = document
+        """The indexed `document`."""
+
+        self.nodes = {}
+        """Mapping of node classes to dictionaries {id(node): node}."""
+
+        self.positions = {}
+        """Mapping of node ids to (node, {id(child): position})."""
+
+        self.register(document)
+
+    def register(self, node):
+        """Add `node` and its descendants not yet in the index."""
+        document = self.document
+        nodes = self.nodes
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            try:
+                by_id = nodes[node.__class__]
+            except KeyError:
+                by_id = nodes[node.__class__] = {}
+            if id(node) in by_id:
+                continue
+            by_id[id(node)] = node
+            node.document = document
+            if node.children:
+                stack.extend(node.children)
+
+    def changed(self, parent, new=()):
+        """
+        Update after a change of the children of `parent` (`new`: nodes
+        added).
+        """
+        self.positions.pop(id(parent), None)
+        if new and id(parent) in self.nodes.get(parent.__class__, ()):
+            for node in new:
+                self.register(node)
+
+    def find(self, cls):
+        """
+        Return a list of the instances of `cls` (a class or a tuple of
+        classes) in the tree (including the document), in tree order.
+        """
+        positions = self.positions
+        keys = {id(self.document): ()}
+        found = []
+        for node_class, nodes in self.nodes.items():
+            if not issubclass(node_class, cls):
+                continue
+            for node in nodes.values():
+                # The sort key is the list of the positions of the node
+                # and its ancestors (None for nodes not in the tree).
+                path = []
+                ancestor = node
+                while id(ancestor) not in keys:
+                    parent = ancestor.parent
+                    if parent is None:
+                        key = None
+                        break
+                    entry = positions.get(id(parent))
+                    if entry is None or entry[0] is not parent:
+                        entry = positions[id(parent)] = (parent, dict(
+                            zip(map(id, parent.children),
+                                range(len(parent.children)))))
+                    position = entry[1].get(id(ancestor))
+                    if position is None:
+                        key = None
+                        break
+                    path.append((ancestor, position))
+                    ancestor = parent
+                else:
+                    key = keys[id(ancestor)]
+                for ancestor, position in reversed(path):
+                    if key is not None:
+                        key += (position,)
+                    keys[id(ancestor)] = key
+                if key is not None:
+                    found.append((key, node))
+        found.sort(key=lambda item: item[0])
+        return [node for key, node in found]
+
+
 # ================
 #  Title Elements
 # ================
@@ -1860,7 +2124,7 @@ class pending(Special, Invisible, Element):
 
     def copy(self):
         obj = self.__class__(self.transform, self.details, self.rawsource,
-                              **self.attributes)
+                              **self._attributes)
         obj.document = self.document
         obj.source = self.source
         obj.line = self.line
@@ -1980,20 +2244,41 @@ class NodeVisitor(object):
     Used to ensure transitional compatibility with existing 3rd-party writers.
     """
 
+    _dispatch_names = {}
+    """Mapping (prefix, node class) -> method name.  Shared by all
+    visitors."""
+
     def __init__(self, document):
         self.document = document
 
+    def _dispatch_method(self, prefix, node, default):
+        """
+        Return the method self."`prefix` + node class name", or the method
+        named `default` if it does not exist.
+        """
+        try:
+            name = self._dispatch_names[prefix, node.__class__]
+        except KeyError:
+            name = self._dispatch_names[prefix, node.__class__] = (
+                prefix + node.__class__.__name__)
+        # Look the method up every time, as it may be replaced or set on
+        # the visitor instance:
+        method = getattr(self, name, None)
+        if method is None:
+            method = getattr(self, default)
+        return method
+
     def dispatch_visit(self, node):
         """
         Call self."``visit_`` + node class name" with `node` as
         parameter.  If the ``visit_...`` method does not exist, call
         self.unknown_visit.
         """
-        node_name = node.__class__.__name__
-        method = getattr(self, 'visit_' + node_name, self.unknown_visit)
-        self.document.reporter.debug(
-            'docutils.nodes.NodeVisitor.dispatch_visit calling %s for %s'
-            % (method.__name__, node_name))
+        method = self._dispatch_method('visit_', node, 'unknown_visit')
+        if self.document.reporter.debug_flag:
+            self.document.reporter.debug(
+                'docutils.nodes.NodeVisitor.dispatch_visit calling %s for %s'
+                % (method.__name__, node.__class__.__name__))
         return method(node)
 
     def dispatch_departure(self, node):
@@ -2002,11 +2287,12 @@ class NodeVisitor(object):
         parameter.  If the ``depart_...`` method does not exist, call
         self.unknown_departure.
         """
-        node_name = node.__class__.__name__
-        method = getattr(self, 'depart_' + node_name, self.unknown_departure)
-        self.document.reporter.debug(
-            'docutils.nodes.NodeVisitor.dispatch_departure calling %s for %s'
-            % (method.__name__, node_name))
+        method = self._dispatch_method('depart_', node,
+                                       'unknown_departure')
+        if self.document.reporter.debug_flag:
+            self.document.reporter.debug(
+                'docutils.nodes.NodeVisitor.dispatch_departure calling %s '
+                'for %s' % (method.__name__, node.__class__.__name__))
         return method(node)
 
     def unknown_visit(self, node):
@@ -63,8 +63,8 @@ further implicit hyperlinks, like "RFC 2822".  This can be done by subclassing
 ``(pattern, method)`` pair to the "implicit_dispatch" attribute of the
 subclass.  See `states.Inliner.implicit_inline()` for details.  Explicit
 inline markup can be customized in a `states.Inliner` subclass via the
-``patterns.initial`` and ``dispatch`` attributes (and new methods as
-appropriate).
+``patterns.initial``, ``patterns.initial_at_start``, and ``dispatch``
+attributes (and new methods as appropriate, see `states.Inliner.parse()`).
 """
 
 __docformat__ = 'reStructuredText'
@@ -133,6 +133,12 @@ class Parser(docutils.parsers.Parser):
          ('Enable the "raw" directive.  Enabled by default.',
           ['--raw-enabled'],
           {'action': 'store_true'}),
+         ('Maximal size of the cache of included files in MB, shared by '
+          'the documents processed in one process.  Least recently used '
+          'entries are removed first; 0 disables the cache.  Default: 10.',
+          ['--include-cache-size'],
+          {'metavar': '<MB>', 'type': 'int', 'default': 10,
+           'validator': frontend.validate_nonnegative_int}),
          ('Token name set for parsing code with Pygments: one of '
           '"long", "short", or "none (no parsing)". Default is "long".',
           ['--syntax-highlight'],
@@ -189,9 +195,6 @@ class Parser(docutils.parsers.Parser):
               inputstring, tab_width=document.settings.tab_width,
               convert_whitespace=True)
         self.statemachine.run(inputlines, document, inliner=self.inliner)
-        # restore the "default" default role after parsing a document
-        if '' in roles._roles:
-            del roles._roles['']
         self.finish_parse()
 
 
@@ -74,17 +74,26 @@ directive name is canonical & must be lowercase.  Language-dependent
 names are defined in the ``language`` subpackage."""
 
 _directives = {}
-"""Cache of imported directives."""
+"""Cache of imported directives (and directives registered by the
+application), shared by all documents."""
 
-def directive(directive_name, language_module, document):
+def directive(directive_name, language_module, document,
+              local_directives=None):
     """
     Locate and return a directive function from its language-dependent name.
     If not found in the current language, check English.  Return None if the
     named directive cannot be found.
+
+    `local_directives` is an optional mapping local to `document`.  It is
+    searched first, and the results of language lookups are cached in it.
+    Without it, the results are not cached (`_directives` only holds the
+    directives registered by applications).
     """
     normname = directive_name.lower()
     messages = []
     msg_text = []
+    if local_directives is not None and normname in local_directives:
+        return local_directives[normname], messages
     if normname in _directives:
         return _directives[normname], messages
     canonicalname = None
@@ -125,7 +134,8 @@ def directive(directive_name, language_module, document):
         return None, messages
     try:
         directive = getattr(module, classname)
-        _directives[normname] = directive
+        if local_directives is not None:
+            local_directives[normname] = directive
     except AttributeError:
         messages.append(document.reporter.error(
             'No directive class "%s" in module "%s" (directive "%s").'
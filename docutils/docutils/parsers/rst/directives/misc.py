@@ -9,8 +9,10 @@ __docformat__ = 'reStructuredText'
 import sys
 import os.path
 import re
+import threading
 import time
-from docutils import io, nodes, statemachine, utils
+from collections import OrderedDict
+from docutils import frontend, io, nodes, statemachine, utils
 from docutils.utils.error_reporting import SafeString, ErrorString
 from docutils.utils.error_reporting import locale_encoding
 from docutils.parsers.rst import Directive, convert_directive_function
@@ -19,6 +21,64 @@ from docutils.parsers.rst.directives.body import CodeBlock, NumberLines
 from docutils.parsers.rst.roles import set_classes
 from docutils.transforms import misc
 
+
+class IncludeCache(object):
+
+    """
+    Process-wide cache of the content of included files: the decoded and
+    sliced text and its lines, shared by the "include" directives of all
+    documents (see the "include_cache_size" setting).
+
+    Keys identify the state of the file (`frontend.file_stamp()`) and the
+    options used to read it.  The least recently used entries are removed
+    if the size of the cached text exceeds the limit.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        """Mapping of keys to (text, lines, size) tuples, least recently
+        used first."""
+
+        self.size = 0
+        """Total size of the cached text (characters)."""
+
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Return the (text, lines) tuple cached for `key` or None."""
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return None
+            self.entries[key] = entry   # most recently used
+            return entry[:2]
+
+    def add(self, key, text, lines, max_size):
+        """
+        Cache `text` and `lines` (a tuple) for `key`.  Remove the least
+        recently used entries until the size is at most `max_size`.
+        """
+        size = len(text) + sum(len(line) for line in lines)
+        if size > max_size:
+            return
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry[2]
+            while self.entries and self.size + size > max_size:
+                self.size -= self.entries.popitem(last=False)[1][2]
+            self.entries[key] = (text, lines, size)
+            self.size += size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+include_cache = IncludeCache()
+"""The `IncludeCache` of the process."""
+
+
 class Include(Directive):
 
     """
@@ -68,51 +128,30 @@ class Include(Directive):
         e_handler=self.state.document.settings.input_encoding_error_handler
         tab_width = self.options.get(
             'tab-width', self.state.document.settings.tab_width)
+        max_size = getattr(self.state.document.settings,
+                           'include_cache_size', 0) * 2**20
         try:
             self.state.document.settings.record_dependencies.add(path)
-            include_file = io.FileInput(source_path=path,
-                                        encoding=encoding,
-                                        error_handler=e_handler)
+            stamp = max_size and frontend.file_stamp(path)
         except UnicodeEncodeError as error:
-            raise self.severe(u'Problems with "%s" directive path:\n'
-                              'Cannot encode input file path "%s" '
-                              '(wrong locale?).' %
-                              (self.name, SafeString(path)))
-        except IOError as error:
-            raise self.severe(u'Problems with "%s" directive path:\n%s.' %
-                      (self.name, ErrorString(error)))
-        startline = self.options.get('start-line', None)
-        endline = self.options.get('end-line', None)
-        try:
-            if startline or (endline is not None):
-                lines = include_file.readlines()
-                rawtext = ''.join(lines[startline:endline])
-            else:
-                rawtext = include_file.read()
-        except UnicodeError as error:
-            raise self.severe(u'Problem with "%s" directive:\n%s' %
-                              (self.name, ErrorString(error)))
-        # start-after/end-before: no restrictions on newlines in match-text,
-        # and no restrictions on matching inside lines vs. line boundaries
-        after_text = self.options.get('start-after', None)
-        if after_text:
-            # skip content in rawtext before *and incl.* a matching text
-            after_index = rawtext.find(after_text)
-            if after_index < 0:
-                raise self.severe('Problem with "start-after" option of "%s" '
-                                  'directive:\nText not found.' % self.name)
-            rawtext = rawtext[after_index + len(after_text):]
-        before_text = self.options.get('end-before', None)
-        if before_text:
-            # skip content in rawtext after *and incl.* a matching text
-            before_index = rawtext.find(before_text)
-            if before_index < 0:
-                raise self.severe('Problem with "end-before" option of "%s" '
-                                  'directive:\nText not found.' % self.name)
-            rawtext = rawtext[:before_index]
-
-        include_lines = statemachine.string2lines(rawtext, tab_width,
-                                                  convert_whitespace=True)
+            raise self.path_encoding_error(path)
+        key = cached = None
+        if stamp and stamp[1] is not None:  # the file exists
+            key = (stamp, encoding, e_handler, tab_width,
+                   self.options.get('start-line', None),
+                   self.options.get('end-line', None),
+                   self.options.get('start-after', None),
+                   self.options.get('end-before', None))
+            cached = include_cache.get(key)
+        if cached:
+            rawtext, include_lines = cached
+            include_lines = list(include_lines)
+        else:
+            rawtext, include_lines = self.read_file(path, encoding,
+                                                    e_handler, tab_width)
+            if key:
+                include_cache.add(key, rawtext, tuple(include_lines),
+                                  max_size)
         if 'literal' in self.options:
             # Don't convert tabs to spaces, if `tab_width` is positive.
             if tab_width >= 0:
@@ -160,6 +199,58 @@ class Include(Directive):
         self.state_machine.insert_input(include_lines, path)
         return []
 
+    def read_file(self, path, encoding, e_handler, tab_width):
+        """
+        Read the file `path` and select the part given by the options.
+        Return the text and its lines (tabs expanded to `tab_width`).
+        """
+        try:
+            include_file = io.FileInput(source_path=path,
+                                        encoding=encoding,
+                                        error_handler=e_handler)
+        except UnicodeEncodeError as error:
+            raise self.path_encoding_error(path)
+        except IOError as error:
+            raise self.severe(u'Problems with "%s" directive path:\n%s.' %
+                      (self.name, ErrorString(error)))
+        startline = self.options.get('start-line', None)
+        endline = self.options.get('end-line', None)
+        try:
+            if startline or (endline is not None):
+                lines = include_file.readlines()
+                rawtext = ''.join(lines[startline:endline])
+            else:
+                rawtext = include_file.read()
+        except UnicodeError as error:
+            raise self.severe(u'Problem with "%s" directive:\n%s' %
+                              (self.name, ErrorString(error)))
+        # start-after/end-before: no restrictions on newlines in match-text,
+        # and no restrictions on matching inside lines vs. line boundaries
+        after_text = self.options.get('start-after', None)
+        if after_text:
+            # skip content in rawtext before *and incl.* a matching text
+            after_index = rawtext.find(after_text)
+            if after_index < 0:
+                raise self.severe('Problem with "start-after" option of "%s" '
+                                  'directive:\nText not found.' % self.name)
+            rawtext = rawtext[after_index + len(after_text):]
+        before_text = self.options.get('end-before', None)
+        if before_text:
+            # skip content in rawtext after *and incl.* a matching text
+            before_index = rawtext.find(before_text)
+            if before_index < 0:
+                raise self.severe('Problem with "end-before" option of "%s" '
+                                  'directive:\nText not found.' % self.name)
+            rawtext = rawtext[:before_index]
+        include_lines = statemachine.string2lines(rawtext, tab_width,
+                                                  convert_whitespace=True)
+        return rawtext, include_lines
+
+    def path_encoding_error(self, path):
+        return self.severe(u'Problems with "%s" directive path:\n'
+                           'Cannot encode input file path "%s" '
+                           '(wrong locale?).' % (self.name, SafeString(path)))
+
 
 class Raw(Directive):
 
@@ -392,7 +483,7 @@ class Role(Directive):
         if base_role_name:
             base_role, messages = roles.role(
                 base_role_name, self.state_machine.language, self.lineno,
-                self.state.reporter)
+                self.state.reporter, self.state.memo.roles)
             if base_role is None:
                 error = self.state.reporter.error(
                     'Unknown interpreted text role "%s".' % base_role_name,
@@ -426,7 +517,8 @@ class Role(Directive):
                     self.block_text, self.block_text), line=self.lineno)
                 return messages + [error]
         role = roles.CustomRole(new_role_name, base_role, options, content)
-        roles.register_local_role(new_role_name, role)
+        roles.register_local_role(new_role_name, role,
+                                  self.state.memo.roles)
         return messages
 
 
@@ -438,21 +530,23 @@ class DefaultRole(Directive):
     final_argument_whitespace = False
 
     def run(self):
+        local_roles = self.state.memo.roles
         if not self.arguments:
-            if '' in roles._roles:
+            if '' in local_roles:
                 # restore the "default" default role
-                del roles._roles['']
+                del local_roles['']
             return []
         role_name = self.arguments[0]
         role, messages = roles.role(role_name, self.state_machine.language,
-                                    self.lineno, self.state.reporter)
+                                    self.lineno, self.state.reporter,
+                                    local_roles)
         if role is None:
             error = self.state.reporter.error(
                 'Unknown interpreted text role "%s".' % role_name,
                 nodes.literal_block(self.block_text, self.block_text),
                 line=self.lineno)
             return messages + [error]
-        roles._roles[''] = role
+        local_roles[''] = role
         return messages
 
 
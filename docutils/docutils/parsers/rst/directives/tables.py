@@ -12,6 +12,7 @@ __docformat__ = 'reStructuredText'
 import sys
 import os.path
 import csv
+import re
 
 from docutils import io, nodes, statemachine, utils
 from docutils.utils.error_reporting import SafeString
@@ -24,6 +25,30 @@ def align(argument):
     return directives.choice(argument, ('left', 'center', 'right'))
 
 
+def row_range(argument):
+    """
+    Convert a range of row numbers ("first-last", "first-", or a single
+    row number, counting from 1) into a (first, last) tuple.  `last` is
+    None for an open range.  (Directive option conversion function.)
+    """
+    match = re.match(r' *([0-9]+) *(?:(-) *([0-9]+)? *)?$', argument or '')
+    if not match:
+        raise ValueError('"%s" is not a row range (use "first-last", '
+                         '"first-", or a row number)' % argument)
+    first = int(match.group(1))
+    if match.group(3):
+        last = int(match.group(3))
+    elif match.group(2):
+        last = None
+    else:
+        last = first
+    if first < 1:
+        raise ValueError('row numbers start with 1')
+    if last is not None and last < first:
+        raise ValueError('empty row range "%s"' % argument)
+    return first, last
+
+
 class Table(Directive):
 
     """
@@ -191,7 +216,10 @@ class CSVTable(Table):
                    # text field quote/unquote char:
                    'quote': directives.single_char_or_unicode,
                    # char used to escape delim & quote as-needed:
-                   'escape': directives.single_char_or_unicode,}
+                   'escape': directives.single_char_or_unicode,
+                   # rows of CSV data to use:
+                   'rows': row_range,
+                   'max-rows': directives.positive_int,}
 
     class DocutilsDialect(csv.Dialect):
 
@@ -235,6 +263,7 @@ class CSVTable(Table):
         pass
 
     def run(self):
+        csv_data = None
         try:
             if (not self.state.document.settings.file_insertion_enabled
                 and ('file' in self.options
@@ -270,6 +299,10 @@ class CSVTable(Table):
                 % (self.name, message), nodes.literal_block(
                 self.block_text, self.block_text), line=self.lineno)
             return [error]
+        finally:
+            # stop reading an external file:
+            if hasattr(csv_data, 'close'):
+                csv_data.close()
         table = (col_widths, table_head, table_body)
         table_node = self.state.build_table(table, self.content_offset,
                                             stub_columns, widths=self.widths)
@@ -286,6 +319,9 @@ class CSVTable(Table):
         """
         Get CSV data from the directive content, from an external
         file, or from a URL reference.
+
+        Return an iterable of lines and the source.  An external file is
+        read line by line while the lines are consumed.
         """
         encoding = self.options.get(
             'encoding', self.state.document.settings.input_encoding)
@@ -319,7 +355,7 @@ class CSVTable(Table):
                 csv_file = io.FileInput(source_path=source,
                                         encoding=encoding,
                                         error_handler=error_handler)
-                csv_data = csv_file.read().splitlines()
+                csv_data = csv_file.iterlines()
             except IOError as error:
                 severe = self.state_machine.reporter.severe(
                     u'Problems with "%s" directive path:\n%s.'
@@ -352,7 +388,7 @@ class CSVTable(Table):
                 source=csv_text, source_path=source, encoding=encoding,
                 error_handler=(self.state.document.settings.\
                                input_encoding_error_handler))
-            csv_data = csv_file.read().splitlines()
+            csv_data = csv_file.iterlines()
         else:
             error = self.state_machine.reporter.warning(
                 'The "%s" directive requires content; none supplied.'
@@ -376,13 +412,26 @@ class CSVTable(Table):
     encode_for_csv = staticmethod(encode_for_csv)
 
     def parse_csv_data_into_rows(self, csv_data, dialect, source):
+        """
+        Parse the lines of `csv_data` (an iterable) into table rows.
+
+        Only the rows selected by the "rows" and "max-rows" options are
+        built; reading stops after the last of them.
+        """
+        first, last = self.options.get('rows', (1, None))
+        if 'max-rows' in self.options:
+            max_last = first + self.options['max-rows'] - 1
+            if last is None or last > max_last:
+                last = max_last
         # csv.py doesn't do Unicode; encode temporarily as UTF-8
-        csv_reader = csv.reader([self.encode_for_csv(line + '\n')
-                                 for line in csv_data],
+        csv_reader = csv.reader((self.encode_for_csv(line + '\n')
+                                 for line in csv_data),
                                 dialect=dialect)
         rows = []
         max_cols = 0
-        for row in csv_reader:
+        for row_number, row in enumerate(csv_reader, 1):
+            if row_number < first:
+                continue
             row_data = []
             for cell in row:
                 # decode UTF-8 back to Unicode
@@ -392,6 +441,8 @@ class CSVTable(Table):
                 row_data.append(cell_data)
             rows.append(row_data)
             max_cols = max(max_cols, len(row))
+            if row_number == last:
+                break
         return rows, max_cols
 
 
@@ -89,19 +89,27 @@ names are defined in the ``language`` subpackage."""
 
 _roles = {}
 """Mapping of local or language-dependent interpreted text role names to role
-functions."""
+functions (registered by the application, shared by all documents)."""
 
-def role(role_name, language_module, lineno, reporter):
+def role(role_name, language_module, lineno, reporter, local_roles=None):
     """
     Locate and return a role function from its language-dependent name, along
     with a list of system messages.  If the role is not found in the current
     language, check English.  Return a 2-tuple: role function (``None`` if the
     named role cannot be found) and a list of system messages.
+
+    `local_roles` is an optional mapping of the roles local to a document
+    (e.g. defined by the "role" directive).  It is searched first, and the
+    results of language lookups are cached in it.  Without it, the results
+    are not cached (`_roles` only holds the roles registered by
+    applications).
     """
     normname = role_name.lower()
     messages = []
     msg_text = []
 
+    if local_roles is not None and normname in local_roles:
+        return local_roles[normname], messages
     if normname in _roles:
         return _roles[normname], messages
 
@@ -138,7 +146,8 @@ def role(role_name, language_module, lineno, reporter):
     # Look the role up in the registry, and return it.
     if canonicalname in _role_registry:
         role_fn = _role_registry[canonicalname]
-        register_local_role(normname, role_fn)
+        if local_roles is not None:
+            register_local_role(normname, role_fn, local_roles)
         return role_fn, messages
     else:
         return None, messages # Error message will be generated by caller.
@@ -154,16 +163,20 @@ def register_canonical_role(name, role_fn):
     set_implicit_options(role_fn)
     _role_registry[name] = role_fn
 
-def register_local_role(name, role_fn):
+def register_local_role(name, role_fn, local_roles=None):
     """
     Register an interpreted text role by its local or language-dependent name.
 
     :Parameters:
       - `name`: The local or language-dependent name of the interpreted role.
       - `role_fn`: The role function.  See the module docstring.
+      - `local_roles`: A mapping of the roles local to a document (see
+        `role()`); default: register the role for all documents.
     """
     set_implicit_options(role_fn)
-    _roles[name] = role_fn
+    if local_roles is None:
+        local_roles = _roles
+    local_roles[name] = role_fn
 
 def set_implicit_options(role_fn):
     """
@@ -105,6 +105,7 @@ __docformat__ = 'reStructuredText'
 
 import sys
 import re
+import warnings
 from types import FunctionType, MethodType
 
 from docutils import nodes, statemachine, utils
@@ -162,7 +163,11 @@ class RSTStateMachine(StateMachineWS):
                            title_styles=[],
                            section_level=0,
                            section_bubble_up_kludge=False,
-                           inliner=inliner)
+                           inliner=inliner,
+                           # interpreted text roles and directives local
+                           # to the document:
+                           roles={},
+                           directives={})
         self.document = document
         self.attach_observer(document.note_source)
         self.reporter = self.memo.reporter
@@ -459,6 +464,11 @@ def build_regexp(definition, compile=True):
         return regexp
 
 
+_compiled_patterns = {}
+"""Cache of `Inliner.build_patterns()` results, see
+`Inliner.init_customizations()`."""
+
+
 class Inliner(object):
 
     """
@@ -471,8 +481,39 @@ class Inliner(object):
         `self.implicit_inline`."""
 
     def init_customizations(self, settings):
+        # The compiled patterns depend only on the class and on the
+        # "character_level_inline_markup" setting; build them once:
+        character_level = bool(getattr(settings,
+                                       'character_level_inline_markup', False))
+        key = (self.__class__, character_level)
+        if key not in _compiled_patterns:
+            _compiled_patterns[key] = self.build_patterns(character_level)
+        (self.start_string_prefix, self.end_string_suffix, self.parts,
+         patterns) = _compiled_patterns[key]
+        self.patterns = Struct(**patterns)
+
+        self.implicit_dispatch.append((self.patterns.uri,
+                                       self.standalone_uri))
+        if settings.pep_references:
+            self.implicit_dispatch.append((self.patterns.pep,
+                                           self.pep_reference))
+        if settings.rfc_references:
+            self.implicit_dispatch.append((self.patterns.rfc,
+                                           self.rfc_reference))
+
+    def build_patterns(self, character_level=False):
+        """
+        Return the inline markup patterns.
+
+        Return a 4-tuple: the start-string prefix, the end-string suffix,
+        the definition of the initial pattern (see `build_regexp()`), and
+        a dictionary of compiled patterns (attributes of `self.patterns`).
+
+        Called by `init_customizations()` once per class and value of the
+        "character_level_inline_markup" setting (`character_level`).
+        """
         # lookahead and look-behind expressions for inline markup rules
-        if getattr(settings, 'character_level_inline_markup', False):
+        if character_level:
             start_string_prefix = u'(^|(?<!\x00))'
             end_string_suffix = u''
         else:
@@ -484,7 +525,8 @@ class Inliner(object):
                                   punctuation_chars.delimiters,
                                   punctuation_chars.closers))
         args = locals().copy()
-        args.update(vars(self.__class__))
+        for cls in reversed(self.__class__.__mro__):   # with subclasses
+            args.update(vars(cls))
 
         parts = ('initial_inline', start_string_prefix, '',
            [('start', '', self.non_whitespace_after, # simple start-strings
@@ -512,12 +554,11 @@ class Inliner(object):
              )
             ]
            )
-        self.start_string_prefix = start_string_prefix
-        self.end_string_suffix = end_string_suffix
-        self.parts = parts
-
-        self.patterns = Struct(
+        patterns = dict(
           initial=build_regexp(parts),
+          # `initial` without the start-string prefix, matched at the
+          # beginning of the remaining text (see `parse()`):
+          initial_at_start=build_regexp(('initial_inline', '', '', parts[3])),
           emphasis=re.compile(self.non_whitespace_escape_before
                               + r'(\*)' + end_string_suffix, re.UNICODE),
           strong=re.compile(self.non_whitespace_escape_before
@@ -601,15 +642,7 @@ class Inliner(object):
                 %(start_string_prefix)s
                 (RFC(-|\s+)?(?P<rfcnum>\d+))
                 %(end_string_suffix)s""" % args, re.VERBOSE | re.UNICODE))
-
-        self.implicit_dispatch.append((self.patterns.uri,
-                                       self.standalone_uri))
-        if settings.pep_references:
-            self.implicit_dispatch.append((self.patterns.pep,
-                                           self.pep_reference))
-        if settings.rfc_references:
-            self.implicit_dispatch.append((self.patterns.rfc,
-                                           self.rfc_reference))
+        return start_string_prefix, end_string_suffix, parts, patterns
 
     def parse(self, text, lineno, memo, parent):
         # Needs to be refactored for nested inline markup.
@@ -626,37 +659,65 @@ class Inliner(object):
         check it for validity.  If not found or invalid, generate a warning
         and ignore the start-string.  Implicit inline markup (e.g. standalone
         URIs) is found last.
+
+        The text is scanned by position, without copying the remaining text.
+        The methods in `self.dispatch` are called with a match object whose
+        ``pos`` attribute is the start of the remaining text; they return a
+        4-tuple (start, nodes, end, system_messages): the position where the
+        inline nodes start (text before it is left for implicit markup
+        recognition), the nodes, the position where the scan continues, and
+        the system messages.
+
+        Dispatch methods not defined by `Inliner` (e.g. in the `dispatch`
+        dictionary of a subclass) are called with a match on the remaining
+        text, as before Docutils 0.17.  They may return positions in the
+        remaining text or, deprecated, the ``(before, nodes, remaining,
+        system_messages)`` strings.
         """
         self.reporter = memo.reporter
         self.document = memo.document
         self.language = memo.language
+        self.local_roles = memo.roles
         self.parent = parent
         pattern_search = self.patterns.initial.search
+        # The remaining text starts at `pos`; at its beginning, a
+        # start-string does not need to be preceded by whitespace or
+        # punctuation (as at the start of the text):
+        pattern_match_at_start = self.patterns.initial_at_start.match
         dispatch = self.dispatch
-        remaining = escape2null(text)
+        text = escape2null(text)
+        end = len(text)
+        pos = 0                         # start of the remaining text
+        textstart = 0                   # start of the unprocessed text
         processed = []
-        unprocessed = []
         messages = []
-        while remaining:
-            match = pattern_search(remaining)
+        while pos < end:
+            match = (pattern_match_at_start(text, pos)
+                     or pattern_search(text, pos))
             if match:
                 groups = match.groupdict()
                 method = dispatch[groups['start'] or groups['backquote']
                                   or groups['refend'] or groups['fnend']]
-                before, inlines, remaining, sysmessages = method(self, match,
-                                                                 lineno)
-                unprocessed.append(before)
+                if method in _inliner_dispatch:
+                    offset = 0
+                else:
+                    offset = pos
+                    remaining = text[pos:]
+                    match = (pattern_match_at_start(remaining)
+                             or pattern_search(remaining))
+                start, inlines, pos, sysmessages = method(self, match, lineno)
+                if offset or not isinstance(pos, int):
+                    start, pos = _dispatch_positions(start, pos, end, offset)
                 messages += sysmessages
                 if inlines:
-                    processed += self.implicit_inline(''.join(unprocessed),
+                    processed += self.implicit_inline(text[textstart:start],
                                                       lineno)
                     processed += inlines
-                    unprocessed = []
+                    textstart = pos
             else:
                 break
-        remaining = ''.join(unprocessed) + remaining
-        if remaining:
-            processed += self.implicit_inline(remaining, lineno)
+        if textstart < end:
+            processed += self.implicit_inline(text[textstart:], lineno)
         return processed, messages
 
     # Inline object recognition
@@ -695,7 +756,7 @@ class Inliner(object):
         """
         string = match.string
         start = match.start()
-        if start == 0:                  # start-string at beginning of text
+        if start == match.pos:          # start-string at beginning of text
             return False
         prestart = string[start - 1]
         try:
@@ -710,23 +771,22 @@ class Inliner(object):
         matchstart = match.start('start')
         matchend = match.end('start')
         if self.quoted_start(match):
-            return (string[:matchend], [], string[matchend:], [], '')
-        endmatch = end_pattern.search(string[matchend:])
-        if endmatch and endmatch.start(1):  # 1 or more chars
-            text = endmatch.string[:endmatch.start(1)]
+            return (matchend, [], matchend, [], '')
+        endmatch = end_pattern.search(string, matchend)
+        if endmatch and endmatch.start(1) > matchend:  # 1 or more chars
+            text = string[matchend:endmatch.start(1)]
             if restore_backslashes:
                 text = unescape(text, True)
-            textend = matchend + endmatch.end(1)
+            textend = endmatch.end(1)
             rawsource = unescape(string[matchstart:textend], True)
             node = nodeclass(rawsource, text)
-            return (string[:matchstart], [node],
-                    string[textend:], [], endmatch.group(1))
+            return (matchstart, [node], textend, [], endmatch.group(1))
         msg = self.reporter.warning(
               'Inline %s start-string without end-string.'
               % nodeclass.__name__, line=lineno)
         text = unescape(string[matchstart:matchend], True)
         prb = self.problematic(text, text, msg)
-        return string[:matchstart], [prb], string[matchend:], [msg], ''
+        return matchstart, [prb], matchend, [msg], ''
 
     def problematic(self, text, rawsource, message):
         msgid = self.document.set_id(message, self.parent)
@@ -736,14 +796,14 @@ class Inliner(object):
         return problematic
 
     def emphasis(self, match, lineno):
-        before, inlines, remaining, sysmessages, endstring = self.inline_obj(
+        start, inlines, end, sysmessages, endstring = self.inline_obj(
               match, lineno, self.patterns.emphasis, nodes.emphasis)
-        return before, inlines, remaining, sysmessages
+        return start, inlines, end, sysmessages
 
     def strong(self, match, lineno):
-        before, inlines, remaining, sysmessages, endstring = self.inline_obj(
+        start, inlines, end, sysmessages, endstring = self.inline_obj(
               match, lineno, self.patterns.strong, nodes.strong)
-        return before, inlines, remaining, sysmessages
+        return start, inlines, end, sysmessages
 
     def interpreted_or_phrase_ref(self, match, lineno):
         end_pattern = self.patterns.interpreted_or_phrase_ref
@@ -757,10 +817,10 @@ class Inliner(object):
             role = role[1:-1]
             position = 'prefix'
         elif self.quoted_start(match):
-            return (string[:matchend], [], string[matchend:], [])
-        endmatch = end_pattern.search(string[matchend:])
-        if endmatch and endmatch.start(1):  # 1 or more chars
-            textend = matchend + endmatch.end()
+            return (matchend, [], matchend, [])
+        endmatch = end_pattern.search(string, matchend)
+        if endmatch and endmatch.start(1) > matchend:  # 1 or more chars
+            textend = endmatch.end()
             if endmatch.group('role'):
                 if role:
                     msg = self.reporter.warning(
@@ -769,10 +829,10 @@ class Inliner(object):
                         line=lineno)
                     text = unescape(string[rolestart:textend], True)
                     prb = self.problematic(text, text, msg)
-                    return string[:rolestart], [prb], string[textend:], [msg]
+                    return rolestart, [prb], textend, [msg]
                 role = endmatch.group('suffix')[1:-1]
                 position = 'suffix'
-            escaped = endmatch.string[:endmatch.start(1)]
+            escaped = string[matchend:endmatch.start(1)]
             rawsource = unescape(string[matchstart:textend], True)
             if rawsource[-1:] == '_':
                 if role:
@@ -781,23 +841,21 @@ class Inliner(object):
                           'reference suffix.' % position, line=lineno)
                     text = unescape(string[rolestart:textend], True)
                     prb = self.problematic(text, text, msg)
-                    return string[:rolestart], [prb], string[textend:], [msg]
-                return self.phrase_ref(string[:matchstart], string[textend:],
-                                       rawsource, escaped)
+                    return rolestart, [prb], textend, [msg]
+                return self.phrase_ref(matchstart, textend, rawsource, escaped)
             else:
                 rawsource = unescape(string[rolestart:textend], True)
                 nodelist, messages = self.interpreted(rawsource, escaped, role,
                                                       lineno)
-                return (string[:rolestart], nodelist,
-                        string[textend:], messages)
+                return (rolestart, nodelist, textend, messages)
         msg = self.reporter.warning(
               'Inline interpreted text or phrase reference start-string '
               'without end-string.', line=lineno)
         text = unescape(string[matchstart:matchend], True)
         prb = self.problematic(text, text, msg)
-        return string[:matchstart], [prb], string[matchend:], [msg]
+        return matchstart, [prb], matchend, [msg]
 
-    def phrase_ref(self, before, after, rawsource, escaped, text=None):
+    def phrase_ref(self, start, end, rawsource, escaped, text=None):
         # `text` is ignored (since 0.16)
         match = self.patterns.embedded_link.search(escaped)
         if match: # embedded <URI> or <alias_>
@@ -869,7 +927,7 @@ class Inliner(object):
             else:
                 reference['refname'] = refname
                 self.document.note_refname(reference)
-        return before, node_list, after, []
+        return start, node_list, end, []
 
 
     def adjust_uri(self, uri):
@@ -881,7 +939,7 @@ class Inliner(object):
 
     def interpreted(self, rawsource, text, role, lineno):
         role_fn, messages = roles.role(role, self.language, lineno,
-                                       self.reporter)
+                                       self.reporter, self.local_roles)
         if role_fn:
             nodes, messages2 = role_fn(role, rawsource, text, lineno, self)
             return nodes, messages + messages2
@@ -893,13 +951,13 @@ class Inliner(object):
                     messages + [msg])
 
     def literal(self, match, lineno):
-        before, inlines, remaining, sysmessages, endstring = self.inline_obj(
+        start, inlines, end, sysmessages, endstring = self.inline_obj(
               match, lineno, self.patterns.literal, nodes.literal,
               restore_backslashes=True)
-        return before, inlines, remaining, sysmessages
+        return start, inlines, end, sysmessages
 
     def inline_internal_target(self, match, lineno):
-        before, inlines, remaining, sysmessages, endstring = self.inline_obj(
+        start, inlines, end, sysmessages, endstring = self.inline_obj(
               match, lineno, self.patterns.target, nodes.target)
         if inlines and isinstance(inlines[0], nodes.target):
             assert len(inlines) == 1
@@ -907,10 +965,10 @@ class Inliner(object):
             name = normalize_name(target.astext())
             target['names'].append(name)
             self.document.note_explicit_target(target, self.parent)
-        return before, inlines, remaining, sysmessages
+        return start, inlines, end, sysmessages
 
     def substitution_reference(self, match, lineno):
-        before, inlines, remaining, sysmessages, endstring = self.inline_obj(
+        start, inlines, end, sysmessages, endstring = self.inline_obj(
               match, lineno, self.patterns.substitution_ref,
               nodes.substitution_reference)
         if len(inlines) == 1:
@@ -928,7 +986,7 @@ class Inliner(object):
                         self.document.note_refname(reference_node)
                     reference_node += subref_node
                     inlines = [reference_node]
-        return before, inlines, remaining, sysmessages
+        return start, inlines, end, sysmessages
 
     def footnote_reference(self, match, lineno):
         """
@@ -938,8 +996,7 @@ class Inliner(object):
         label = match.group('footnotelabel')
         refname = normalize_name(label)
         string = match.string
-        before = string[:match.start('whole')]
-        remaining = string[match.end('whole'):]
+        start = match.start('whole')
         if match.group('citationlabel'):
             refnode = nodes.citation_reference('[%s]_' % label,
                                                refname=refname)
@@ -962,8 +1019,10 @@ class Inliner(object):
                 refnode['refname'] = refname
                 self.document.note_footnote_ref(refnode)
             if utils.get_trim_footnote_ref_space(self.document.settings):
-                before = before.rstrip()
-        return (before, [refnode], remaining, [])
+                # strip whitespace at the end of the remaining text before
+                while start > match.pos and string[start-1].isspace():
+                    start -= 1
+        return (start, [refnode], match.end('whole'), [])
 
     def reference(self, match, lineno, anonymous=False):
         referencename = match.group('refname')
@@ -977,10 +1036,7 @@ class Inliner(object):
         else:
             referencenode['refname'] = refname
             self.document.note_refname(referencenode)
-        string = match.string
-        matchstart = match.start('whole')
-        matchend = match.end('whole')
-        return (string[:matchstart], [referencenode], string[matchend:], [])
+        return (match.start('whole'), [referencenode], match.end('whole'), [])
 
     def anonymous_reference(self, match, lineno):
         return self.reference(match, lineno, anonymous=1)
@@ -1056,6 +1112,23 @@ class Inliner(object):
                 '__': anonymous_reference}
 
 
+_inliner_dispatch = frozenset(Inliner.dispatch.values())
+"""The position-based dispatch methods of `Inliner`."""
+
+def _dispatch_positions(start, end, length, offset):
+    """
+    Return the positions in the text (of `length`) of the `start` and `end`
+    returned by a dispatch method called with a match at `offset` (see
+    `Inliner.parse()`).  Converts the strings returned by legacy methods.
+    """
+    if isinstance(end, int):
+        return offset + start, offset + end
+    warnings.warn('Inliner.dispatch methods returning (before, nodes, '
+                  'remaining, system_messages) strings are deprecated; '
+                  'return positions (see RELEASE-NOTES).',
+                  DeprecationWarning, stacklevel=3)
+    return offset + len(start), length - len(end)
+
 def _loweralpha_to_int(s, _zero=(ord('a')-1)):
     return ord(s) - _zero
 
@@ -2090,7 +2163,8 @@ class Body(RSTState):
         """Returns a 2-tuple: list of nodes, and a "blank finish" boolean."""
         type_name = match.group(1)
         directive_class, messages = directives.directive(
-            type_name, self.memo.language, self.document)
+            type_name, self.memo.language, self.document,
+            self.memo.directives)
         self.parent += messages
         if directive_class:
             return self.run_directive(
@@ -20,6 +20,7 @@ and produce a well-formed data structure suitable for building a CALS table.
 __docformat__ = 'reStructuredText'
 
 
+import heapq
 import re
 import sys
 from docutils import DataError
@@ -154,6 +155,7 @@ class GridTableParser(TableParser):
         self.cells = []
         self.rowseps = {0: [0]}
         self.colseps = {0: [0]}
+        self.lines = self.columns = None
 
     def parse_table(self):
         """
@@ -166,10 +168,18 @@ class GridTableParser(TableParser):
 
         We'll end up knowing all the row and column boundaries, cell positions
         and their dimensions.
+
+        The lines of the block are copied to `self.lines` and transposed to
+        `self.columns` once, so that the cell borders can be traced along the
+        rows and the columns with string searches instead of character by
+        character.
         """
+        self.lines = list(self.block)
+        self.columns = [''.join(column) for column in zip(*self.lines)]
         corners = [(0, 0)]
+        queued = set(corners)
         while corners:
-            top, left = corners.pop(0)
+            top, left = heapq.heappop(corners)
             if top == self.bottom or left == self.right \
                   or top <= self.done[left]:
                 continue
@@ -185,8 +195,11 @@ class GridTableParser(TableParser):
             cellblock.disconnect()      # lines in cell can't sync with parent
             cellblock.replace(self.double_width_pad_char, '')
             self.cells.append((top, left, bottom, right, cellblock))
-            corners.extend([(top, right), (bottom, left)])
-            corners.sort()
+            # A corner seen before would be skipped or fail again:
+            for corner in ((top, right), (bottom, left)):
+                if corner not in queued:
+                    queued.add(corner)
+                    heapq.heappush(corners, corner)
         if not self.check_parse_complete():
             raise TableMarkupError('Malformed table; parse incomplete.')
 
@@ -194,6 +207,9 @@ class GridTableParser(TableParser):
         """For keeping track of how much of each text column has been seen."""
         before = top - 1
         after = bottom - 1
+        if self.done[left:right] == [before] * (right - left):
+            self.done[left:right] = [after] * (right - left)
+            return
         for col in range(left, right):
             assert self.done[col] == before
             self.done[col] = after
@@ -208,7 +224,7 @@ class GridTableParser(TableParser):
 
     def scan_cell(self, top, left):
         """Starting at the top-left corner, start tracing out a cell."""
-        assert self.block[top][left] == '+'
+        assert self.get_line(top)[left] == '+'
         result = self.scan_right(top, left)
         return result
 
@@ -218,17 +234,15 @@ class GridTableParser(TableParser):
         boundaries ('+').
         """
         colseps = {}
-        line = self.block[top]
-        for i in range(left + 1, self.right + 1):
-            if line[i] == '+':
-                colseps[i] = [top]
-                result = self.scan_down(top, left, i)
-                if result:
-                    bottom, rowseps, newcolseps = result
-                    update_dict_of_lists(colseps, newcolseps)
-                    return bottom, i, rowseps, colseps
-            elif line[i] != '-':
-                return None
+        line = self.get_line(top)
+        for i in self.border_joints(line, self.non_row_border_pat,
+                                    left + 1, self.right + 1):
+            colseps[i] = [top]
+            result = self.scan_down(top, left, i)
+            if result:
+                bottom, rowseps, newcolseps = result
+                update_dict_of_lists(colseps, newcolseps)
+                return bottom, i, rowseps, colseps
         return None
 
     def scan_down(self, top, left, right):
@@ -237,16 +251,15 @@ class GridTableParser(TableParser):
         boundaries.
         """
         rowseps = {}
-        for i in range(top + 1, self.bottom + 1):
-            if self.block[i][right] == '+':
-                rowseps[i] = [right]
-                result = self.scan_left(top, left, i, right)
-                if result:
-                    newrowseps, colseps = result
-                    update_dict_of_lists(rowseps, newrowseps)
-                    return i, rowseps, colseps
-            elif self.block[i][right] != '|':
-                return None
+        for i in self.border_joints(self.get_column(right),
+                                    self.non_column_border_pat,
+                                    top + 1, self.bottom + 1):
+            rowseps[i] = [right]
+            result = self.scan_left(top, left, i, right)
+            if result:
+                newrowseps, colseps = result
+                update_dict_of_lists(rowseps, newrowseps)
+                return i, rowseps, colseps
         return None
 
     def scan_left(self, top, left, bottom, right):
@@ -254,18 +267,15 @@ class GridTableParser(TableParser):
         Noting column boundaries, look for the bottom-left corner of the cell.
         It must line up with the starting point.
         """
-        colseps = {}
-        line = self.block[bottom]
-        for i in range(right - 1, left, -1):
-            if line[i] == '+':
-                colseps[i] = [bottom]
-            elif line[i] != '-':
-                return None
-        if line[left] != '+':
+        line = self.get_line(bottom)
+        if line[left] != '+' or self.non_row_border_pat.search(
+                line, left + 1, right):
             return None
         result = self.scan_up(top, left, bottom, right)
         if result is not None:
             rowseps = result
+            colseps = dict((i, [bottom]) for i in
+                           self.find_all('+', line, left + 1, right))
             return rowseps, colseps
         return None
 
@@ -273,13 +283,52 @@ class GridTableParser(TableParser):
         """
         Noting row boundaries, see if we can return to the starting point.
         """
-        rowseps = {}
-        for i in range(bottom - 1, top, -1):
-            if self.block[i][left] == '+':
-                rowseps[i] = [left]
-            elif self.block[i][left] != '|':
-                return None
-        return rowseps
+        column = self.get_column(left)
+        if self.non_column_border_pat.search(column, top + 1, bottom):
+            return None
+        return dict((i, [left]) for i in
+                    self.find_all('+', column, top + 1, bottom))
+
+    non_row_border_pat = re.compile('[^-+]')
+    """Characters not allowed in a horizontal cell border."""
+
+    non_column_border_pat = re.compile('[^|+]')
+    """Characters not allowed in a vertical cell border."""
+
+    def get_line(self, index):
+        """Return the line `index` of the block."""
+        if self.lines is None:
+            self.lines = list(self.block)
+        return self.lines[index]
+
+    def get_column(self, index):
+        """Return the text column `index` of the block as a string."""
+        if self.columns is None:
+            self.columns = [''.join(column) for column in zip(*self.block)]
+        return self.columns[index]
+
+    @staticmethod
+    def border_joints(text, pattern, start, end):
+        """
+        Generate the indices of the '+' characters of `text` in `start:end`,
+        up to the first character matching `pattern` (the end of the border).
+        """
+        while True:
+            i = text.find('+', start, end)
+            if i == -1 or pattern.search(text, start, i):
+                return
+            yield i
+            start = i + 1
+
+    @staticmethod
+    def find_all(char, text, start, end):
+        """Return the indices of `char` in `text[start:end]`."""
+        indices = []
+        i = text.find(char, start, end)
+        while i != -1:
+            indices.append(i)
+            i = text.find(char, i + 1, end)
+        return indices
 
     def structure_from_cells(self):
         """
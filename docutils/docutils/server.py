@@ -0,0 +1,256 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+A long-running render server, a front end to the Docutils `Publisher`.
+
+Starting a Docutils front end for every document costs the start of the
+interpreter, the import of the components, the set up of the option
+parser, and the reading of the configuration files.  The server pays
+this once and keeps the components, settings, and compiled patterns warm.
+
+Requests and responses are JSON objects, one per line.  A request has
+the keys
+
+``source``
+  The source text (required).
+``source_path``
+  Path of the source, for diagnostics and relative paths (default: None).
+``reader``, ``parser``, ``writer``
+  Component names (defaults: "standalone", "restructuredtext", "html5").
+``settings``
+  Dictionary of settings overriding the defaults (see below).
+``id``
+  Any value, returned in the response.
+
+The response has the keys ``id``, ``parts`` (the document parts as
+returned by `docutils.core.publish_parts()`), ``warnings`` (the system
+messages reported), and ``max_level`` (the highest system message
+level).  Binary parts (e.g. of the "odf_odt" writer) are base64 encoded
+in ``binary_parts``.  If the request fails, the response has the keys
+``id`` and ``error``.
+
+The defaults of the settings come from the standard configuration files
+(section "[render server]" and the component sections).  Settings
+starting with an underscore and the settings naming output files or
+keeping state across requests (see `RenderServer.reserved_settings`)
+cannot be overridden by a request.
+
+A request may still enable the "include" directive or raw content,
+which read files the server can access.  When serving untrusted
+clients, set "file_insertion_enabled" and "raw_enabled" to false in the
+defaults and add them to `RenderServer.reserved_settings`, so that
+requests cannot enable them again.
+
+Every request is processed with new component instances and settings, so
+it cannot leak document state into the next one.  Interpreted text roles
+and directives registered while processing a document (e.g. by the "role"
+directive) are local to the document.  Requests are processed
+concurrently.
+
+Use `RenderServer.serve_lines()` for a stdin/stdout line protocol, or
+`RenderServer.serve_unix()` to accept concurrent clients on a Unix domain
+socket (one thread per connection).
+"""
+
+__docformat__ = 'reStructuredText'
+
+import argparse
+import base64
+import json
+import os
+import sys
+
+try:
+    import socketserver
+except ImportError:                     # Python 2
+    import SocketServer as socketserver
+
+if sys.version_info >= (3, 0):
+    from io import StringIO
+    unicode = str
+else:
+    from StringIO import StringIO
+
+import docutils
+from docutils import core, io
+
+
+class RequestError(ValueError):
+    """Invalid render request."""
+
+
+class RenderServer(object):
+
+    """
+    Process render requests (see the module docstring).
+    """
+
+    config_section = 'render server'
+    """Configuration file section with the server's default settings."""
+
+    defaults = {'reader': 'standalone',
+                'parser': 'restructuredtext',
+                'writer': 'html5'}
+    """Default component names."""
+
+    reserved_settings = ('warning_stream', 'record_dependencies',
+                         'profile_stages', 'profile_stages_json',
+                         'doctree_cache', 'doctree_cache_size',
+                         'include_cache_size')
+    """Settings that cannot be overridden by a request (in addition to
+    settings starting with an underscore): output files and caches
+    shared by all requests."""
+
+    def __init__(self, settings_overrides=None, config_section=None):
+        self.settings_overrides = settings_overrides or {}
+        """Overrides of the default settings, for all requests."""
+
+        if config_section is not None:
+            self.config_section = config_section
+
+    def render(self, request):
+        """Process one `request` (a dictionary), return the response."""
+        response = {'id': request.get('id')}
+        try:
+            response.update(self.publish(request))
+        except RequestError as error:
+            response['error'] = 'invalid request: %s' % error
+        except SystemExit as error:
+            response['error'] = 'processing stopped (exit status %s)' % (
+                error.code,)
+        except Exception as error:
+            response['error'] = '%s: %s' % (error.__class__.__name__, error)
+        return response
+
+    def publish(self, request):
+        """
+        Process the valid `request`, return the ``parts``, ``warnings``, and
+        ``max_level`` keys of the response.
+        """
+        source = request.get('source')
+        if not isinstance(source, unicode):
+            raise RequestError('"source" must be a string')
+        overrides = request.get('settings') or {}
+        if not isinstance(overrides, dict):
+            raise RequestError('"settings" must be an object')
+        for name in overrides:
+            if name.startswith('_') or name in self.reserved_settings:
+                raise RequestError('setting "%s" cannot be overridden'
+                                   % name)
+        components = {}
+        for key, default in self.defaults.items():
+            components[key] = request.get(key) or default
+        warnings = StringIO()
+        settings_overrides = dict(self.settings_overrides)
+        settings_overrides.update(overrides)
+        settings_overrides.update({'input_encoding': 'unicode',
+                                   'warning_stream': warnings,
+                                   'traceback': True})
+        output, pub = core.publish_programmatically(
+            source_class=io.StringInput, source=source,
+            source_path=request.get('source_path'),
+            destination_class=io.StringOutput, destination=None,
+            destination_path=None,
+            reader=None, reader_name=components['reader'],
+            parser=None, parser_name=components['parser'],
+            writer=None, writer_name=components['writer'],
+            settings=None, settings_spec=None,
+            settings_overrides=settings_overrides,
+            config_section=self.config_section,
+            enable_exit_status=False)
+        parts = {}
+        binary_parts = {}
+        for name, value in pub.writer.parts.items():
+            if isinstance(value, bytes) and str is bytes:   # Python 2
+                try:
+                    value = value.decode('ascii')
+                except UnicodeError:
+                    pass
+            if isinstance(value, unicode):
+                parts[name] = value
+            elif isinstance(value, bytes):
+                binary_parts[name] = base64.b64encode(value).decode('ascii')
+        result = {'parts': parts,
+                  'warnings': warnings.getvalue(),
+                  'max_level': pub.document.reporter.max_level}
+        if binary_parts:
+            result['binary_parts'] = binary_parts
+        return result
+
+    def render_line(self, line):
+        """Process a request line (text), return the response line."""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('not a JSON object')
+        except ValueError as error:
+            response = {'id': None, 'error': 'invalid request: %s' % error}
+        else:
+            response = self.render(request)
+        return json.dumps(response, sort_keys=True) + '\n'
+
+    def serve_lines(self, infile, outfile):
+        """
+        Process request lines from `infile` (a binary file object) and
+        write the response lines to `outfile` (binary), until end of file.
+        Empty lines are ignored.
+        """
+        for line in iter(infile.readline, b''):
+            line = line.decode('utf-8').strip()
+            if not line:
+                continue
+            outfile.write(self.render_line(line).encode('ascii'))
+            outfile.flush()
+
+    def serve_unix(self, path):
+        """
+        Accept clients on the Unix domain socket `path` and serve each
+        connection in a thread with the line protocol.  Run until
+        interrupted, then remove the socket.
+        """
+        server = self.unix_server(path)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if os.path.exists(path):
+                os.remove(path)
+
+    def unix_server(self, path):
+        """Return a `socketserver` server for `path` (not yet serving)."""
+        render_server = self
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                render_server.serve_lines(self.rfile, self.wfile)
+        class Server(socketserver.ThreadingMixIn,
+                     socketserver.UnixStreamServer):
+            daemon_threads = True
+        return Server(path, Handler)
+
+
+def main(argv=None):
+    """
+    Run a render server on standard input and output, or on the Unix
+    domain socket given as ``--socket=<path>``.
+    """
+    parser = argparse.ArgumentParser(
+        description='Docutils render server (Docutils %s): process render '
+        'requests (JSON objects, one per line) from standard input, or '
+        'from clients of a Unix domain socket, and return the document '
+        'parts.' % docutils.__version__)
+    parser.add_argument('--socket', metavar='PATH',
+                        help='listen on the Unix domain socket PATH')
+    args = parser.parse_args(argv)
+    server = RenderServer()
+    if args.socket:
+        server.serve_unix(args.socket)
+    else:
+        stdin = getattr(sys.stdin, 'buffer', sys.stdin)
+        stdout = getattr(sys.stdout, 'buffer', sys.stdout)
+        try:
+            server.serve_lines(stdin, stdout)
+        except KeyboardInterrupt:
+            pass
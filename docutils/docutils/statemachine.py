@@ -13,6 +13,7 @@ this module defines the following classes:
 - `SearchStateMachine`, uses `re.search()` instead of `re.match()`
 - `SearchStateMachineWS`, uses `re.search()` instead of `re.match()`
 - `ViewList`, extends standard Python lists.
+- `SourceOffsetList`, compact list of (source, offset) pairs.
 - `StringList`, string-specific ViewList.
 
 Exception classes:
@@ -110,6 +111,7 @@ __docformat__ = 'restructuredtext'
 import sys
 import re
 import unicodedata
+from array import array
 from docutils import utils
 from docutils.utils.error_reporting import ErrorOutput
 
@@ -440,13 +442,35 @@ class StateMachine(object):
         When there is no match, ``state.no_match()`` is called and its return
         value is returned.
         """
+        combined = None
         if transitions is None:
             transitions =  state.transition_order
+            combined = state.get_combined_transitions()
         state_correction = None
         if self.debug:
             print((
                   '\nStateMachine.check_line: state="%s", transitions=%r.'
                   % (state.__class__.__name__, transitions)), file=self._stderr)
+        if combined is not None:
+            # One match finds the first matching transition; the match
+            # object passed to the transition method comes from its own
+            # pattern (group numbers differ in the combined pattern).
+            pattern, group_names = combined
+            match = pattern.match(self.line)
+            if match:
+                name = group_names[match.lastindex]
+                pattern, method, next_state = state.transitions[name]
+                if self.debug:
+                    print((
+                          '\nStateMachine.check_line: Matched transition '
+                          '"%s" in state "%s".'
+                          % (name, state.__class__.__name__)), file=self._stderr)
+                return method(pattern.match(self.line), context, next_state)
+            if self.debug:
+                print((
+                      '\nStateMachine.check_line: No match in state "%s".'
+                      % state.__class__.__name__), file=self._stderr)
+            return state.no_match(context, transitions)
         for name in transitions:
             pattern, method, next_state = state.transitions[name]
             match = pattern.match(self.line)
@@ -594,6 +618,13 @@ class State(object):
     defaults.
     """
 
+    combine_transitions = True
+    """
+    Dispatch input lines with a single regular expression combining the
+    patterns of all transitions (see `get_combined_transitions()`)?
+    Override in subclasses to always try the patterns one after another.
+    """
+
     def __init__(self, state_machine, debug=False):
         """
         Initialize a `State` object; make & add initial transitions.
@@ -616,6 +647,9 @@ class State(object):
         or other classes.
         """
 
+        self._combined_transitions = None
+        """Cached result of `get_combined_transitions()`."""
+
         self.add_initial_transitions()
 
         self.state_machine = state_machine
@@ -666,6 +700,7 @@ class State(object):
                 raise UnknownTransitionError(name)
         self.transition_order[:0] = names
         self.transitions.update(transitions)
+        self._combined_transitions = None
 
     def add_transition(self, name, transition):
         """
@@ -679,6 +714,7 @@ class State(object):
             raise DuplicateTransitionError(name)
         self.transition_order[:0] = [name]
         self.transitions[name] = transition
+        self._combined_transitions = None
 
     def remove_transition(self, name):
         """
@@ -691,6 +727,33 @@ class State(object):
             self.transition_order.remove(name)
         except:
             raise UnknownTransitionError(name)
+        self._combined_transitions = None
+
+    def get_combined_transitions(self):
+        """
+        Return the combined pattern of the transitions in `transition_order`.
+
+        Return a 2-tuple (compiled_pattern, group_names) where `group_names`
+        maps the group numbers of the alternatives in `compiled_pattern` to
+        transition names, or ``None`` if the transition patterns cannot be
+        combined (see `combine_patterns()`) or `combine_transitions` is
+        false.
+        The result is cached until transitions are added or removed.
+        """
+        if not self.combine_transitions:
+            return None
+        if self._combined_transitions is None:
+            patterns = [self.transitions[name][0]
+                        for name in self.transition_order]
+            combined = combine_patterns(patterns)
+            if combined is None:
+                self._combined_transitions = False
+            else:
+                pattern, group_indices = combined
+                group_names = dict((group, self.transition_order[i])
+                                   for group, i in group_indices.items())
+                self._combined_transitions = (pattern, group_names)
+        return self._combined_transitions or None
 
     def make_transition(self, name, next_state=None):
         """
@@ -1066,6 +1129,189 @@ class SearchStateMachineWS(_SearchOverride, StateMachineWS):
     pass
 
 
+class SourceOffsetList(object):
+
+    """
+    Compact list of (source, offset) pairs, used for `ViewList.items`.
+
+    Instead of one tuple per item, the sources are stored as indices into
+    a table of (interned) sources, and the offsets in an integer array.
+    An offset of None is stored as `no_offset` (negative offsets like -1
+    are valid).  Sources must be hashable.
+
+    The source table is shared by a list and the lists copied or sliced
+    from it, so it lives only as long as these lists.  Entries are only
+    ever appended to the table, so an index stays valid in all lists
+    sharing it.
+
+    Supports the list operations used by `ViewList`; items are returned as
+    (source, offset) tuples.
+    """
+
+    no_offset = -2**31
+    """Stored value of the offset None (the minimum of the array type)."""
+
+    def __init__(self, items=()):
+        self.sources = [None]
+        """Table of the sources (shared with copies of this list)."""
+
+        self._source_ids = {None: 0}
+        """Mapping of sources to their index in `sources`."""
+
+        self.source_ids = array('i')
+        """Indices of the items' sources in `sources`."""
+
+        self.offsets = array('i')
+        """The items' offsets (`no_offset` for None)."""
+
+        if isinstance(items, SourceOffsetList):
+            self.sources = items.sources
+            self._source_ids = items._source_ids
+            self.source_ids = items.source_ids[:]
+            self.offsets = items.offsets[:]
+        else:
+            for source, offset in items:
+                self.source_ids.append(self.source_id(source))
+                self.offsets.append(self.no_offset if offset is None
+                                    else offset)
+
+    def source_id(self, source):
+        """Return the index of `source` in the table of sources."""
+        try:
+            return self._source_ids[source]
+        except KeyError:
+            self.sources.append(source)
+            self._source_ids[source] = len(self.sources) - 1
+            return self._source_ids[source]
+
+    def _translate(self, other):
+        """Return the source indices of `other` in this list's table."""
+        if other.sources is self.sources:
+            return other.source_ids
+        mapping = dict((source_id, self.source_id(other.sources[source_id]))
+                       for source_id in set(other.source_ids))
+        return array('i', [mapping[source_id]
+                           for source_id in other.source_ids])
+
+    @classmethod
+    def from_source(cls, source, length, offset=0):
+        """Return a list of `length` consecutive lines of `source`."""
+        new = cls()
+        new.source_ids = array('i', [new.source_id(source)]) * length
+        new.offsets = array('i', range(offset, offset + length))
+        return new
+
+    def _copy(self, source_ids, offsets):
+        new = self.__class__()
+        new.sources = self.sources
+        new._source_ids = self._source_ids
+        new.source_ids = source_ids
+        new.offsets = offsets
+        return new
+
+    def _item(self, i):
+        offset = self.offsets[i]
+        return (self.sources[self.source_ids[i]],
+                None if offset == self.no_offset else offset)
+
+    def __cast(self, other):
+        if isinstance(other, SourceOffsetList):
+            return other
+        new = self._copy(array('i'), array('i'))
+        for item in other:
+            new.append(item)
+        return new
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __iter__(self):
+        sources = self.sources
+        no_offset = self.no_offset
+        for source_id, offset in zip(self.source_ids, self.offsets):
+            yield (sources[source_id],
+                   None if offset == no_offset else offset)
+
+    def __eq__(self, other):
+        if isinstance(other, SourceOffsetList):
+            if other.sources is self.sources:
+                return (self.source_ids == other.source_ids
+                        and self.offsets == other.offsets)
+            return (self.offsets == other.offsets
+                    and list(self) == list(other))
+        return list(self) == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def __reduce__(self):
+        return (self.__class__, (list(self),))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self._copy(self.source_ids[i], self.offsets[i])
+        return self._item(i)
+
+    def __setitem__(self, i, item):
+        if isinstance(i, slice):
+            item = self.__cast(item)
+            self.source_ids[i] = self._translate(item)
+            self.offsets[i] = item.offsets
+        else:
+            source, offset = item
+            self.source_ids[i] = self.source_id(source)
+            self.offsets[i] = self.no_offset if offset is None else offset
+
+    def __delitem__(self, i):
+        del self.source_ids[i]
+        del self.offsets[i]
+
+    def __add__(self, other):
+        other = self.__cast(other)
+        return self._copy(self.source_ids + self._translate(other),
+                          self.offsets + other.offsets)
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def __mul__(self, n):
+        return self._copy(self.source_ids * n, self.offsets * n)
+
+    def __imul__(self, n):
+        self.source_ids *= n
+        self.offsets *= n
+        return self
+
+    def append(self, item):
+        self.insert(len(self), item)
+
+    def extend(self, other):
+        other = self.__cast(other)
+        self.source_ids.extend(self._translate(other))
+        self.offsets.extend(other.offsets)
+
+    def insert(self, i, item):
+        source, offset = item
+        self.source_ids.insert(i, self.source_id(source))
+        self.offsets.insert(i, self.no_offset if offset is None
+                                 else offset)
+
+    def pop(self, i=-1):
+        item = self._item(i)
+        del self[i]
+        return item
+
+    def reverse(self):
+        self.source_ids.reverse()
+        self.offsets.reverse()
+
+
 class ViewList(object):
 
     """
@@ -1084,17 +1330,37 @@ class ViewList(object):
     Also, ViewList objects keep track of the source & offset of each item.
     This information is accessible via the `source()`, `offset()`, and
     `info()` methods.
+
+    Slices do not copy the items: a child list shares the storage of its
+    parent and refers to its range by offsets.  Shared storage is copied
+    before it is modified ("copy on write"), by the parent as well as by the
+    child.  Accessing the `data` or `items` attributes gives the list its own
+    (unshared) storage.
     """
 
     def __init__(self, initlist=None, source=None, items=None,
                  parent=None, parent_offset=None):
-        self.data = []
-        """The actual list of data, flattened from various sources."""
+        self._data = []
+        """The storage of the actual list of data, flattened from various
+        sources; the list's items are ``self._data[self._start:-self._end]``
+        (or ``self._data[self._start:]``).
+        May be shared with other lists."""
+
+        self._items = SourceOffsetList()
+        """The storage of the (source, offset) pairs, see `items`."""
+
+        self._start = 0
+        """Start of this list in the storage lists."""
 
-        self.items = []
-        """A list of (source, offset) pairs, same length as `self.data`: the
-        source of each line and the offset of each line from the beginning of
-        its source."""
+        self._end = 0
+        """Number of storage items after the end of this list."""
+
+        self._shared = False
+        """Is the storage shared with other lists?"""
+
+        self._exposed = False
+        """Are the storage lists accessible from outside (via the `data` or
+        `items` attributes)?  Exposed storage is not shared."""
 
         self.parent = parent
         """The parent list."""
@@ -1103,44 +1369,129 @@ class ViewList(object):
         """Offset of this list from the beginning of the parent list."""
 
         if isinstance(initlist, ViewList):
-            self.data = initlist.data[:]
-            self.items = initlist.items[:]
+            initlist._share(self, 0, len(initlist))
         elif initlist is not None:
-            self.data = list(initlist)
+            self._data = list(initlist)
             if items:
-                self.items = items
+                self._items = self._item_storage(items)
             else:
-                self.items = [(source, i) for i in range(len(initlist))]
-        assert len(self.data) == len(self.items), 'data mismatch'
+                self._items = SourceOffsetList.from_source(
+                    source, len(self._data))
+        assert len(self._data) == len(self._items), 'data mismatch'
+
+    def _get_data(self):
+        self._own()
+        self._exposed = True
+        return self._data
+
+    def _set_data(self, data):
+        self._own()
+        self._exposed = True
+        self._data = data
+
+    data = property(_get_data, _set_data, doc="""
+        The actual list of data, flattened from various sources.""")
+
+    def _get_items(self):
+        self._own()
+        self._exposed = True
+        return self._items
+
+    def _set_items(self, items):
+        self._own()
+        self._exposed = True
+        self._items = self._item_storage(items)
+
+    items = property(_get_items, _set_items, doc="""
+        A list of (source, offset) pairs, same length as `self.data`: the
+        source of each line and the offset of each line from the beginning
+        of its source.  Stored as a `SourceOffsetList`.""")
+
+    @staticmethod
+    def _item_storage(items):
+        if isinstance(items, SourceOffsetList):
+            return items
+        return SourceOffsetList(items)
+
+    def _share(self, other, start, stop):
+        """
+        Let `other` refer to the items `start` to `stop` of this list.
+
+        The storage is shared unless it is exposed.
+        """
+        start += self._start
+        stop += self._start
+        if self._exposed:
+            other._data = self._data[start:stop]
+            other._items = self._items[start:stop]
+            other._start = other._end = 0
+        else:
+            other._data = self._data
+            other._items = self._items
+            other._start, other._end = start, len(self._data) - stop
+            self._shared = other._shared = True
+
+    def _own(self):
+        """Copy shared storage before it is modified (copy on write)."""
+        if self._shared or self._start or self._end:
+            stop = len(self._data) - self._end
+            self._data = self._data[self._start:stop]
+            self._items = self._items[self._start:stop]
+            self._start = self._end = 0
+            self._shared = self._exposed = False
+
+    def _list(self):
+        """Return the data as a list (without exposing the storage)."""
+        if self._start or self._end:
+            return self._data[self._start:len(self._data) - self._end]
+        return self._data
+
+    def _item_list(self):
+        """Return the items as a list (without exposing the storage)."""
+        if self._start or self._end:
+            return self._items[self._start:len(self._items) - self._end]
+        return self._items
+
+    def _index(self, i):
+        """Return the storage index of item `i`; raise IndexError."""
+        length = len(self._data) - self._start - self._end
+        if i < 0:
+            i += length
+        if not 0 <= i < length:
+            raise IndexError('list index out of range')
+        return self._start + i
 
     def __str__(self):
-        return str(self.data)
+        return str(self._list())
 
     def __repr__(self):
         return '%s(%s, items=%s)' % (self.__class__.__name__,
-                                     self.data, self.items)
+                                     self._list(), self._item_list())
 
-    def __lt__(self, other): return self.data <  self.__cast(other)
-    def __le__(self, other): return self.data <= self.__cast(other)
-    def __eq__(self, other): return self.data == self.__cast(other)
-    def __ne__(self, other): return self.data != self.__cast(other)
-    def __gt__(self, other): return self.data >  self.__cast(other)
-    def __ge__(self, other): return self.data >= self.__cast(other)
+    def __lt__(self, other): return self._list() <  self.__cast(other)
+    def __le__(self, other): return self._list() <= self.__cast(other)
+    def __eq__(self, other): return self._list() == self.__cast(other)
+    def __ne__(self, other): return self._list() != self.__cast(other)
+    def __gt__(self, other): return self._list() >  self.__cast(other)
+    def __ge__(self, other): return self._list() >= self.__cast(other)
 
     def __cmp__(self, other):
         # from https://docs.python.org/3.0/whatsnew/3.0.html
-        mine = self.data
+        mine = self._list()
         yours = self.__cast(other)
         return (mine > yours) - (yours < mine)
 
     def __cast(self, other):
         if isinstance(other, ViewList):
-            return other.data
+            return other._list()
         else:
             return other
 
-    def __contains__(self, item): return item in self.data
-    def __len__(self): return len(self.data)
+    def __contains__(self, item): return item in self._list()
+    def __len__(self): return len(self._data) - self._start - self._end
+
+    def __iter__(self):
+        return iter(self._list())
 
     # The __getitem__()/__setitem__() methods check whether the index
     # is a slice first, since indexing a native list with a slice object
@@ -1149,126 +1500,148 @@ class ViewList(object):
     def __getitem__(self, i):
         if isinstance(i, slice):
             assert i.step in (None, 1),  'cannot handle slice with stride'
-            return self.__class__(self.data[i.start:i.stop],
-                                  items=self.items[i.start:i.stop],
-                                  parent=self, parent_offset=i.start or 0)
+            start, stop = i.indices(len(self))[:2]
+            child = self.__class__(parent=self, parent_offset=i.start or 0)
+            self._share(child, start, max(start, stop))
+            return child
         else:
-            return self.data[i]
+            length = len(self._data) - self._start - self._end
+            if i < 0:
+                i += length
+            if 0 <= i < length:
+                return self._data[self._start + i]
+            raise IndexError('list index out of range')
 
     def __setitem__(self, i, item):
         if isinstance(i, slice):
             assert i.step in (None, 1), 'cannot handle slice with stride'
             if not isinstance(item, ViewList):
                 raise TypeError('assigning non-ViewList to ViewList slice')
-            self.data[i.start:i.stop] = item.data
-            self.items[i.start:i.stop] = item.items
-            assert len(self.data) == len(self.items), 'data mismatch'
+            self._own()
+            self._data[i.start:i.stop] = item._list()
+            self._items[i.start:i.stop] = item._item_list()
+            assert len(self._data) == len(self._items), 'data mismatch'
             if self.parent:
                 self.parent[(i.start or 0) + self.parent_offset
                             : (i.stop or len(self)) + self.parent_offset] = item
         else:
-            self.data[i] = item
+            self._own()
+            self._data[i] = item
             if self.parent:
                 self.parent[i + self.parent_offset] = item
 
     def __delitem__(self, i):
-        try:
-            del self.data[i]
-            del self.items[i]
-            if self.parent:
-                del self.parent[i + self.parent_offset]
-        except TypeError:
+        self._own()
+        if isinstance(i, slice):
             assert i.step is None, 'cannot handle slice with stride'
-            del self.data[i.start:i.stop]
-            del self.items[i.start:i.stop]
+            del self._data[i.start:i.stop]
+            del self._items[i.start:i.stop]
             if self.parent:
                 del self.parent[(i.start or 0) + self.parent_offset
                                 : (i.stop or len(self)) + self.parent_offset]
+        else:
+            del self._data[i]
+            del self._items[i]
+            if self.parent:
+                del self.parent[i + self.parent_offset]
 
     def __add__(self, other):
         if isinstance(other, ViewList):
-            return self.__class__(self.data + other.data,
-                                  items=(self.items + other.items))
+            return self.__class__(self._list() + other._list(),
+                                  items=(self._item_list()
+                                         + other._item_list()))
         else:
             raise TypeError('adding non-ViewList to a ViewList')
 
     def __radd__(self, other):
         if isinstance(other, ViewList):
-            return self.__class__(other.data + self.data,
-                                  items=(other.items + self.items))
+            return self.__class__(other._list() + self._list(),
+                                  items=(other._item_list()
+                                         + self._item_list()))
         else:
             raise TypeError('adding ViewList to a non-ViewList')
 
     def __iadd__(self, other):
         if isinstance(other, ViewList):
-            self.data += other.data
+            self._own()
+            self._data += other._list()
+            self._items += other._item_list()
         else:
             raise TypeError('argument to += must be a ViewList')
         return self
 
     def __mul__(self, n):
-        return self.__class__(self.data * n, items=(self.items * n))
+        return self.__class__(self._list() * n, items=(self._item_list() * n))
 
     __rmul__ = __mul__
 
     def __imul__(self, n):
-        self.data *= n
-        self.items *= n
+        self._own()
+        self._data *= n
+        self._items *= n
         return self
 
     def extend(self, other):
         if not isinstance(other, ViewList):
             raise TypeError('extending a ViewList with a non-ViewList')
         if self.parent:
-            self.parent.insert(len(self.data) + self.parent_offset, other)
-        self.data.extend(other.data)
-        self.items.extend(other.items)
+            self.parent.insert(len(self) + self.parent_offset, other)
+        self._own()
+        self._data.extend(other._list())
+        self._items.extend(other._item_list())
 
     def append(self, item, source=None, offset=0):
         if source is None:
             self.extend(item)
         else:
             if self.parent:
-                self.parent.insert(len(self.data) + self.parent_offset, item,
+                self.parent.insert(len(self) + self.parent_offset, item,
                                    source, offset)
-            self.data.append(item)
-            self.items.append((source, offset))
+            self._own()
+            self._data.append(item)
+            self._items.append((source, offset))
 
     def insert(self, i, item, source=None, offset=0):
         if source is None:
             if not isinstance(item, ViewList):
                 raise TypeError('inserting non-ViewList with no source given')
-            self.data[i:i] = item.data
-            self.items[i:i] = item.items
+            self._own()
+            self._data[i:i] = item._list()
+            self._items[i:i] = item._item_list()
             if self.parent:
-                index = (len(self.data) + i) % len(self.data)
+                index = (len(self._data) + i) % len(self._data)
                 self.parent.insert(index + self.parent_offset, item)
         else:
-            self.data.insert(i, item)
-            self.items.insert(i, (source, offset))
+            self._own()
+            self._data.insert(i, item)
+            self._items.insert(i, (source, offset))
             if self.parent:
-                index = (len(self.data) + i) % len(self.data)
+                index = (len(self._data) + i) % len(self._data)
                 self.parent.insert(index + self.parent_offset, item,
                                    source, offset)
 
     def pop(self, i=-1):
         if self.parent:
-            index = (len(self.data) + i) % len(self.data)
+            index = (len(self) + i) % len(self)
             self.parent.pop(index + self.parent_offset)
-        self.items.pop(i)
-        return self.data.pop(i)
+        self._own()
+        self._items.pop(i)
+        return self._data.pop(i)
 
     def trim_start(self, n=1):
         """
         Remove items from the start of the list, without touching the parent.
         """
-        if n > len(self.data):
+        if n > len(self):
             raise IndexError("Size of trim too large; can't trim %s items "
-                             "from a list of size %s." % (n, len(self.data)))
+                             "from a list of size %s." % (n, len(self)))
         elif n < 0:
             raise IndexError('Trim size must be >= 0.')
-        del self.data[:n]
-        del self.items[:n]
+        if self._exposed:
+            del self._data[:n]
+            del self._items[:n]
+        else:
+            self._start += n
         if self.parent:
             self.parent_offset += n
 
@@ -1276,39 +1649,47 @@ class ViewList(object):
         """
         Remove items from the end of the list, without touching the parent.
         """
-        if n > len(self.data):
+        if n > len(self):
             raise IndexError("Size of trim too large; can't trim %s items "
-                             "from a list of size %s." % (n, len(self.data)))
+                             "from a list of size %s." % (n, len(self)))
         elif n < 0:
             raise IndexError('Trim size must be >= 0.')
-        del self.data[-n:]
-        del self.items[-n:]
+        if self._exposed:
+            del self._data[-n:]
+            del self._items[-n:]
+        else:
+            # like ``del data[-n:]``, which deletes all items if n == 0
+            self._end += n or len(self)
 
     def remove(self, item):
         index = self.index(item)
         del self[index]
 
-    def count(self, item): return self.data.count(item)
-    def index(self, item): return self.data.index(item)
+    def count(self, item): return self._list().count(item)
+    def index(self, item):
+        return self._data.index(item, self._start,
+                                len(self._data) - self._end) - self._start
 
     def reverse(self):
-        self.data.reverse()
-        self.items.reverse()
+        self._own()
+        self._data.reverse()
+        self._items.reverse()
         self.parent = None
 
     def sort(self, *args):
-        tmp = sorted(zip(self.data, self.items), *args)
-        self.data = [entry[0] for entry in tmp]
-        self.items = [entry[1] for entry in tmp]
+        tmp = sorted(zip(self._list(), self._item_list()), *args)
+        self._own()
+        self._data = [entry[0] for entry in tmp]
+        self._items = SourceOffsetList([entry[1] for entry in tmp])
         self.parent = None
 
     def info(self, i):
         """Return source & offset for index `i`."""
         try:
-            return self.items[i]
+            return self._items[self._index(i)]
         except IndexError:
-            if i == len(self.data):     # Just past the end
-                return self.items[i - 1][0], None
+            if i == len(self):     # Just past the end
+                return self._items[self._index(i - 1)][0], None
             else:
                 raise
 
@@ -1326,8 +1707,10 @@ class ViewList(object):
 
     def xitems(self):
         """Return iterator yielding (source, offset, value) tuples."""
-        for (value, (source, offset)) in zip(self.data, self.items):
-            yield (source, offset, value)
+        data, items = self._data, self._items
+        for i in range(self._start, len(data) - self._end):
+            source, offset = items[i]
+            yield (source, offset, data[i])
 
     def pprint(self):
         """Print the list in `grep` format (`source:offset:value` lines)"""
@@ -1345,8 +1728,9 @@ class StringList(ViewList):
         from index `start` to `end`.  No whitespace-checking is done on the
         trimmed text.  Does not affect slice parent.
         """
-        self.data[start:end] = [line[length:]
-                                for line in self.data[start:end]]
+        self._own()
+        self._data[start:end] = [line[length:]
+                                 for line in self._data[start:end]]
 
     def get_text_block(self, start, flush_left=False):
         """
@@ -1356,10 +1740,11 @@ class StringList(ViewList):
         indented line is encountered before the text block ends (with a blank
         line).
         """
+        data, base = self._data, self._start
         end = start
-        last = len(self.data)
+        last = len(self)
         while end < last:
-            line = self.data[end]
+            line = data[base + end]
             if not line.strip():
                 break
             if flush_left and (line[0] == ' '):
@@ -1397,16 +1782,17 @@ class StringList(ViewList):
             first_indent = block_indent
         if first_indent is not None:
             end += 1
-        last = len(self.data)
+        data, base = self._data, self._start
+        last = len(self)
         while end < last:
-            line = self.data[end]
+            line = data[base + end]
             if line and (line[0] != ' '
                          or (block_indent is not None
                              and line[:block_indent].strip())):
                 # Line not indented or insufficiently indented.
                 # Block finished properly iff the last indented line blank:
                 blank_finish = ((end > start)
-                                and not self.data[end - 1].strip())
+                                and not data[base + end - 1].strip())
                 break
             stripped = line.lstrip()
             if not stripped:            # blank line
@@ -1424,30 +1810,35 @@ class StringList(ViewList):
             blank_finish = 1            # block ends at end of lines
         block = self[start:end]
         if first_indent is not None and block:
-            block.data[0] = block.data[0][first_indent:]
+            block._own()
+            block._data[0] = block._data[0][first_indent:]
         if indent and strip_indent:
             block.trim_left(indent, start=(first_indent is not None))
         return block, indent or 0, blank_finish
 
     def get_2D_block(self, top, left, bottom, right, strip_indent=True):
         block = self[top:bottom]
+        block._own()
+        data = block._data
         indent = right
-        for i in range(len(block.data)):
+        for i in range(len(data)):
             # get slice from line, care for combining characters
-            ci = utils.column_indices(block.data[i])
-            try:
-                left = ci[left]
-            except IndexError:
-                left += len(block.data[i]) - len(ci)
-            try:
-                right = ci[right]
-            except IndexError:
-                right += len(block.data[i]) - len(ci)
-            block.data[i] = line = block.data[i][left:right].rstrip()
+            # (there are none in an ASCII prefix: indices are unchanged)
+            if _non_ascii.search(data[i], 0, max(left, right) + 1):
+                ci = utils.column_indices(data[i])
+                try:
+                    left = ci[left]
+                except IndexError:
+                    left += len(data[i]) - len(ci)
+                try:
+                    right = ci[right]
+                except IndexError:
+                    right += len(data[i]) - len(ci)
+            data[i] = line = data[i][left:right].rstrip()
             if line:
                 indent = min(indent, len(line) - len(line.lstrip()))
         if strip_indent and 0 < indent < right:
-            block.data = [line[indent:] for line in block.data]
+            data[:] = [line[indent:] for line in data]
         return block
 
     def pad_double_width(self, pad_char):
@@ -1456,20 +1847,22 @@ class StringList(ViewList):
         For East Asian language support.
         """
         east_asian_width = unicodedata.east_asian_width
-        for i in range(len(self.data)):
-            line = self.data[i]
+        self._own()
+        for i in range(len(self._data)):
+            line = self._data[i]
             if isinstance(line, unicode):
                 new = []
                 for char in line:
                     new.append(char)
                     if east_asian_width(char) in 'WF': # 'W'ide & 'F'ull-width
                         new.append(pad_char)
-                self.data[i] = ''.join(new)
+                self._data[i] = ''.join(new)
 
     def replace(self, old, new):
         """Replace all occurrences of substring `old` with `new`."""
-        for i in range(len(self.data)):
-            self.data[i] = self.data[i].replace(old, new)
+        self._own()
+        for i in range(len(self._data)):
+            self._data[i] = self._data[i].replace(old, new)
 
 
 class StateMachineError(Exception): pass
@@ -1521,6 +1914,87 @@ def string2lines(astring, tab_width=8, convert_whitespace=False,
     # See bug #381.
     return [s.expandtabs(tab_width).rstrip() for s in astring.splitlines()]
 
+_pattern_type = type(re.compile(''))
+
+_non_ascii = re.compile(u'[^\x00-\x7f]')
+
+_combined_patterns = {}
+"""Cache of `combine_patterns()` results, keyed by pattern tuples."""
+
+_regexp_tokens = re.compile(r"""
+    \\[0-7]{3}                    # octal escape
+  | \\(?P<reference>[1-9][0-9]?)  # numbered group reference
+  | \\.                           # other escape
+  | \[\^?\]?(?:\\.|[^]\\])*\]     # character class
+  | (?P<unsupported>
+      \(\?[aiLmsux]+\)               # global inline flags
+    | \(\?\(                          # conditional
+    )
+""", re.VERBOSE | re.DOTALL)
+
+def combine_patterns(patterns):
+    """
+    Combine `patterns` into one regular expression.
+
+    Return a 2-tuple (compiled_pattern, group_indices) or ``None``, if the
+    patterns cannot be combined.  `compiled_pattern` is an alternation of
+    all `patterns` wrapped in groups; `group_indices` maps the number of the
+    group wrapping an alternative to the index of its pattern in `patterns`.
+    The first matching alternative wins, so ``match.lastindex`` of a match
+    of `compiled_pattern` identifies the first of `patterns` that matches.
+
+    Numbered group references are renumbered.  Patterns with differing
+    flags, global inline flags, conditionals, or conflicting group names
+    are not combined.
+
+    Parameter `patterns`: a sequence of compiled regular expressions.
+    """
+    patterns = tuple(patterns)
+    try:
+        return _combined_patterns[patterns]
+    except KeyError:
+        pass
+    except TypeError:                   # unhashable pattern-like object
+        return None
+    combined = None
+    if patterns and all(isinstance(pattern, _pattern_type)
+                        for pattern in patterns):
+        combined = _combine_patterns(patterns)
+    _combined_patterns[patterns] = combined
+    return combined
+
+def _combine_patterns(patterns):
+    flags = patterns[0].flags
+    if flags & re.VERBOSE:
+        return None
+    alternatives = []
+    group_indices = {}
+    group = 1
+    for i, pattern in enumerate(patterns):
+        if pattern.flags != flags:
+            return None
+        offset = group
+        def renumber(match):
+            if match.group('unsupported'):
+                raise ValueError
+            if match.group('reference'):
+                number = int(match.group('reference')) + offset
+                if number > 99:         # \100 is an octal escape
+                    raise ValueError
+                return '\\%d' % number
+            return match.group()
+        try:
+            source = _regexp_tokens.sub(renumber, pattern.pattern)
+        except ValueError:
+            return None
+        alternatives.append('(%s)' % source)
+        group_indices[group] = i
+        group += pattern.groups + 1
+    try:
+        return re.compile('|'.join(alternatives), flags), group_indices
+    except (re.error, TypeError):
+        return None
+
 def _exception_data():
     """
     Return exception information:
@@ -24,7 +24,7 @@ choose to perform on the parsed document.
 __docformat__ = 'reStructuredText'
 
 
-from docutils import languages, ApplicationError, TransformSpec
+from docutils import nodes, languages, utils, ApplicationError, TransformSpec
 
 
 class TransformError(ApplicationError): pass
@@ -61,6 +61,80 @@ class Transform(object):
         raise NotImplementedError('subclass must override this method')
 
 
+class NodeTransform(Transform):
+
+    """
+    Base class for transforms handling the nodes of some classes, one
+    node at a time, in tree order.
+
+    The `Transformer` applies adjacent node transforms of the same
+    priority band (see `priority_bands`) in one traversal of the document
+    tree: for every node found, the `visit_node()` methods of the
+    transforms handling it are called in priority order.  The result is
+    the same as applying the transforms one after the other if
+
+    * a transform's handling of a node does not depend on what the other
+      transforms of the band do with other nodes, and
+    * `prepare()` and `visit_node()` do not add transforms.
+
+    Only the last transform of a combined traversal may change the tree
+    structure (see `changes_tree`).  Transforms with a "pending" node or
+    keyword arguments and subclasses overriding `apply()` are applied
+    alone.
+    """
+
+    node_classes = ()
+    """Classes of the nodes handled by `visit_node()` (override)."""
+
+    changes_tree = True
+    """Does `visit_node()` insert, remove, or replace nodes?  Override
+    with False if it changes at most node attributes."""
+
+    def apply(self):
+        if self.prepare():
+            for node in find_nodes(self.document, self.node_classes):
+                self.visit_node(node)
+
+    def prepare(self):
+        """
+        Prepare the traversal.  Return False to skip it (e.g. if a setting
+        disables the transform).
+        """
+        return True
+
+    def visit_node(self, node):
+        """Override to handle a node (an instance of `node_classes`)."""
+        raise NotImplementedError('subclass must override this method')
+
+
+def find_nodes(document, classes):
+    """
+    Return a list of the nodes of `document` that are instances of one of
+    the `classes` (a tuple), in tree order.
+    """
+    if len(classes) == 1:
+        return document.traverse(classes[0])
+    if getattr(document, 'node_index', None) is not None:
+        return document.node_index.find(classes)
+    return document.traverse(lambda node: isinstance(node, classes))
+
+
+priority_bands = (0, 100, 200, 300, 400, 700, 800, 900, 1000)
+"""Limits of the transform priority ranges (see the "Transform Priority
+Range Categories" in ``docs/ref/transforms.txt``)."""
+
+def priority_band(priority_string):
+    """Return the index of the priority range of `priority_string`."""
+    priority = int(priority_string.split('-')[0])
+    for band, limit in enumerate(priority_bands):
+        if priority < limit:
+            return band
+    return len(priority_bands)
+
+def _function(method):
+    return getattr(method, '__func__', method)
+
+
 class Transformer(TransformSpec):
 
     """
@@ -94,6 +168,10 @@ class Transformer(TransformSpec):
         """Internal serial number to keep track of the add order of
         transforms."""
 
+        self.profiler = None
+        """`docutils.utils.stage_profile.StageProfiler` measuring each
+        transform applied, or None."""
+
     def add_transform(self, transform_class, priority=None, **kwargs):
         """
         Store a single transform.  Use `priority` to override the default.
@@ -160,13 +238,93 @@ class Transformer(TransformSpec):
         """Apply all of the stored transforms, in priority order."""
         self.document.reporter.attach_observer(
             self.document.note_transform_message)
-        while self.transforms:
-            if not self.sorted:
-                # Unsorted initially, and whenever a transform is added.
-                self.transforms.sort()
-                self.transforms.reverse()
-                self.sorted = 1
-            priority, transform_class, pending, kwargs = self.transforms.pop()
-            transform = transform_class(self.document, startnode=pending)
+        node_index = getattr(self.document.settings, 'node_index', False)
+        if node_index:
+            self.document.enable_node_index()
+        try:
+            while self.transforms:
+                if not self.sorted:
+                    # Unsorted initially, and whenever a transform is added.
+                    self.transforms.sort()
+                    self.transforms.reverse()
+                    self.sorted = 1
+                group = [self.transforms.pop()]
+                while (self.transforms
+                       and self.can_combine(group[-1], self.transforms[-1])):
+                    group.append(self.transforms.pop())
+                if len(group) > 1:
+                    self.apply_combined(group)
+                    continue
+                priority, transform_class, pending, kwargs = group[0]
+                transform = transform_class(self.document, startnode=pending)
+                if self.profiler is None:
+                    transform.apply(**kwargs)
+                else:
+                    self.apply_profiled(transform, priority, kwargs)
+                self.applied.append(group[0])
+        finally:
+            if node_index:
+                self.document.disable_node_index()
+
+    def apply_profiled(self, transform, priority, kwargs):
+        """Apply `transform`, measured by `self.profiler`."""
+        pending = None
+        if transform.startnode is not None:
+            pending = '%s:%s' % utils.get_source_line(transform.startnode)
+        with self.profiler.stage(
+            'transform', name='%s.%s' % (transform.__class__.__module__,
+                                         transform.__class__.__name__),
+            priority=int(priority.split('-')[0]), pending=pending):
             transform.apply(**kwargs)
-            self.applied.append((priority, transform_class, pending, kwargs))
+
+    def can_combine(self, first, second):
+        """
+        Can the transform entries `first` and `second` (consecutive in
+        priority order) be applied in one traversal (see `NodeTransform`)?
+        """
+        for priority, transform_class, pending, kwargs in (first, second):
+            if (pending is not None or kwargs
+                or not issubclass(transform_class, NodeTransform)
+                or (_function(transform_class.apply)
+                    is not _function(NodeTransform.apply))):
+                return False
+        return (not first[1].changes_tree
+                and priority_band(first[0]) == priority_band(second[0]))
+
+    def apply_combined(self, group):
+        """
+        Apply the node transforms of the entries in `group` with one
+        traversal of the document tree.
+        """
+        transforms = [transform_class(self.document)
+                      for priority, transform_class, pending, kwargs in group]
+        if self.profiler is None:
+            self.visit_nodes(transforms)
+        else:
+            with self.profiler.stage(
+                'transform',
+                name=' + '.join(['%s.%s' % (transform.__class__.__module__,
+                                            transform.__class__.__name__)
+                                 for transform in transforms]),
+                priority=int(group[0][0].split('-')[0]), pending=None):
+                self.visit_nodes(transforms)
+        self.applied.extend(group)
+
+    def visit_nodes(self, transforms):
+        """
+        Call the `visit_node()` methods of the `NodeTransform` instances
+        `transforms` in one traversal.
+        """
+        transforms = [transform for transform in transforms
+                      if transform.prepare()]
+        classes = []
+        for transform in transforms:
+            for cls in transform.node_classes:
+                if cls not in classes:
+                    classes.append(cls)
+        if not classes:
+            return
+        for node in find_nodes(self.document, tuple(classes)):
+            for transform in transforms:
+                if isinstance(node, transform.node_classes):
+                    transform.visit_node(node)
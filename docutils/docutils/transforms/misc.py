@@ -9,7 +9,7 @@ Miscellaneous transforms.
 __docformat__ = 'reStructuredText'
 
 from docutils import nodes
-from docutils.transforms import Transform, TransformError
+from docutils.transforms import Transform, TransformError, NodeTransform
 
 
 class CallBack(Transform):
@@ -67,7 +67,7 @@ class ClassAttribute(Transform):
         pending.replace_self(error)
 
 
-class Transitions(Transform):
+class Transitions(NodeTransform):
 
     """
     Move transitions at the end of sections up the tree.  Complain
@@ -93,9 +93,10 @@ class Transitions(Transform):
 
     default_priority = 830
 
-    def apply(self):
-        for node in self.document.traverse(nodes.transition):
-            self.visit_transition(node)
+    node_classes = (nodes.transition,)
+
+    def visit_node(self, node):
+        self.visit_transition(node)
 
     def visit_transition(self, node):
         index = node.parent.index(node)
@@ -11,7 +11,7 @@ __docformat__ = 'reStructuredText'
 import sys
 import re
 from docutils import nodes, utils
-from docutils.transforms import TransformError, Transform
+from docutils.transforms import TransformError, Transform, NodeTransform
 
 
 class PropagateTargets(Transform):
@@ -329,7 +329,7 @@ class IndirectHyperlinks(Transform):
                     self.resolve_indirect_references(ref)
 
 
-class ExternalTargets(Transform):
+class ExternalTargets(NodeTransform):
 
     """
     Given::
@@ -349,30 +349,34 @@ class ExternalTargets(Transform):
 
     default_priority = 640
 
-    def apply(self):
-        for target in self.document.traverse(nodes.target):
-            if target.hasattr('refuri'):
-                refuri = target['refuri']
-                for name in target['names']:
-                    reflist = self.document.refnames.get(name, [])
-                    if reflist:
-                        target.note_referenced_by(name=name)
-                    for ref in reflist:
-                        if ref.resolved:
-                            continue
-                        del ref['refname']
-                        ref['refuri'] = refuri
-                        ref.resolved = 1
+    node_classes = (nodes.target,)
+    changes_tree = False
+
+    def visit_node(self, target):
+        if target.hasattr('refuri'):
+            refuri = target['refuri']
+            for name in target['names']:
+                reflist = self.document.refnames.get(name, [])
+                if reflist:
+                    target.note_referenced_by(name=name)
+                for ref in reflist:
+                    if ref.resolved:
+                        continue
+                    del ref['refname']
+                    ref['refuri'] = refuri
+                    ref.resolved = 1
 
 
-class InternalTargets(Transform):
+class InternalTargets(NodeTransform):
 
     default_priority = 660
 
-    def apply(self):
-        for target in self.document.traverse(nodes.target):
-            if not target.hasattr('refuri') and not target.hasattr('refid'):
-                self.resolve_reference_ids(target)
+    node_classes = (nodes.target,)
+    changes_tree = False
+
+    def visit_node(self, target):
+        if not target.hasattr('refuri') and not target.hasattr('refid'):
+            self.resolve_reference_ids(target)
 
     def resolve_reference_ids(self, target):
         """
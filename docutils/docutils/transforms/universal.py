@@ -20,7 +20,7 @@ import re
 import sys
 import time
 from docutils import nodes, utils
-from docutils.transforms import TransformError, Transform
+from docutils.transforms import TransformError, Transform, NodeTransform
 from docutils.utils import smartquotes
 
 
@@ -90,7 +90,7 @@ class Decorations(Transform):
             return None
 
 
-class ExposeInternals(Transform):
+class ExposeInternals(NodeTransform):
 
     """
     Expose internal attributes if ``expose_internals`` setting is set.
@@ -98,16 +98,17 @@ class ExposeInternals(Transform):
 
     default_priority = 840
 
-    def not_Text(self, node):
-        return not isinstance(node, nodes.Text)
+    node_classes = (nodes.Element,)
+    changes_tree = False
 
-    def apply(self):
-        if self.document.settings.expose_internals:
-            for node in self.document.traverse(self.not_Text):
-                for att in self.document.settings.expose_internals:
-                    value = getattr(node, att, None)
-                    if value is not None:
-                        node['internal:' + att] = value
+    def prepare(self):
+        return bool(self.document.settings.expose_internals)
+
+    def visit_node(self, node):
+        for att in self.document.settings.expose_internals:
+            value = getattr(node, att, None)
+            if value is not None:
+                node['internal:' + att] = value
 
 
 class Messages(Transform):
@@ -135,7 +136,7 @@ class Messages(Transform):
             self.document += section
 
 
-class FilterMessages(Transform):
+class FilterMessages(NodeTransform):
 
     """
     Remove system messages below verbosity threshold.
@@ -143,10 +144,11 @@ class FilterMessages(Transform):
 
     default_priority = 870
 
-    def apply(self):
-        for node in tuple(self.document.traverse(nodes.system_message)):
-            if node['level'] < self.document.reporter.report_level:
-                node.parent.remove(node)
+    node_classes = (nodes.system_message,)
+
+    def visit_node(self, node):
+        if node['level'] < self.document.reporter.report_level:
+            node.parent.remove(node)
 
 
 class TestMessages(Transform):
@@ -165,7 +167,7 @@ class TestMessages(Transform):
                 self.document += msg
 
 
-class StripComments(Transform):
+class StripComments(NodeTransform):
 
     """
     Remove comment elements from the document tree (only if the
@@ -174,10 +176,13 @@ class StripComments(Transform):
 
     default_priority = 740
 
-    def apply(self):
-        if self.document.settings.strip_comments:
-            for node in tuple(self.document.traverse(nodes.comment)):
-                node.parent.remove(node)
+    node_classes = (nodes.comment,)
+
+    def prepare(self):
+        return bool(self.document.settings.strip_comments)
+
+    def visit_node(self, node):
+        node.parent.remove(node)
 
 
 class StripClassesAndElements(Transform):
@@ -269,9 +274,11 @@ class SmartQuotes(Transform):
             alternative = False
 
         document_language = self.document.settings.language_code
-        lc_smartquotes = self.document.settings.smartquotes_locales
-        if lc_smartquotes:
-            smartquotes.smartchars.quotes.update(dict(lc_smartquotes))
+        # Quote characters for this document (customized with the
+        # "smartquotes_locales" setting, without changing the shared
+        # `smartquotes.smartchars.quotes`):
+        quotes = dict(smartquotes.smartchars.quotes)
+        quotes.update(dict(self.document.settings.smartquotes_locales or ()))
 
         # "Educate" quotes in normal text. Handle each block of text
         # (TextElement node) as a unit to keep context around inline nodes:
@@ -298,7 +305,7 @@ class SmartQuotes(Transform):
                     lang += '-x-altquot'
             # drop unsupported subtags:
             for tag in utils.normalize_language_tag(lang):
-                if tag in smartquotes.smartchars.quotes:
+                if tag in quotes:
                     lang = tag
                     break
             else: # language not supported: (keep ASCII quotes)
@@ -311,7 +318,8 @@ class SmartQuotes(Transform):
             # Iterator educating quotes in plain text:
             # (see "utils/smartquotes.py" for the attribute setting)
             teacher = smartquotes.educate_tokens(self.get_tokens(txtnodes),
-                                attr=self.smartquotes_action, language=lang)
+                                attr=self.smartquotes_action, language=lang,
+                                quotes=quotes)
 
             for txtnode, newtext in zip(txtnodes, teacher):
                 txtnode.parent.replace(txtnode, nodes.Text(newtext,
@@ -0,0 +1,777 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Compact binary serialization of document trees.
+
+`dumps()` stores a document tree as a flat sequence of node records in
+document order, `loads()` restores it.  Compared to pickling, no
+recursion over the node hierarchy or the ``parent`` back-references is
+required and the data is smaller.
+
+Layout (all offsets absolute, all integers in the tables unsigned 32 bit
+little-endian)::
+
+    header         magic, format version, number of nodes, number of
+                   strings, offsets of the string table, the node table,
+                   and the root table
+    string table   offset of every string (plus the end offset), then the
+                   UTF-8 encoded strings (text, tag names, attribute names,
+                   class names, ... are stored once)
+    node table     offset of every node record (plus the end offset), then
+                   the node records
+    root table     the roots (first the serialized node, then nodes that
+                   are referenced but not part of its tree) with their
+                   parents
+
+Node records start with the record kind.  Element records continue with
+the class name, the number of descendants (the records of a subtree are
+consecutive), and the values of the node's attributes; children are
+not stored but derived from the record order, and the ``parent`` links
+are rebuilt on load.  Values (attribute values, ``__dict__`` entries of
+nodes, ...) are stored with a type tag; references to nodes are stored
+as the node's index.  Values of other types are pickled.
+
+Loading pickled data can run arbitrary code.  Data from an untrusted
+source (e.g. a cache directory writable by others) must be stored and
+loaded with the `safe` argument of `dumps()` and `loads()`: then values
+are never pickled, and only node and transform classes from modules
+that are already imported are stored by name.
+
+A `DoctreeImage` gives access to serialized data without decoding it
+first (the data may be a memory map, see `open_image()`): strings are
+decoded and nodes are materialized on demand.
+"""
+
+__docformat__ = 'reStructuredText'
+
+import mmap
+import pickle
+import struct
+import sys
+import types
+from collections import Counter
+
+from docutils import nodes
+from docutils.transforms import Transform
+
+if sys.version_info >= (3, 0):
+    unicode = str
+    _native_type = None                 # native strings are text
+    _encoding_errors = 'surrogatepass'
+    _integer_types = (int,)
+else:
+    _native_type = str
+    _encoding_errors = 'strict'
+    _integer_types = (int, long)
+
+
+MAGIC = b'DOCTREE\n'
+
+FORMAT_VERSION = 2
+"""Incremented with every incompatible change of the format."""
+
+_header = struct.Struct('<8s6I')
+_offset = struct.Struct('<I')
+_float = struct.Struct('<d')
+
+# Record kinds:
+ELEMENT, TEXT, REFERENCE = range(3)
+# ``REFERENCE`` records stand for a node that occurs at several places in
+# the tree (e.g. in the children of two elements).
+
+# Value tags:
+(NONE, FALSE, TRUE, INTEGER, NEGATIVE, FLOAT, TEXT_STRING, NATIVE_STRING,
+ BYTES, LIST, TUPLE, DICT, NODE, GLOBAL, PICKLE, COUNTER) = range(16)
+# ``COUNTER`` values (e.g. ``document.id_counter``) are stored like dicts.
+
+# Flags of node records, set if the value is stored:
+RAWSOURCE, SOURCE, LINE, DOCUMENT, ATTRIBUTES, EXTRAS = (
+    1, 2, 4, 8, 16, 32)
+ROOT_DOCUMENT = 64                      # the document is node 0
+PARENT = 128                            # the parent is not the element
+                                        # containing the node
+# For elements, missing values default to the values set by
+# `nodes.Element.__init__()`; other attributes (``__dict__`` entries) are
+# stored as EXTRAS.
+
+_absent = object()
+
+_safe_classes = (nodes.Node, Transform)
+"""Classes stored by name in "safe" mode (see `dumps()`), with subclasses."""
+
+_document_omitted = ('settings', 'reporter', 'transformer')
+"""Attributes of `nodes.document` that are not serialized (set to None)."""
+
+
+class FormatError(ValueError):
+    """The data is not a serialized document tree of a supported version."""
+
+
+class SerializationError(TypeError):
+    """A node or value of the tree cannot be serialized."""
+
+
+def dumps(node, safe=False):
+    """
+    Return the serialized tree of `node` (usually a `nodes.document`) as
+    a byte string.
+
+    The settings, reporter, and transformer of a document are not stored.
+    Raise `SerializationError` if the tree contains nodes or values that
+    cannot be stored (e.g. local functions) or, if `safe` is true, values
+    that would be pickled or stored by name (classes and functions other
+    than node and transform classes).
+    """
+    return _Serializer(safe).serialize(node)
+
+def loads(data, safe=False):
+    """
+    Return the node tree serialized in `data` (see `dumps()`).
+
+    If `safe` is true, `data` may come from an untrusted source: pickled
+    values are rejected and classes stored by name must be node or
+    transform classes from modules that are already imported (else
+    `FormatError` is raised).
+    """
+    return DoctreeImage(data, safe).root()
+
+def open_image(path):
+    """
+    Return a `DoctreeImage` for the file `path` (mapped into memory; the
+    file is read on demand).
+    """
+    f = open(path, 'rb')
+    try:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        f.close()
+    return DoctreeImage(data)
+
+
+class _Serializer(object):
+
+    def __init__(self, safe=False):
+        self.safe = safe                # see `dumps()`
+        self.strings = {}               # string -> index
+        self.classes = {}               # node class -> string index
+        self.string_list = []
+        self.node_index = {}            # id(node) -> index
+        self.records = []               # [kind, node, descendants, parent]
+        self.roots = []                 # record indices of root nodes
+
+    def serialize(self, root):
+        self.add_tree(root)
+        data = bytearray()
+        offsets = []
+        i = 0
+        # The records list grows if nodes outside the tree are referenced:
+        while i < len(self.records):
+            offsets.append(len(data))
+            self.write_record(data, *self.records[i])
+            i += 1
+        offsets.append(len(data))
+        roots = bytearray()
+        self.write_integer(roots, len(self.roots))
+        for index in self.roots:
+            self.write_integer(roots, index)
+            parent = self.records[index][1].parent
+            if index == 0:
+                parent = None           # not part of the serialized tree
+            self.write_value(roots, parent)
+        strings = [string.encode('utf-8', _encoding_errors)
+                   if isinstance(string, unicode) else string
+                   for string in self.string_list]
+        string_table_offset = _header.size
+        string_offset = (string_table_offset
+                         + _offset.size * (len(strings) + 1))
+        chunks = []
+        for string in strings:
+            chunks.append(_offset.pack(string_offset))
+            string_offset += len(string)
+        chunks.append(_offset.pack(string_offset))
+        chunks.extend(strings)
+        node_table_offset = string_offset
+        record_offset = node_table_offset + _offset.size * len(offsets)
+        chunks.extend([_offset.pack(record_offset + offset)
+                       for offset in offsets])
+        chunks.append(bytes(data))
+        root_table_offset = record_offset + len(data)
+        chunks.append(bytes(roots))
+        header = _header.pack(
+            MAGIC, FORMAT_VERSION, len(self.records), len(strings),
+            string_table_offset, node_table_offset, root_table_offset)
+        return header + b''.join(chunks)
+
+    def add_tree(self, root):
+        """Number the nodes of the tree of `root` in document order."""
+        records = self.records
+        node_index = self.node_index
+        self.roots.append(len(records))
+        stack = [(root, root.parent)]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, int):   # end of the subtree of a record
+                records[item][2] = len(records) - item - 1
+                continue
+            node, parent = item
+            if id(node) in node_index:
+                records.append([REFERENCE, node, 0, parent])
+                continue
+            node_index[id(node)] = len(records)
+            if isinstance(node, nodes.Text):
+                records.append([TEXT, node, 0, parent])
+                continue
+            stack.append(len(records))
+            records.append([ELEMENT, node, 0, parent])
+            stack.extend([(child, node) for child in reversed(node.children)])
+
+    def index(self, node):
+        """Return the index of `node`, add its tree if required."""
+        try:
+            return self.node_index[id(node)]
+        except KeyError:
+            pass
+        top = node
+        while (top.parent is not None
+               and id(top.parent) not in self.node_index):
+            top = top.parent
+        self.add_tree(top)
+        return self.node_index[id(node)]
+
+    def string(self, string):
+        try:
+            return self.strings[string]
+        except KeyError:
+            index = self.strings[string] = len(self.string_list)
+            self.string_list.append(string)
+            return index
+
+    def write_record(self, data, kind, node, descendants, parent):
+        data.append(kind)
+        if kind == REFERENCE:
+            self.write_integer(data, self.node_index[id(node)])
+            return
+        try:
+            class_index = self.classes[node.__class__]
+        except KeyError:
+            name = _global_name(node.__class__)
+            if name is None:
+                raise SerializationError(
+                    'cannot serialize instances of %r' % node.__class__)
+            class_index = self.classes[node.__class__] = self.string(name)
+        self.write_integer(data, class_index)
+        if kind == TEXT:
+            self.write_integer(data, self.string(unicode(node)))
+            extras = dict(node.__dict__)
+            extras.pop('parent', None)
+            rawsource = extras.pop('rawsource', _absent)
+            source = extras.pop('source', _absent)
+            line = extras.pop('line', _absent)
+            document = extras.pop('document', _absent)
+            attributes = _absent
+        else:
+            self.write_integer(data, descendants)
+            rawsource, source, line, document, attributes = (
+                node.rawsource, node.source, node.line, node.document,
+                node._attributes)
+            # Leave out default values:
+            if rawsource == '':
+                rawsource = _absent
+            if source is None:
+                source = _absent
+            if line is None:
+                line = _absent
+            if document is None:
+                document = _absent
+            if not attributes:
+                attributes = _absent
+            extras = node.__dict__
+            if isinstance(node, nodes.document):
+                extras = dict(extras)
+                for name in _document_omitted:
+                    if name in extras:
+                        extras[name] = None
+        flags = 0
+        values = []
+        for flag, value in ((RAWSOURCE, rawsource), (SOURCE, source),
+                            (LINE, line)):
+            if value is not _absent:
+                flags |= flag
+                values.append(value)
+        if document is self.records[0][1]:
+            flags |= ROOT_DOCUMENT
+        elif document is not _absent:
+            flags |= DOCUMENT
+            values.append(document)
+        if attributes is not _absent:
+            flags |= ATTRIBUTES
+            values.append(attributes)
+        if extras:
+            flags |= EXTRAS
+            values.append(extras)
+        if node.parent is not parent:
+            flags |= PARENT
+            values.append(node.parent)
+        data.append(flags)
+        for value in values:
+            self.write_value(data, value)
+
+    def write_integer(self, data, value):
+        while value > 0x7f:
+            data.append(0x80 | (value & 0x7f))
+            value >>= 7
+        data.append(value)
+
+    def write_value(self, data, value):
+        value_type = type(value)
+        if value_type is unicode:
+            data.append(TEXT_STRING)
+            index = self.strings.get(value)
+            if index is None:
+                index = self.string(value)
+            if index < 0x80:
+                data.append(index)
+            else:
+                self.write_integer(data, index)
+        elif value is None:
+            data.append(NONE)
+        elif value_type is _native_type:
+            data.append(NATIVE_STRING)
+            self.write_integer(data, self.string(value))
+        elif value_type is bool:
+            data.append(value and TRUE or FALSE)
+        elif value_type in _integer_types:
+            if value >= 0:
+                data.append(INTEGER)
+                self.write_integer(data, value)
+            else:
+                data.append(NEGATIVE)
+                self.write_integer(data, -value)
+        elif value_type is list or value_type is tuple:
+            data.append(value_type is list and LIST or TUPLE)
+            self.write_integer(data, len(value))
+            for item in value:
+                self.write_value(data, item)
+        elif value_type is dict or value_type is Counter:
+            data.append(value_type is dict and DICT or COUNTER)
+            self.write_integer(data, len(value))
+            for item in value.items():
+                self.write_value(data, item[0])
+                self.write_value(data, item[1])
+        elif isinstance(value, nodes.Node):
+            data.append(NODE)
+            self.write_integer(data, self.index(value))
+        elif value_type is float:
+            data.append(FLOAT)
+            data.extend(_float.pack(value))
+        elif value_type is bytes:
+            data.append(BYTES)
+            self.write_integer(data, len(value))
+            data.extend(value)
+        elif _global_name(value) and (not self.safe or (
+            isinstance(value, type) and issubclass(value, _safe_classes))):
+            data.append(GLOBAL)
+            self.write_integer(data, self.string(_global_name(value)))
+        elif self.safe and value_type is nodes.reprunicode:
+            # Python 2 (e.g. the "source" attribute): stored as text
+            self.write_value(data, unicode(value))
+        elif self.safe:
+            raise SerializationError('cannot serialize %s value safely'
+                                     % type(value).__name__)
+        else:
+            try:
+                pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+            except Exception as error:
+                raise SerializationError('cannot serialize %s value: %s'
+                                         % (type(value).__name__, error))
+            data.append(PICKLE)
+            self.write_integer(data, len(pickled))
+            data.extend(pickled)
+
+
+def _global_name(value):
+    """
+    Return "<module>:<qualified name>" for classes and functions that can
+    be imported by name, else None.
+    """
+    if not isinstance(value, (type, types.FunctionType,
+                              types.BuiltinFunctionType)):
+        return None
+    module = getattr(value, '__module__', None)
+    name = getattr(value, '__qualname__', None) or getattr(
+        value, '__name__', None)
+    if not module or not name or module not in sys.modules:
+        return None
+    if (not hasattr(value, '__qualname__')
+        and getattr(sys.modules[module], name, None) is not value):
+        # Python 2: look for a class attribute (nested class)
+        for outer_name, outer in vars(sys.modules[module]).items():
+            if (isinstance(outer, type)
+                and outer.__dict__.get(name) is value):
+                name = '%s.%s' % (outer_name, name)
+                break
+    name = '%s:%s' % (module, name)
+    try:
+        if _import_global(name) is value:
+            return name
+    except AttributeError:
+        pass
+    return None
+
+def _import_global(name):
+    """Return the class or function `name` (see `_global_name()`)."""
+    module_name, name = name.split(':')
+    __import__(module_name)
+    value = sys.modules[module_name]
+    for part in name.split('.'):
+        value = getattr(value, part)
+    return value
+
+
+class DoctreeImage(object):
+
+    """
+    Serialized document tree (see `dumps()`) with on-demand decoding.
+
+    Nodes are identified by their index (document order, the root has
+    index 0).  `root()` returns the complete node tree, `subtree()` the
+    tree of one node.
+    """
+
+    def __init__(self, data, safe=False):
+        """
+        `data` is the serialized document tree (a byte string or another
+        object supporting the buffer protocol, e.g. a memory map).
+        If `safe` is true, `data` may come from an untrusted source (see
+        `loads()`).
+        """
+        self.safe = safe
+        if sys.version_info < (3, 0):
+            data = bytearray(data)      # items are integers
+        self.data = data
+        if len(data) < _header.size:
+            raise FormatError('data too short')
+        (magic, version, self.node_count, self.string_count,
+         self.string_table_offset, self.node_table_offset,
+         self.root_table_offset) = _header.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise FormatError('not a serialized document tree')
+        if version != FORMAT_VERSION:
+            raise FormatError('unsupported format version %d' % version)
+        self.offsets = struct.unpack_from(
+            '<%dI' % self.node_count, data, self.node_table_offset)
+        """Offsets of the node records."""
+        self.strings = [None] * self.string_count
+        self.classes = {}               # string index -> class
+        self.nodes = [None] * self.node_count
+        """Materialized nodes."""
+        self.range = (0, self.node_count)
+        """Nodes outside this range are not materialized."""
+
+    def __len__(self):
+        """Return the number of nodes."""
+        return self.node_count
+
+    def string(self, index):
+        """Return string `index` (decoded on first use)."""
+        string = self.strings[index]
+        if string is None:
+            string = self.strings[index] = self.raw_string(index).decode(
+                'utf-8', _encoding_errors)
+        return string
+
+    def raw_string(self, index):
+        """Return string `index` as stored (a byte string)."""
+        start, end = struct.unpack_from(
+            '<2I', self.data, self.string_table_offset + 4 * index)
+        return bytes(self.data[start:end])
+
+    def class_name(self, index):
+        """Return the qualified class name of node `index`."""
+        kind, pos = self.record_kind(index)
+        if kind == REFERENCE:
+            return self.class_name(self.read_integer(pos)[0])
+        return self.string(self.read_integer(pos)[0]).replace(':', '.')
+
+    def record_kind(self, index):
+        if index < 0:
+            raise IndexError('node index out of range')
+        pos = self.offsets[index]
+        return self.data[pos], pos + 1
+
+    def subtree_end(self, index):
+        """Return the index after the last descendant of node `index`."""
+        kind, pos = self.record_kind(index)
+        if kind != ELEMENT:
+            return index + 1
+        pos = self.read_integer(pos)[1]
+        return index + 1 + self.read_integer(pos)[0]
+
+    def children(self, index):
+        """Return the indices of the children of node `index`."""
+        end = self.subtree_end(index)
+        children = []
+        child = index + 1
+        while child < end:
+            children.append(child)
+            child = self.subtree_end(child)
+        return children
+
+    def root(self):
+        """Return the root node with its complete tree."""
+        self.nodes = [None] * self.node_count
+        self.range = (0, self.node_count)
+        node = self.materialize(0, self.node_count)
+        # Add the trees of referenced nodes and their parents:
+        roots_pos = self.root_table_offset
+        count, roots_pos = self.read_integer(roots_pos)
+        for i in range(count):
+            index, roots_pos = self.read_integer(roots_pos)
+            parent, roots_pos = self.read_value(roots_pos)
+            self.nodes[index].parent = parent
+        return node
+
+    def subtree(self, index):
+        """
+        Return a copy of node `index` with its descendants.
+
+        The node has no parent.  References to nodes outside the subtree
+        (e.g. the ``document`` attribute) are None.
+        """
+        self.nodes = [None] * self.node_count
+        self.range = (index, self.subtree_end(index))
+        try:
+            node = self.materialize(*self.range)
+            node.parent = None
+        finally:
+            self.nodes = [None] * self.node_count
+            self.range = (0, self.node_count)
+        return node
+
+    def materialize(self, start, end):
+        """
+        Materialize the nodes `start` to `end` (the trees of one or more
+        roots) and return the first.
+        """
+        data = self.data
+        offsets = self.offsets
+        materialized = self.nodes
+        stack = []                      # (element, end index)
+        for index in range(start, end):
+            while stack and stack[-1][1] <= index:
+                stack.pop()
+            pos = offsets[index]
+            kind = data[pos]
+            pos += 1
+            if kind == REFERENCE:
+                node = self.node(self.read_integer(pos)[0])
+                if stack:
+                    stack[-1][0].children.append(node)
+                continue
+            node = materialized[index]
+            if node is None:
+                node = self.node(index)
+            if stack:
+                node.parent = stack[-1][0]
+                stack[-1][0].children.append(node)
+            else:
+                node.parent = None
+            if kind == ELEMENT:
+                subtree_end = index + 1 + self.fill_element(node, pos)
+                if subtree_end > index + 1:
+                    stack.append((node, subtree_end))
+            else:
+                self.fill_text(node, pos)
+        return materialized[start]
+
+    def node(self, index):
+        """
+        Return node `index`, create it (without attributes and children)
+        if required.  Return None for nodes outside of `self.range`.
+        """
+        node = self.nodes[index]
+        if node is not None:
+            return node
+        if not self.range[0] <= index < self.range[1]:
+            return None
+        kind, pos = self.record_kind(index)
+        if kind == REFERENCE:
+            return self.node(self.read_integer(pos)[0])
+        class_index, pos = self.read_integer(pos)
+        try:
+            cls = self.classes[class_index]
+        except KeyError:
+            cls = self.classes[class_index] = self.import_class(
+                self.string(class_index), nodes.Node)
+        if kind == TEXT:
+            node = cls.__new__(cls, self.string(self.read_integer(pos)[0]))
+        else:
+            node = cls.__new__(cls)
+        self.nodes[index] = node
+        return node
+
+    def import_class(self, name, base):
+        """
+        Return the class or function `name` (see `_global_name()`).  In
+        "safe" mode, only subclasses of `base` from modules that are
+        already imported are returned.
+        """
+        if not self.safe:
+            return _import_global(name)
+        if name.split(':')[0] not in sys.modules:
+            raise FormatError('module of %s not imported' % name)
+        try:
+            value = _import_global(name)
+        except (AttributeError, ValueError):
+            value = None
+        if not (isinstance(value, type) and issubclass(value, base)):
+            raise FormatError('unsafe class %s' % name)
+        return value
+
+    def fill_element(self, node, pos):
+        """
+        Set the attributes of `node` from the record at `pos`; return the
+        number of descendants.
+        """
+        pos = self.read_integer(pos)[1]     # class
+        descendants, pos = self.read_integer(pos)
+        flags = self.data[pos]
+        pos += 1
+        read_value = self.read_value
+        node.children = []
+        if flags & RAWSOURCE:
+            node.rawsource, pos = read_value(pos)
+        else:
+            node.rawsource = ''
+        if flags & SOURCE:
+            node.source, pos = read_value(pos)
+        else:
+            node.source = None
+        if flags & LINE:
+            node.line, pos = read_value(pos)
+        else:
+            node.line = None
+        if flags & DOCUMENT:
+            node.document, pos = read_value(pos)
+        elif flags & ROOT_DOCUMENT:
+            node.document = self.node(0)
+        else:
+            node.document = None
+        if flags & ATTRIBUTES:
+            node._attributes, pos = read_value(pos)
+        else:
+            node._attributes = {}
+        if flags & EXTRAS:
+            extras, pos = read_value(pos)
+            node.__dict__.update(extras)
+        if flags & PARENT:
+            node.parent, pos = read_value(pos)
+        return descendants
+
+    def fill_text(self, node, pos):
+        """Set the attributes of `node` from the record at `pos`."""
+        pos = self.read_integer(pos)[1]     # class
+        pos = self.read_integer(pos)[1]     # text
+        flags = self.data[pos]
+        pos += 1
+        read_value = self.read_value
+        fields = node.__dict__
+        if flags & RAWSOURCE:
+            fields['rawsource'], pos = read_value(pos)
+        if flags & SOURCE:
+            fields['source'], pos = read_value(pos)
+        if flags & LINE:
+            fields['line'], pos = read_value(pos)
+        if flags & DOCUMENT:
+            fields['document'], pos = read_value(pos)
+        elif flags & ROOT_DOCUMENT:
+            fields['document'] = self.node(0)
+        if flags & EXTRAS:
+            extras, pos = read_value(pos)
+            fields.update(extras)
+        if flags & PARENT:
+            fields['parent'], pos = read_value(pos)
+
+    def read_integer(self, pos):
+        data = self.data
+        byte = data[pos]
+        if byte < 0x80:
+            return byte, pos + 1
+        value = byte & 0x7f
+        shift = 7
+        while True:
+            pos += 1
+            byte = data[pos]
+            value |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return value, pos + 1
+            shift += 7
+
+    def read_value(self, pos):
+        """Return the value at `pos` and the position after it."""
+        data = self.data
+        tag = data[pos]
+        pos += 1
+        if tag == TEXT_STRING:
+            index = data[pos]
+            if index < 0x80:
+                pos += 1
+            else:
+                index, pos = self.read_integer(pos)
+            string = self.strings[index]
+            if string is None:
+                string = self.string(index)
+            return string, pos
+        if tag == NONE:
+            return None, pos
+        if tag == INTEGER:
+            value = data[pos]
+            if value < 0x80:
+                return value, pos + 1
+            return self.read_integer(pos)
+        if tag == LIST or tag == TUPLE:
+            count, pos = self.read_integer(pos)
+            items = []
+            for i in range(count):
+                item, pos = self.read_value(pos)
+                items.append(item)
+            if tag == TUPLE:
+                items = tuple(items)
+            return items, pos
+        if tag == DICT or tag == COUNTER:
+            count, pos = self.read_integer(pos)
+            items = {} if tag == DICT else Counter()
+            for i in range(count):
+                key, pos = self.read_value(pos)
+                items[key], pos = self.read_value(pos)
+            return items, pos
+        if tag == NODE:
+            index, pos = self.read_integer(pos)
+            return self.node(index), pos
+        if tag == FALSE:
+            return False, pos
+        if tag == TRUE:
+            return True, pos
+        if tag == NATIVE_STRING:
+            index, pos = self.read_integer(pos)
+            if _native_type is None:
+                return self.string(index), pos
+            return self.raw_string(index), pos
+        if tag == NEGATIVE:
+            value, pos = self.read_integer(pos)
+            return -value, pos
+        if tag == FLOAT:
+            return _float.unpack_from(data, pos)[0], pos + _float.size
+        if tag == PICKLE and self.safe:
+            raise FormatError('unsafe pickled value')
+        if tag == BYTES or tag == PICKLE:
+            size, pos = self.read_integer(pos)
+            value = bytes(data[pos:pos+size])
+            if tag == PICKLE:
+                value = pickle.loads(value)
+            return value, pos + size
+        if tag == GLOBAL:
+            index, pos = self.read_integer(pos)
+            return self.import_class(self.string(index), _safe_classes), pos
+        raise FormatError('unknown value tag %d' % tag)
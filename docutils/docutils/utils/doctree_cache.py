@@ -0,0 +1,175 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+On-disk cache of document trees (see the "doctree_cache" setting).
+
+The cache is a directory with one entry file per source (see
+`DoctreeCache.key()`).  An entry holds a list of variants: the document
+tree read with different settings or dependencies, together with the data
+required to check whether it can be reused (see
+`docutils.core.Publisher.read_cached()`).
+
+Entries are serialized elements (see `docutils.utils.binary_doctree`)
+with the list of variants as "variants" attribute.  They are stored and
+loaded in "safe" mode, so that entries written by others cannot run
+code: values that would require pickling are not stored (`put()` raises
+`binary_doctree.SerializationError`) and such entries are not loaded.
+
+Using an entry updates its modification time; if the cache grows beyond
+its size limit, the least recently used entries are removed.  The size
+of the cache is scanned once per process and directory and then updated
+with the entries stored; it is scanned again when it exceeds the limit.
+"""
+
+__docformat__ = 'reStructuredText'
+
+import hashlib
+import os
+import tempfile
+import threading
+
+from docutils import nodes
+from docutils.utils import binary_doctree
+
+
+class DoctreeCache(object):
+
+    """
+    Store and retrieve lists of variants in a cache directory.
+    """
+
+    suffix = '.doctree'
+    """File name suffix of cache entries."""
+
+    max_variants = 8
+    """Maximal number of variants stored per entry."""
+
+    _sizes = {}
+    """Size of the cache directories (by absolute path) known so far."""
+
+    _lock = threading.Lock()
+
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        """Path to the cache directory (created if required)."""
+
+        self.max_size = max_size
+        """Size limit of the cache in bytes."""
+
+    def key(self, *parts):
+        """Return the entry key (a hexadecimal digest) for `parts`."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(repr(part).encode('ascii', 'backslashreplace'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def text_digest(self, text):
+        """Return a digest of the (unicode) `text`."""
+        return hashlib.sha256(
+            text.encode('utf-8', 'backslashreplace')).hexdigest()
+
+    def file_digest(self, path):
+        """Return a digest of the content of file `path` or None."""
+        digest = hashlib.sha256()
+        try:
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 16), b''):
+                    digest.update(block)
+        except EnvironmentError:
+            return None
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key):
+        """
+        Return the list of variants stored for `key` (empty, if there is
+        no such entry) and mark the entry as used.
+        """
+        path = self.entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            variants = binary_doctree.loads(data, safe=True)['variants']
+            os.utime(path, None)
+        except Exception:               # missing or unusable entry
+            return []
+        if not isinstance(variants, list):
+            return []
+        return variants
+
+    def put(self, key, variants):
+        """
+        Store `variants` (a list, most recent first) for `key`, then remove
+        least recently used entries if the cache is too large.
+
+        Raise `binary_doctree.SerializationError` if `variants` contain
+        values that cannot be stored safely.
+        """
+        data = binary_doctree.dumps(
+            nodes.Element(variants=variants[:self.max_variants]), safe=True)
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        path = self.entry_path(key)
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            try:
+                replaced_size = os.path.getsize(path)
+            except OSError:
+                replaced_size = 0
+            if replaced_size and os.name == 'nt':
+                os.remove(path)
+            os.rename(temp_path, path)
+        except:
+            os.remove(temp_path)
+            raise
+        directory = os.path.abspath(self.directory)
+        with self._lock:
+            size = self._sizes.get(directory)
+            if size is not None:
+                size = self._sizes[directory] = (
+                    size + len(data) - replaced_size)
+        if size is None or size > self.max_size:
+            self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used entries until the size of the cache is
+        within its limit.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.suffix):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:             # removed in the meantime
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        size = sum([entry_size for (mtime, entry_size, path) in entries])
+        for mtime, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= entry_size
+        with self._lock:
+            self._sizes[os.path.abspath(self.directory)] = size
+
+    def clear(self):
+        """Remove all entries."""
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(self.suffix):
+                    os.remove(os.path.join(self.directory, name))
+        with self._lock:
+            self._sizes[os.path.abspath(self.directory)] = 0
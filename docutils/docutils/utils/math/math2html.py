@@ -26,6 +26,7 @@ import gettext
 import io
 import os.path
 import sys
+import threading
 import unicodedata
 
 if sys.version_info >= (3, 0):
@@ -2434,6 +2435,21 @@ class TaggedText(Container):
     __str__ = __unicode__
 
 
+class ThreadLocalParameter(object):
+  "A parameter with a separate value in every thread."
+
+  def __init__(self, default):
+    self.default = default
+    self.local = threading.local()
+
+  def __get__(self, instance, owner):
+    "Get the value for the current thread."
+    return getattr(self.local, 'value', self.default)
+
+  def set(self, value):
+    "Set the value for the current thread."
+    self.local.value = value
+
 class DocumentParameters(object):
   "Global parameters for the document."
 
@@ -2445,7 +2461,12 @@ class DocumentParameters(object):
   language = None
   bibliography = None
   outputchanges = False
-  displaymode = False
+  displaymode = ThreadLocalParameter(False)
+
+  @classmethod
+  def setdisplaymode(cls, displaymode):
+    "Set the display mode of formulas converted in the current thread."
+    cls.__dict__['displaymode'].set(displaymode)
 
 
 
@@ -2916,9 +2937,9 @@ class Formula(Container):
   def process(self):
     "Convert the formula to tags"
     if self.header[0] == 'inline':
-      DocumentParameters.displaymode = False
+      DocumentParameters.setdisplaymode(False)
     else:
-      DocumentParameters.displaymode = True
+      DocumentParameters.setdisplaymode(True)
       self.output.settag('div class="formula"', True)
     if Options.jsmath:
       self.jsmath()
@@ -5360,8 +5381,11 @@ FormulaCommand.types += [
 
 
 
-def math2html(formula):
+def math2html(formula, displaymode=None):
   "Convert some TeX math to HTML."
+  # set the display mode (for the current thread) unless displaymode is None
+  if displaymode is not None:
+    DocumentParameters.setdisplaymode(displaymode)
   factory = FormulaFactory()
   whole = factory.parseformula(formula)
   FormulaProcessor().process(whole)
@@ -14,6 +14,10 @@
 
 # Wrappers for TeX->MathML conversion by external tools
 # =====================================================
+#
+# The converters run as subprocesses; `Popen.communicate()` exchanges the
+# data without blocking on full pipes (several conversions may run at the
+# same time in worker threads, see docutils/core_async.py).
 
 from __future__ import print_function
 import subprocess
@@ -39,10 +43,9 @@ def latexml(math_code, reporter=None):
                             stdout=subprocess.PIPE,
                             stderr=subprocess.PIPE,
                             close_fds=True)
-    p.stdin.write((document_template % math_code).encode('utf8'))
-    p.stdin.close()
-    latexml_code = p.stdout.read()
-    latexml_err = p.stderr.read().decode('utf8')
+    latexml_code, latexml_err = p.communicate(
+        (document_template % math_code).encode('utf8'))
+    latexml_err = latexml_err.decode('utf8')
     if reporter and (latexml_err.find('Error') >= 0 or not latexml_code):
         reporter.error(latexml_err)
 
@@ -57,10 +60,9 @@ def latexml(math_code, reporter=None):
                               stdout=subprocess.PIPE,
                               stderr=subprocess.PIPE,
                               close_fds=True)
-    post_p.stdin.write(latexml_code)
-    post_p.stdin.close()
-    result = post_p.stdout.read().decode('utf8')
-    post_p_err = post_p.stderr.read().decode('utf8')
+    result, post_p_err = post_p.communicate(latexml_code)
+    result = result.decode('utf8')
+    post_p_err = post_p_err.decode('utf8')
     if reporter and (post_p_err.find('Error') >= 0 or not result):
         reporter.error(post_p_err)
 
@@ -85,10 +87,9 @@ def ttm(math_code, reporter=None):
                          stdout=subprocess.PIPE,
                          stderr=subprocess.PIPE,
                          close_fds=True)
-    p.stdin.write((document_template % math_code).encode('utf8'))
-    p.stdin.close()
-    result = p.stdout.read()
-    err = p.stderr.read().decode('utf8')
+    result, err = p.communicate(
+        (document_template % math_code).encode('utf8'))
+    err = err.decode('utf8')
     if err.find('**** Unknown') >= 0:
         msg = '\n'.join([line for line in err.splitlines()
                          if line.startswith('****')])
@@ -123,10 +124,9 @@ def blahtexml(math_code, inline=True, reporter=None):
                          stdout=subprocess.PIPE,
                          stderr=subprocess.PIPE,
                          close_fds=True)
-    p.stdin.write(math_code.encode('utf8'))
-    p.stdin.close()
-    result = p.stdout.read().decode('utf8')
-    err = p.stderr.read().decode('utf8')
+    result, err = p.communicate(math_code.encode('utf8'))
+    result = result.decode('utf8')
+    err = err.decode('utf8')
 
     if result.find('<error>') >= 0:
         raise SyntaxError('\nMessage from external converter blahtexml:\n'
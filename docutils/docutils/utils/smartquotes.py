@@ -493,11 +493,15 @@ class smartchars(object):
               'zh-tw':        u'「」『』',
              }
 
-    def __init__(self, language='en'):
+    def __init__(self, language='en', quotes=None):
+        # `quotes`: mapping of language tags to quote characters
+        # (default: the class attribute `quotes`)
         self.language = language
+        if quotes is None:
+            quotes = self.quotes
         try:
             (self.opquote, self.cpquote,
-             self.osquote, self.csquote) = self.quotes[language.lower()]
+             self.osquote, self.csquote) = quotes[language.lower()]
         except KeyError:
             self.opquote, self.cpquote, self.osquote, self.csquote = u'""\'\''
 
@@ -509,8 +513,12 @@ def smartyPants(text, attr=default_smartypants_attr, language='en'):
                                               attr, language)])
 
 
-def educate_tokens(text_tokens, attr=default_smartypants_attr, language='en'):
+def educate_tokens(text_tokens, attr=default_smartypants_attr, language='en',
+                   quotes=None):
     """Return iterator that "educates" the items of `text_tokens`.
+
+    `quotes` is a mapping of language tags to quote characters replacing
+    `smartchars.quotes` (this leaves the shared class attribute unchanged).
     """
 
     # Parse attributes:
@@ -602,19 +610,19 @@ def educate_tokens(text_tokens, attr=default_smartypants_attr, language='en'):
 
         # Note: backticks need to be processed before quotes.
         if do_backticks:
-            text = educateBackticks(text, language)
+            text = educateBackticks(text, language, quotes)
 
         if do_backticks == 2:
-            text = educateSingleBackticks(text, language)
+            text = educateSingleBackticks(text, language, quotes)
 
         if do_quotes:
             # Replace plain quotes in context to prevent converstion to
             # 2-character sequence in French.
             context = prev_token_last_char.replace('"', ';').replace("'", ';')
-            text = educateQuotes(context+text, language)[1:]
+            text = educateQuotes(context+text, language, quotes)[1:]
 
         if do_stupefy:
-            text = stupefyEntities(text, language)
+            text = stupefyEntities(text, language, quotes)
 
         # Remember last char as context for the next token
         prev_token_last_char = last_char
@@ -625,17 +633,19 @@ def educate_tokens(text_tokens, attr=default_smartypants_attr, language='en'):
 
 
 
-def educateQuotes(text, language='en'):
+def educateQuotes(text, language='en', quotes=None):
     """
     Parameter:  - text string (unicode or bytes).
                 - language (`BCP 47` language tag.)
+                - quotes (mapping of language tags to quote characters,
+                  default `smartchars.quotes`.)
     Returns:    The `text`, with "educated" curly quote characters.
 
     Example input:  "Isn't this fun?"
     Example output: “Isn’t this fun?“;
     """
 
-    smart = smartchars(language)
+    smart = smartchars(language, quotes)
     ch_classes = {'open': u'[(\[{]', # opening braces
                   'close': r'[^\s]', # everything except whitespace
                   'punct': r"""[-!"#\$\%'()*+,.\/:;<=>?\@\[\\\]\^_`{|}~]""",
@@ -720,7 +730,7 @@ def educateQuotes(text, language='en'):
     return text
 
 
-def educateBackticks(text, language='en'):
+def educateBackticks(text, language='en', quotes=None):
     """
     Parameter:  String (unicode or bytes).
     Returns:    The `text`, with ``backticks'' -style double quotes
@@ -728,14 +738,14 @@ def educateBackticks(text, language='en'):
     Example input:  ``Isn't this fun?''
     Example output: “Isn't this fun?“;
     """
-    smart = smartchars(language)
+    smart = smartchars(language, quotes)
 
     text = re.sub(r"""``""", smart.opquote, text)
     text = re.sub(r"""''""", smart.cpquote, text)
     return text
 
 
-def educateSingleBackticks(text, language='en'):
+def educateSingleBackticks(text, language='en', quotes=None):
     """
     Parameter:  String (unicode or bytes).
     Returns:    The `text`, with `backticks' -style single quotes
@@ -744,7 +754,7 @@ def educateSingleBackticks(text, language='en'):
     Example input:  `Isn't this fun?'
     Example output: ‘Isn’t this fun?’
     """
-    smart = smartchars(language)
+    smart = smartchars(language, quotes)
 
     text = re.sub(r"""`""", smart.osquote, text)
     text = re.sub(r"""'""", smart.csquote, text)
@@ -811,7 +821,7 @@ def educateEllipses(text):
     return text
 
 
-def stupefyEntities(text, language='en'):
+def stupefyEntities(text, language='en', quotes=None):
     """
     Parameter:  String (unicode or bytes).
     Returns:    The `text`, with each SmartyPants character translated to
@@ -820,7 +830,7 @@ def stupefyEntities(text, language='en'):
     Example input:  “Hello — world.”
     Example output: "Hello -- world."
     """
-    smart = smartchars(language)
+    smart = smartchars(language, quotes)
 
     text = re.sub(smart.endash, "-", text)   # en-dash
     text = re.sub(smart.emdash, "--", text)  # em-dash
@@ -0,0 +1,152 @@
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Timing and memory instrumentation of the processing stages of a
+`docutils.core.Publisher` (see the "profile_stages" setting).
+
+A `StageProfiler` records one entry per stage: reading (decoding and
+parsing), every single transform, the writer's translation, and the
+output encoding.  Each record holds the wall time, the CPU time, and the
+peak of the memory allocated during the stage (traced with `tracemalloc`,
+not available with Python 2).
+
+The components call the profiler only if one is set, so profiling costs
+nothing when disabled.
+"""
+
+__docformat__ = 'reStructuredText'
+
+import json
+import time
+
+try:
+    import tracemalloc
+except ImportError:                     # Python 2
+    tracemalloc = None
+
+try:
+    wall_clock = time.perf_counter
+    cpu_clock = time.process_time
+except AttributeError:                  # Python 2
+    wall_clock = time.time
+    cpu_clock = time.clock
+
+
+class StageProfiler(object):
+
+    """
+    Measure processing stages and report the results.
+
+    Usage::
+
+        profiler = StageProfiler()
+        profiler.start()
+        with profiler.stage('read', name='reader'):
+            ...
+        profiler.stop()
+        print(profiler.report())
+    """
+
+    def __init__(self, trace_memory=True):
+        self.records = []
+        """List of records (dictionaries), one per stage, in order.
+
+        Keys: 'stage' (stage name), 'wall_time' and 'cpu_time' (seconds),
+        'peak_memory' (bytes, or None if memory is not traced), and the
+        details passed to `stage()`."""
+
+        self.trace_memory = trace_memory and tracemalloc is not None
+        """Measure the memory allocated during a stage?"""
+
+        self._tracing = False
+        """Did `start()` start tracing memory allocations?"""
+
+    def start(self):
+        """Start tracing memory allocations, if required."""
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+
+    def stop(self):
+        """Stop tracing memory allocations, if started by `start()`."""
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def stage(self, stage, **details):
+        """
+        Return a context manager measuring the stage `stage`.  `details`
+        are stored in the record.
+        """
+        return Stage(self, stage, details)
+
+    def total(self, key):
+        """Return the sum of the values of `key` of all records."""
+        return sum([record[key] or 0 for record in self.records])
+
+    def as_json(self):
+        """Return the records as JSON text."""
+        return json.dumps({'stages': self.records}, indent=1, sort_keys=True)
+
+    def report(self):
+        """Return the records as a table (text)."""
+        lines = ['::: Stage profile (wall time [ms], CPU time [ms], '
+                 'peak memory [KiB], stage):']
+        for record in self.records:
+            lines.append('%10.3f %10.3f %10s  %s' % (
+                record['wall_time'] * 1e3, record['cpu_time'] * 1e3,
+                kibibytes(record['peak_memory']), describe(record)))
+        lines.append('%10.3f %10.3f %10s  total' % (
+            self.total('wall_time') * 1e3, self.total('cpu_time') * 1e3, ''))
+        return '\n'.join(lines) + '\n'
+
+
+class Stage(object):
+
+    """Context manager measuring one stage (see `StageProfiler.stage()`)."""
+
+    def __init__(self, profiler, stage, details):
+        self.profiler = profiler
+        self.record = dict(details, stage=stage)
+
+    def __enter__(self):
+        self.memory = None
+        if self.profiler.trace_memory and tracemalloc.is_tracing():
+            if hasattr(tracemalloc, 'reset_peak'):  # Python >= 3.9
+                tracemalloc.reset_peak()
+                self.memory = tracemalloc.get_traced_memory()[0]
+            elif self.profiler._tracing:
+                # Forget earlier allocations to reset the peak.
+                tracemalloc.clear_traces()
+                self.memory = 0
+        self.cpu_time = cpu_clock()
+        self.wall_time = wall_clock()
+        return self.record
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        wall_time = wall_clock() - self.wall_time
+        cpu_time = cpu_clock() - self.cpu_time
+        peak_memory = None
+        if self.memory is not None:
+            peak_memory = tracemalloc.get_traced_memory()[1] - self.memory
+        self.record.update(wall_time=wall_time, cpu_time=cpu_time,
+                           peak_memory=peak_memory)
+        self.profiler.records.append(self.record)
+
+
+def kibibytes(size):
+    if size is None:
+        return '-'
+    return '%d' % (size // 1024)
+
+def describe(record):
+    """Return a one-line description of the stage `record`."""
+    parts = [record['stage']]
+    if 'priority' in record:
+        parts.append('%03d' % record['priority'])
+    if record.get('name'):
+        parts.append(record['name'])
+    if record.get('pending'):
+        parts.append('(pending at %s)' % record['pending'])
+    return ' '.join(parts)
@@ -52,6 +52,10 @@ class Writer(Component):
     """`docutils.io` Output object; where to write the document.
     Set by `write`."""
 
+    profiler = None
+    """`docutils.utils.stage_profile.StageProfiler` measuring translation
+    and output encoding, or None."""
+
     def __init__(self):
 
         # Used by HTML and LaTeX writer for output fragments:
@@ -76,8 +80,17 @@ class Writer(Component):
             document.settings.language_code,
             document.reporter)
         self.destination = destination
-        self.translate()
-        output = self.destination.write(self.output)
+        if self.profiler is None:
+            self.translate()
+            output = self.destination.write(self.output)
+        else:
+            with self.profiler.stage('translate', name='%s.%s' % (
+                self.__class__.__module__, self.__class__.__name__)):
+                self.translate()
+            with self.profiler.stage('encode', name='%s.%s' % (
+                destination.__class__.__module__,
+                destination.__class__.__name__)):
+                output = self.destination.write(self.output)
         return output
 
     def translate(self):
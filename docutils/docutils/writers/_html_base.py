@@ -1138,8 +1138,8 @@ class HTMLTranslator(nodes.NodeVisitor):
                     utils.find_file_in_dirs(s, self.settings.stylesheet_dirs))
                     for s in self.math_output_options[0].split(',')]
             # TODO: fix display mode in matrices and fractions
-            math2html.DocumentParameters.displaymode = (math_env != '')
-            math_code = math2html.math2html(math_code)
+            math_code = math2html.math2html(math_code,
+                                            displaymode=(math_env != ''))
         elif self.math_output == 'mathml':
             if  'XHTML 1' in self.doctype:
                 self.doctype = self.doctype_mathml
@@ -75,6 +75,7 @@ what-you-see-is-what-you-get plaintext markup syntax.""",  # wrap at col 60
         'tools/rst2man.py',
         'tools/rst2xml.py',
         'tools/rst2pseudoxml.py',
+        'tools/rst2formats.py',
         'tools/rstpep2html.py',
         'tools/rst2odt.py',
         'tools/rst2odt_prepstyles.py',
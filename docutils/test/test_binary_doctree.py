@@ -0,0 +1,217 @@
+#! /usr/bin/env python
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Tests of the binary document tree serialization
+(`docutils.utils.binary_doctree`).
+"""
+
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+from collections import Counter
+
+import DocutilsTestSupport              # must be imported before docutils
+from docutils import core, frontend, nodes, utils
+from docutils.utils import binary_doctree
+
+
+functional_input = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                'functional', 'input')
+
+settings_overrides = {'_disable_config': True, 'report_level': 5}
+
+
+def node_state(node, index):
+    """
+    Return the state of `node` as a comparable value (references to nodes
+    are replaced by the node's position in `index`).
+    """
+    if isinstance(node, nodes.Text):
+        state = dict(node.__dict__)
+        state['text'] = node.astext()
+    else:
+        state = dict(node.__dict__)
+        for name in ('rawsource', 'source', 'line', 'document',
+                     '_attributes'):
+            state[name] = getattr(node, name)
+        state['children'] = node.children
+    state['parent'] = node.parent
+    for name in ('settings', 'reporter', 'transformer'):
+        state.pop(name, None)
+    return node.__class__, normalized(state, index)
+
+def normalized(value, index):
+    if isinstance(value, nodes.Node):
+        return ('node', index[id(value)])
+    if isinstance(value, (list, tuple)):
+        return (type(value), [normalized(item, index) for item in value])
+    if isinstance(value, dict):
+        return (type(value), sorted([(key, normalized(item, index))
+                                     for key, item in value.items()]))
+    return value
+
+def all_nodes(document):
+    """Return the nodes of `document` and all nodes it references."""
+    found = []
+    index = {}
+    pending = [document]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, nodes.Node):
+            if id(value) in index:
+                continue
+            index[id(value)] = len(found)
+            found.append(value)
+            pending.append(value.parent)
+            if isinstance(value, nodes.Element):
+                pending.extend(value.children)
+                pending.append(value.document)
+            pending.extend(sorted_values(value.__dict__))
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+        elif isinstance(value, dict):
+            pending.extend(sorted_values(value))
+    return found, index
+
+def sorted_values(dictionary):
+    """Return the values of `dictionary` in a reproducible order."""
+    return [item[1] for item in sorted(dictionary.items(),
+                                       key=lambda item: repr(item[0]))]
+
+
+class BinaryDoctreeTests(unittest.TestCase):
+
+    def assertSameTree(self, document, restored):
+        original_nodes, original_index = all_nodes(document)
+        restored_nodes, restored_index = all_nodes(restored)
+        self.assertEqual(len(original_nodes), len(restored_nodes))
+        for original, node in zip(original_nodes, restored_nodes):
+            self.assertEqual(node_state(original, original_index),
+                             node_state(node, restored_index))
+
+    def test_functional_input(self):
+        paths = sorted(glob.glob(os.path.join(functional_input, '*.txt')))
+        self.assertTrue(paths)
+        for path in paths:
+            f = open(path, 'rb')
+            source = f.read()
+            f.close()
+            document = core.publish_doctree(
+                source, source_path=path,
+                settings_overrides=settings_overrides)
+            restored = binary_doctree.loads(binary_doctree.dumps(document))
+            self.assertEqual(restored.pformat(), document.pformat())
+            self.assertSameTree(document, restored)
+            self.assertTrue(restored.settings is None)
+            for writer_name in ('html5', 'pseudoxml'):
+                self.assertEqual(
+                    core.publish_from_doctree(
+                        restored, writer_name=writer_name,
+                        settings_overrides=settings_overrides),
+                    core.publish_from_doctree(
+                        document, writer_name=writer_name,
+                        settings_overrides=settings_overrides))
+
+    def test_values(self):
+        document = utils.new_document(
+            'test', frontend.OptionParser().get_default_values())
+        paragraph = nodes.paragraph('', 'text')
+        document += paragraph
+        detached = nodes.emphasis('', 'detached')
+        values = [None, True, False, 0, 127, 128, 2**70, -5, 1.5, u'\xe4',
+                  b'\x00\xff', (1, [2]), {'a': {'b': None}},
+                  paragraph, detached, nodes.Element, set([1])]
+        paragraph['values'] = values
+        restored = binary_doctree.loads(binary_doctree.dumps(document))
+        restored_values = restored[0]['values']
+        self.assertEqual(restored_values[:13], values[:13])
+        self.assertTrue(restored_values[13] is restored[0])
+        self.assertEqual(restored_values[14].astext(), 'detached')
+        self.assertTrue(restored_values[15] is nodes.Element)
+        self.assertEqual(restored_values[16], set([1]))
+
+    def test_safe(self):
+        paragraph = nodes.paragraph('', 'text', values=[
+            1, (u'a', b'b'), nodes.Element, Counter('aab')])
+        restored = binary_doctree.loads(
+            binary_doctree.dumps(paragraph, safe=True), safe=True)
+        self.assertEqual(restored['values'], paragraph['values'])
+        self.assertTrue(isinstance(restored['values'][3], Counter))
+        for value in (set([1]), ValueError):
+            paragraph['values'] = value
+            self.assertRaises(binary_doctree.SerializationError,
+                              binary_doctree.dumps, paragraph, safe=True)
+            # pickled values and other classes are not loaded:
+            self.assertRaises(binary_doctree.FormatError,
+                              binary_doctree.loads,
+                              binary_doctree.dumps(paragraph), safe=True)
+        # only node classes are created:
+        data = binary_doctree.dumps(nodes.Text('text'))
+        data = data.replace(b'docutils.nodes:Text', b'collections:Counter')
+        self.assertRaises(binary_doctree.FormatError,
+                          binary_doctree.loads, data, safe=True)
+
+    def test_deep_document(self):
+        document = utils.new_document(
+            'test', frontend.OptionParser().get_default_values())
+        element = document
+        for i in range(3000):
+            element += nodes.block_quote()
+            element = element[0]
+        element += nodes.paragraph('', 'deep')
+        restored = binary_doctree.loads(binary_doctree.dumps(document))
+        depth = 0
+        element = restored
+        while element.children:
+            self.assertTrue(element[0].parent is element)
+            element = element[0]
+            depth += 1
+        self.assertEqual(depth, 3002)   # block quotes, paragraph, text
+
+    def test_image(self):
+        document = core.publish_doctree(
+            'Title\n=====\n\nSection\n-------\n\nText.\n',
+            settings_overrides={'_disable_config': True,
+                                'doctitle_xform': False})
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'document.doctree')
+            f = open(path, 'wb')
+            f.write(binary_doctree.dumps(document))
+            f.close()
+            image = binary_doctree.open_image(path)
+            self.assertEqual(image.class_name(0), 'docutils.nodes.document')
+            self.assertEqual(image.children(0), [1])
+            self.assertEqual(image.children(1), [2, 4])
+            section = image.subtree(4)
+            self.assertEqual(section.pformat(), document[0][1].pformat())
+            self.assertTrue(section.parent is None)
+            self.assertTrue(section.document is None)
+            self.assertTrue(section[0].parent is section)
+            self.assertEqual(image.root().pformat(), document.pformat())
+            del image
+        finally:
+            shutil.rmtree(directory)
+
+    def test_format_error(self):
+        data = binary_doctree.dumps(nodes.paragraph('', 'text'))
+        self.assertRaises(binary_doctree.FormatError,
+                          binary_doctree.loads, b'PICKLE' + data[6:])
+        self.assertRaises(binary_doctree.FormatError,
+                          binary_doctree.loads, data[:8] + b'\xff' + data[9:])
+
+    def test_serialization_error(self):
+        node = nodes.paragraph('', 'text', callback=lambda: None)
+        self.assertRaises(binary_doctree.SerializationError,
+                          binary_doctree.dumps, node)
+        class local_node(nodes.Element): pass
+        self.assertRaises(binary_doctree.SerializationError,
+                          binary_doctree.dumps, local_node())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+#! /usr/bin/env python
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Test concurrent publishing in threads: documents processed at the same
+time must not influence each other.
+"""
+
+import random
+import sys
+import threading
+import unittest
+from io import BytesIO
+
+import DocutilsTestSupport              # must be imported before docutils
+from docutils import core, utils
+from docutils.parsers.rst import directives, languages, roles
+
+
+documents = [
+    # local roles and a German quote customization:
+    (u'.. role:: custom(emphasis)\n\n'
+     u'.. default-role:: strong\n\n'
+     u'"Quoted" `default` and :custom:`custom`.\n',
+     {'language_code': 'de', 'smart_quotes': True,
+      'smartquotes_locales': [('de', u'\xab\xbb()')]}),
+    # the same text with the standard roles and quotes:
+    (u'"Quoted" `default` and :custom:`custom`.\n',
+     {'language_code': 'de', 'smart_quotes': True}),
+    (u'"Quoted" `default`, :emphasis:`emphasis`.\n',
+     {'smart_quotes': True}),
+    # display and inline math:
+    (u'.. math::\n\n   \\sum_{i=1}^n x_i\n\n'
+     u'Inline :math:`\\sum_{i=1}^n x_i`.\n',
+     {'math_output': 'html'}),
+    # language-dependent directive names:
+    (u'.. Notiz:: "Achtung"\n\n.. note:: Fallback.\n',
+     {'language_code': 'de', 'smart_quotes': True}),
+]
+
+
+def publish(n):
+    source, settings = documents[n]
+    overrides = {'_disable_config': True, 'warning_stream': BytesIO(),
+                 'embed_stylesheet': False}
+    overrides.update(settings)
+    return core.publish_parts(source, writer_name='html5',
+                              settings_overrides=overrides)['whole']
+
+
+class ConcurrentPublishingTests(unittest.TestCase):
+
+    threads = 8
+    rounds = 10
+
+    def setUp(self):
+        self.switch_interval = getattr(sys, 'getswitchinterval', None)
+        if self.switch_interval:
+            # switch threads often, to provoke interference
+            self.switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        if self.switch_interval:
+            sys.setswitchinterval(self.switch_interval)
+
+    def test_serial(self):
+        expected = [publish(n) for n in range(len(documents))]
+        # no state leaks from one document into the next:
+        self.assertTrue(u'\xabQuoted\xbb' in expected[0])
+        self.assertTrue(u'<strong>default</strong>' in expected[0])
+        self.assertTrue(u'\u201eQuoted\u201c' in expected[1])
+        self.assertTrue(u'<cite>default</cite>' in expected[1])
+        self.assertTrue(u'Unknown interpreted text role' in expected[1])
+        self.assertTrue(u'class="formula"' in expected[3])
+        self.assertEqual([publish(n) for n in reversed(range(len(documents)))],
+                         list(reversed(expected)))
+
+    def test_threads(self):
+        expected = [publish(n) for n in range(len(documents))]
+        results = []
+        errors = []
+        def worker(seed):
+            order = list(range(len(documents))) * self.rounds
+            random.Random(seed).shuffle(order)
+            try:
+                for n in order:
+                    results.append((n, publish(n)))
+            except Exception as error:
+                errors.append(error)
+        threads = [threading.Thread(target=worker, args=(seed,))
+                   for seed in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results),
+                         self.threads * self.rounds * len(documents))
+        for n, output in results:
+            self.assertEqual(output, expected[n])
+
+
+class RegistryTests(unittest.TestCase):
+
+    def test_language_lookups_not_registered(self):
+        # Language lookups without a mapping local to the document do
+        # not change the registries shared by all documents:
+        document = utils.new_document('test data')
+        german = languages.get_language('de')
+        registered = (dict(directives._directives), dict(roles._roles))
+        directive, messages = directives.directive('notiz', german, document)
+        self.assertEqual(directive.__name__, 'Note')
+        directive, messages = directives.directive('note', german, document)
+        self.assertTrue('Using English fallback' in messages[0].astext())
+        role, messages = roles.role('emphasis', german, 1, document.reporter)
+        self.assertTrue('Using English fallback' in messages[0].astext())
+        self.assertEqual((directives._directives, roles._roles), registered)
+        # The results are cached in the local mappings:
+        local_roles = {}
+        roles.role('emphasis', german, 1, document.reporter, local_roles)
+        self.assertEqual(list(local_roles), ['emphasis'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+#! /usr/bin/env python
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Tests of the asyncio publishing API (`docutils.core_async`).
+"""
+
+import sys
+import threading
+import unittest
+
+import DocutilsTestSupport              # must be imported before docutils
+from docutils import ApplicationError, core, io, writers
+from docutils.parsers import rst
+
+if sys.version_info >= (3, 5):
+    import asyncio
+    from docutils import core_async
+
+
+class BlockingParser(rst.Parser):
+
+    """Parser waiting until `release` is set."""
+
+    def __init__(self):
+        rst.Parser.__init__(self)
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def parse(self, inputstring, document):
+        self.started.set()
+        self.release.wait(10)
+        rst.Parser.parse(self, inputstring, document)
+
+
+class ExitingParser(rst.Parser):
+
+    def parse(self, inputstring, document):
+        sys.exit(3)
+
+
+class RecordingWriter(writers.UnfilteredWriter):
+
+    """Null writer recording whether it was called."""
+
+    supported = ('null',)
+    written = False
+
+    def translate(self):
+        self.written = True
+        self.output = u''
+
+
+class CancelEventTests(unittest.TestCase):
+
+    def test_cancelled(self):
+        cancel_event = threading.Event()
+        cancel_event.set()
+        self.assertRaises(
+            core.PublishCancelled, core.publish_programmatically,
+            source_class=io.StringInput, source=u'text', source_path=None,
+            destination_class=io.StringOutput, destination=None,
+            destination_path=None, reader=None, reader_name='standalone',
+            parser=None, parser_name='restructuredtext',
+            writer=None, writer_name='pseudoxml', settings=None,
+            settings_spec=None, settings_overrides={'_disable_config': True},
+            config_section=None, enable_exit_status=False,
+            cancel_event=cancel_event)
+
+
+@unittest.skipIf(sys.version_info < (3, 5), 'requires asyncio')
+class AsyncPublisherTests(unittest.TestCase):
+
+    overrides = {'_disable_config': True}
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.publisher = core_async.AsyncPublisher(max_workers=1)
+
+    def tearDown(self):
+        self.publisher.shutdown()
+        self.loop.close()
+
+    def run_loop(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_publish(self):
+        parts = self.run_loop(self.publisher.publish_parts(
+            u'Text with *emphasis*.', writer_name='html5',
+            settings_overrides=self.overrides))
+        self.assertEqual(parts['body'],
+                         u'<p>Text with <em>emphasis</em>.</p>\n')
+        output = self.run_loop(self.publisher.publish_string(
+            u'Text', settings_overrides=self.overrides))
+        self.assertEqual(output, core.publish_string(
+            u'Text', settings_overrides=self.overrides))
+        document = self.run_loop(self.publisher.publish_doctree(
+            u'Text', settings_overrides=self.overrides))
+        self.assertEqual(document.astext(), u'Text')
+
+    def test_concurrent(self):
+        publisher = core_async.AsyncPublisher(max_workers=4)
+        tasks = [self.loop.create_task(publisher.publish_parts(
+                     u'Document %d.' % n, writer_name='html5',
+                     settings_overrides=self.overrides))
+                 for n in range(12)]
+        try:
+            results = [self.run_loop(task) for task in tasks]
+        finally:
+            publisher.shutdown()
+        self.assertEqual([parts['body'] for parts in results],
+                         [u'<p>Document %d.</p>\n' % n for n in range(12)])
+
+    def test_exceptions(self):
+        # errors propagate instead of exiting:
+        self.assertRaises(
+            Exception, self.run_loop, self.publisher.publish_parts(
+                u'`broken', settings_overrides=dict(
+                    self.overrides, halt_level=2, report_level=5)))
+        try:
+            self.run_loop(self.publisher.publish_parts(
+                u'Text', parser=ExitingParser(),
+                settings_overrides=self.overrides))
+        except ApplicationError as error:
+            self.assertEqual(str(error),
+                             'processing stopped (exit status 3)')
+        else:
+            self.fail('no exception')
+
+    def blocked_request(self, writer):
+        """Start a request occupying the worker until parser.release."""
+        parser = BlockingParser()
+        task = self.loop.create_task(self.publisher.publish_string(
+            u'Text', parser=parser, writer=writer,
+            settings_overrides=self.overrides))
+        self.run_loop(self.loop.run_in_executor(None, parser.started.wait))
+        return task, parser
+
+    def test_cancel_running(self):
+        writer = RecordingWriter()
+        task, parser = self.blocked_request(writer)
+        task.cancel()
+        parser.release.set()
+        self.assertRaises(asyncio.CancelledError, self.run_loop, task)
+        # the next request runs after the cancelled one stopped:
+        self.run_loop(self.publisher.publish_string(
+            u'Text', settings_overrides=self.overrides))
+        self.assertFalse(writer.written)
+
+    def test_timeout(self):
+        blocked_writer = RecordingWriter()
+        task, parser = self.blocked_request(blocked_writer)
+        # waiting for a worker:
+        writer = RecordingWriter()
+        self.assertRaises(asyncio.TimeoutError, self.run_loop,
+                          self.publisher.publish_string(
+                              u'Text', writer=writer, timeout=0.01,
+                              settings_overrides=self.overrides))
+        parser.release.set()
+        self.run_loop(task)
+        self.assertTrue(blocked_writer.written)
+        self.run_loop(self.publisher.publish_string(
+            u'Text', settings_overrides=self.overrides))
+        self.assertFalse(writer.written)
+
+
+if __name__ == '__main__':
+    unittest.main()
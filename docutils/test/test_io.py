@@ -8,7 +8,11 @@
 Test module for io.py.
 """
 
-import unittest, sys
+import os
+import shutil
+import sys
+import tempfile
+import unittest
 import DocutilsTestSupport              # must be imported before docutils
 from docutils import io
 from docutils.utils.error_reporting import locale_encoding
@@ -99,6 +103,29 @@ print("hello world")
         data = input.readlines()
         self.assertEqual(data, [u'Some include text.\n'])
 
+    def test_iterlines(self):
+        input = io.FileInput(source_path='data/include.txt')
+        self.assertEqual(list(input.iterlines()), [u'Some include text.'])
+        # decoding errors fall back to the heuristics of read():
+        for encoding in (None, 'latin-1'):
+            lines = io.FileInput(source_path='data/latin1.txt',
+                                 encoding=encoding).iterlines()
+            data = io.FileInput(source_path='data/latin1.txt',
+                                encoding=encoding).read()
+            self.assertEqual(list(lines), data.splitlines())
+        # all lines are decoded the same way, also if decoding fails late:
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'mixed.txt')
+            f = open(path, 'wb')
+            f.write(b'a\n\xc3\xa4\n' + b'b\n' * 20000 + b'\xe4\n')
+            f.close()
+            lines = list(io.FileInput(source_path=path).iterlines())
+            data = io.FileInput(source_path=path).read()
+            self.assertEqual(lines, data.splitlines())
+        finally:
+            shutil.rmtree(directory)
+
     def test_heuristics_utf8(self):
         # if no encoding is given, try decoding with utf8:
         input = io.FileInput(source_path='functional/input/cyrillic.txt')
@@ -14,6 +14,7 @@ import unittest
 
 import DocutilsTestSupport              # must be imported before docutils
 from DocutilsTestSupport import nodes, utils
+from docutils import transforms
 
 debug = False
 
@@ -113,6 +114,22 @@ class ElementTests(unittest.TestCase):
             self.assertEqual(repr(element), u'<Element "nobody; имя; näs": >')
         self.assertTrue(isinstance(repr(element), str))
 
+    def test_list_attributes(self):
+        element = nodes.Element(ids=['id1'])
+        self.assertTrue('names' in element)
+        self.assertEqual(element.get('names'), [])
+        element['classes'].append('cls')
+        self.assertEqual(element['classes'], ['cls'])
+        self.assertEqual(element.attributes, {'ids': ['id1'], 'names': [],
+                                              'classes': ['cls'],
+                                              'dupnames': [],
+                                              'backrefs': []})
+        self.assertEqual(element.tagname, 'Element')
+        self.assertEqual(nodes.paragraph().tagname, 'paragraph')
+        # other instance attributes are allowed
+        element.referenced = 1
+        self.assertEqual(element.referenced, 1)
+
     def test_withtext(self):
         element = nodes.Element('text\nmore', nodes.Text('text\nmore'))
         uelement = nodes.Element(u'grün', nodes.Text(u'grün'))
@@ -642,6 +659,77 @@ class MiscTests(unittest.TestCase):
         self.assertEqual(e_copy['att'], 'e')
 
 
+class NodeIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.document = utils.new_document('test')
+        self.document += nodes.paragraph('', 'one ', nodes.emphasis('', 'a'))
+        self.section = nodes.section('', nodes.title('', 'Title'),
+                                     nodes.paragraph('', 'two'))
+        self.document += self.section
+        self.document.enable_node_index()
+
+    def check(self):
+        """The index finds the same nodes as a walk of the tree."""
+        for cls in (nodes.Node, nodes.Text, nodes.Inline, nodes.paragraph,
+                    nodes.section, nodes.document):
+            self.assertEqual(self.document.traverse(cls),
+                             list(nodes.Element._fast_traverse(self.document,
+                                                               cls)))
+
+    def test_find(self):
+        self.check()
+        self.assertEqual(self.document.traverse(nodes.document),
+                         [self.document])
+        self.assertEqual([p.astext()
+                          for p in self.document.traverse(nodes.paragraph)],
+                         ['one a', 'two'])
+
+    def test_find_classes(self):
+        classes = (nodes.title, nodes.emphasis, nodes.paragraph)
+        expected = list(nodes.Element._fast_traverse(self.document, classes))
+        self.assertEqual(self.document.node_index.find(classes), expected)
+        self.assertEqual(transforms.find_nodes(self.document, classes),
+                         expected)
+        self.assertEqual([node.__class__.__name__ for node in expected],
+                         ['paragraph', 'emphasis', 'title', 'paragraph'])
+
+    def test_changes(self):
+        paragraph = self.section[1]
+        # nodes appended to a new subtree are indexed with it:
+        subsection = nodes.section()
+        subsection += nodes.paragraph('', 'three')
+        self.section.append(subsection)
+        subsection += nodes.paragraph('', 'four')
+        self.check()
+        self.section.insert(1, nodes.paragraph('', 'inserted'))
+        self.check()
+        self.section.remove(paragraph)
+        self.check()
+        self.assertFalse(paragraph in self.document.traverse(nodes.paragraph))
+        # a removed node can be inserted again:
+        self.document.insert(0, paragraph)
+        self.check()
+        subsection.replace_self(subsection.children)
+        self.check()
+        self.section[0] = nodes.title('', 'New title')
+        self.section[1:2] = [nodes.strong('', 'x'), nodes.Text('y')]
+        self.check()
+        del self.section[-1]
+        del self.document[:1]
+        self.check()
+        self.section.pop(0)
+        self.section.clear()
+        self.check()
+        self.assertEqual(len(self.document.traverse(nodes.paragraph)), 1)
+
+    def test_disable(self):
+        self.document.disable_node_index()
+        self.assertEqual(self.document.node_index, None)
+        self.section += nodes.paragraph('', 'not indexed')
+        self.assertEqual(len(self.document.traverse(nodes.paragraph)), 3)
+
+
 class TreeCopyVisitorTests(unittest.TestCase):
 
     def setUp(self):
@@ -671,6 +759,93 @@ class TreeCopyVisitorTests(unittest.TestCase):
         self.compare_trees(self.document, newtree)
 
 
+class NodeVisitorTests(unittest.TestCase):
+
+    class Visitor(nodes.SparseNodeVisitor):
+
+        def __init__(self, document):
+            nodes.SparseNodeVisitor.__init__(self, document)
+            self.visited = []
+
+        def visit_paragraph(self, node):
+            self.visited.append('paragraph')
+
+    def setUp(self):
+        self.document = utils.new_document('test data')
+        self.document += nodes.paragraph('', 'Paragraph 1.')
+
+    def test_dispatch(self):
+        visitor = self.Visitor(self.document)
+        self.document.walkabout(visitor)
+        self.document.walkabout(visitor)   # uses the dispatch cache
+        self.assertEqual(visitor.visited, ['paragraph', 'paragraph'])
+
+    def test_dispatch_instance_method(self):
+        visitor = self.Visitor(self.document)
+        self.document.walk(visitor)
+        visitor.visit_paragraph = lambda node: visitor.visited.append('p')
+        visitor.visit_Text = lambda node: visitor.visited.append('t')
+        self.document.walk(visitor)
+        self.assertEqual(visitor.visited, ['paragraph', 'p', 't'])
+
+    def test_dispatch_replaced_class_method(self):
+        class Visitor(self.Visitor):
+            pass
+        visitor = Visitor(self.document)
+        self.document.walk(visitor)
+        # e.g. Sphinx' ``app.add_node()`` sets methods on translator classes:
+        visit_paragraph = self.Visitor.__dict__['visit_paragraph']
+        self.Visitor.visit_paragraph = lambda self, node: (
+            self.visited.append('new'))
+        try:
+            self.document.walk(visitor)
+            Visitor.visit_paragraph = lambda self, node: (
+                self.visited.append('newer'))
+            self.document.walk(visitor)
+        finally:
+            self.Visitor.visit_paragraph = visit_paragraph
+        self.assertEqual(visitor.visited, ['paragraph', 'new', 'newer'])
+
+    def test_deep_nesting(self):
+        # the traversals do not recurse
+        node = self.document
+        for i in range(3 * sys.getrecursionlimit()):
+            node += nodes.block_quote()
+            node = node[-1]
+        node += nodes.paragraph('', 'deep')
+        visitor = self.Visitor(self.document)
+        self.document.walkabout(visitor)
+        self.document.walk(visitor)
+        self.assertEqual(visitor.visited, ['paragraph'] * 4)
+        self.assertEqual(len(self.document.traverse(nodes.paragraph)), 2)
+
+    def test_pruning(self):
+        document = self.document
+        document += nodes.paragraph('', 'Paragraph 2.')
+        log = []
+        class Visitor(nodes.GenericNodeVisitor):
+            def default_visit(self, node):
+                log.append('visit ' + node.tagname)
+                if node is document[0]:
+                    raise nodes.SkipDeparture
+                if node is document[1]:
+                    raise nodes.StopTraversal
+                if isinstance(node, nodes.Text):
+                    raise nodes.SkipSiblings
+            def default_departure(self, node):
+                log.append('depart ' + node.tagname)
+        self.assertTrue(document.walkabout(Visitor(document)))
+        self.assertEqual(log, ['visit document',
+                               'visit paragraph', 'visit #text',
+                               'visit paragraph', 'depart paragraph',
+                               'depart document'])
+
+    def test_unknown_visit(self):
+        visitor = nodes.NodeVisitor(self.document)
+        self.assertRaises(NotImplementedError,
+                          self.document.walkabout, visitor)
+
+
 class SetIdTests(unittest.TestCase):
 
     def setUp(self):
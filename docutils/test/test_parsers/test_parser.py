@@ -10,9 +10,11 @@ Tests for basic functionality of parser classes.
 
 import sys
 import unittest
+import warnings
 import DocutilsTestSupport              # must be imported before docutils
 import docutils
-from docutils import parsers, utils, frontend
+from docutils import nodes, parsers, utils, frontend
+from docutils.parsers.rst import states
 
 
 class RstParserTests(unittest.TestCase):
@@ -31,6 +33,52 @@ class RstParserTests(unittest.TestCase):
             # input must be unicode at all times
             self.assertRaises(TypeError, parser.parse, b'hol', document)
 
+    def test_inliner_patterns_cached(self):
+        settings = frontend.OptionParser(
+            components=(parsers.get_parser_class('rst'),)).get_default_values()
+        inliner1 = states.Inliner()
+        inliner1.init_customizations(settings)
+        inliner2 = states.Inliner()
+        inliner2.init_customizations(settings)
+        self.assertTrue(inliner1.patterns.initial is inliner2.patterns.initial)
+        self.assertTrue(inliner1.patterns is not inliner2.patterns)
+        settings.character_level_inline_markup = True
+        inliner3 = states.Inliner()
+        inliner3.init_customizations(settings)
+        self.assertTrue(inliner1.patterns.initial
+                        is not inliner3.patterns.initial)
+        self.assertEqual(inliner3.end_string_suffix, '')
+
+    def test_legacy_inliner_dispatch(self):
+        # dispatch methods of subclasses returning strings still work
+        class LegacyInliner(states.Inliner):
+            def emphasis(self, match, lineno):
+                string = match.string
+                end = string.index('*', match.end())
+                node = nodes.strong(string[match.start():end+1],
+                                    string[match.end():end])
+                return string[:match.start()], [node], string[end+1:], []
+            dispatch = dict(states.Inliner.dispatch, **{'*': emphasis})
+        parser = parsers.get_parser_class('rst')(inliner=LegacyInliner())
+        document = utils.new_document('test data', frontend.OptionParser(
+                    components=(parser, )).get_default_values())
+        warnings_ = []
+        def showwarning(message, category, *args, **kwargs):
+            warnings_.append(category)
+        saved, warnings.showwarning = warnings.showwarning, showwarning
+        try:
+            warnings.simplefilter('always', DeprecationWarning)
+            parser.parse(u'A *b* **c** `d`_ *e* f.', document)
+        finally:
+            warnings.showwarning = saved
+            warnings.resetwarnings()
+        self.assertEqual(warnings_, [DeprecationWarning] * 2)
+        paragraph = document[0]
+        self.assertEqual([node.tagname for node in paragraph.children],
+                         ['#text', 'strong', '#text', 'strong', '#text',
+                          'reference', '#text', 'strong', '#text'])
+        self.assertEqual(paragraph.astext(), u'A b c d e f.')
+
 
 if __name__ == '__main__':
     unittest.main()
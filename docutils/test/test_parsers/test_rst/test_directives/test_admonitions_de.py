@@ -165,6 +165,10 @@ totest['admonitions'] = [
 """,
 """\
 <document source="test data">
+    <system_message level="1" line="1" source="test data" type="INFO">
+        <paragraph>
+            No directive entry for "admonition" in module "docutils.parsers.rst.languages.de".
+            Using English fallback for directive "admonition".
     <admonition classes="admonition-admonition">
         <title>
             Admonition
@@ -178,6 +182,10 @@ totest['admonitions'] = [
 """,
 """\
 <document source="test data">
+    <system_message level="1" line="1" source="test data" type="INFO">
+        <paragraph>
+            No directive entry for "admonition" in module "docutils.parsers.rst.languages.de".
+            Using English fallback for directive "admonition".
     <admonition classes="admonition-and-by-the-way">
         <title>
             And, by the way...
@@ -193,6 +201,10 @@ totest['admonitions'] = [
 """,
 """\
 <document source="test data">
+    <system_message level="1" line="1" source="test data" type="INFO">
+        <paragraph>
+            No directive entry for "admonition" in module "docutils.parsers.rst.languages.de".
+            Using English fallback for directive "admonition".
     <admonition classes="emergency" ids="reference-name" names="reference\\ name">
         <title>
             Admonition
@@ -206,6 +218,10 @@ totest['admonitions'] = [
 """,
 """\
 <document source="test data">
+    <system_message level="1" line="1" source="test data" type="INFO">
+        <paragraph>
+            No directive entry for "admonition" in module "docutils.parsers.rst.languages.de".
+            Using English fallback for directive "admonition".
     <system_message level="3" line="1" source="test data" type="ERROR">
         <paragraph>
             Error in "admonition" directive:
@@ -33,6 +33,10 @@ totest['admonitions'] = [
     <attention>
         <paragraph>
             directive with silly localised name.
+    <system_message level="1" line="3" source="test data" type="INFO">
+        <paragraph>
+            No directive entry for "Attention" in module "local_dummy_lang".
+            Using English fallback for directive "Attention".
     <attention>
         <paragraph>
             English fallback (an INFO is written).
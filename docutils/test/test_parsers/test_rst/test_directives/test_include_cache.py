@@ -0,0 +1,103 @@
+#! /usr/bin/env python
+
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Tests for the cache of included files (misc.py "include" directive).
+"""
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+if __name__ == '__main__':
+    import __init__
+from test_parsers import DocutilsTestSupport
+from docutils import core, utils
+from docutils.parsers.rst.directives import misc
+
+
+class IncludeCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'include.txt')
+        self.write(u'Included *text*.\n')
+        misc.include_cache.clear()
+        self.reads = []
+        self.read_file = misc.Include.read_file
+        def read_file(directive, path, *args):
+            self.reads.append(path)
+            return self.read_file(directive, path, *args)
+        misc.Include.read_file = read_file
+
+    def tearDown(self):
+        misc.Include.read_file = self.read_file
+        misc.include_cache.clear()
+        shutil.rmtree(self.directory)
+
+    def write(self, text):
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+    def publish(self, source, **settings):
+        settings.update({'_disable_config': True,
+                         'record_dependencies': utils.DependencyList()})
+        document = core.publish_doctree(
+            source, source_path=os.path.join(self.directory, 'doc.txt'),
+            settings_overrides=settings)
+        return document, document.settings.record_dependencies.list
+
+    def test_hit(self):
+        source = u'.. include:: include.txt\n'
+        document, dependencies = self.publish(source)
+        self.assertEqual(document.astext(), u'Included text.')
+        document, dependencies = self.publish(source)
+        self.assertEqual(document.astext(), u'Included text.')
+        self.assertEqual(len(self.reads), 1)
+        # dependencies are recorded for cached files, too:
+        self.assertEqual(dependencies, [self.reads[0]])
+
+    def test_options(self):
+        self.publish(u'.. include:: include.txt\n')
+        document, dependencies = self.publish(u'.. include:: include.txt\n'
+                                              u'   :literal:\n'
+                                              u'   :start-after: *\n')
+        self.assertEqual(document.astext(), u'text*.\n')
+        self.assertEqual(len(self.reads), 2)
+        self.publish(u'.. include:: include.txt\n', tab_width=4)
+        self.assertEqual(len(self.reads), 3)
+
+    def test_changed_file(self):
+        source = u'.. include:: include.txt\n'
+        self.publish(source)
+        self.write(u'Changed text.\n')
+        document, dependencies = self.publish(source)
+        self.assertEqual(document.astext(), u'Changed text.')
+        self.assertEqual(len(self.reads), 2)
+
+    def test_disabled(self):
+        source = u'.. include:: include.txt\n'
+        self.publish(source, include_cache_size=0)
+        self.publish(source, include_cache_size=0)
+        self.assertEqual(len(self.reads), 2)
+        self.assertEqual(len(misc.include_cache.entries), 0)
+
+    def test_least_recently_used(self):
+        cache = misc.IncludeCache()
+        cache.add('a', u'aaa', (u'aaa',), 10)
+        cache.add('b', u'bb', (u'bb',), 10)
+        self.assertEqual(cache.get('a'), (u'aaa', (u'aaa',)))
+        cache.add('c', u'cc', (u'cc',), 10)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(list(cache.entries), ['a', 'c'])
+        self.assertEqual(cache.size, 10)
+        cache.add('d', u'd' * 6, (u'd' * 6,), 10)
+        self.assertEqual(cache.get('d'), None)
+        self.assertEqual(cache.size, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
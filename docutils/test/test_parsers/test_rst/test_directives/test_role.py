@@ -116,6 +116,18 @@ Now that it's defined, :custom:`interpreted` works.
             text
 """],
 ["""\
+.. role:: custom(emphasis)
+.. role:: custom2(custom)
+
+:custom2:`text`
+""",
+"""\
+<document source="test data">
+    <paragraph>
+        <emphasis classes="custom2">
+            text
+"""],
+["""\
 .. role:: custom(unknown-role)
 """,
 """\
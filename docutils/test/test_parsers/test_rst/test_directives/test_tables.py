@@ -1104,6 +1104,89 @@ u"""\
                             \u00bfOn a \u03c3\u03c4\u03b9\u03ba?
 """],
 ["""\
+.. csv-table:: selected rows
+   :file: %s
+   :encoding: utf-16
+   :rows: 2-
+   :max-rows: 1
+""" % utf_16_csv,
+u"""\
+<document source="test data">
+    <table>
+        <title>
+            selected rows
+        <tgroup cols="3">
+            <colspec colwidth="33">
+            <colspec colwidth="33">
+            <colspec colwidth="33">
+            <tbody>
+                <row>
+                    <entry>
+                        <paragraph>
+                            Albatr\u00b0\u00df
+                    <entry>
+                        <paragraph>
+                            2.99
+                    <entry>
+                        <paragraph>
+                            \u00a1On a \u03c3\u03c4\u03b9\u03ba!
+"""],
+["""\
+.. csv-table:: selected rows
+   :rows: 2-3
+   :header-rows: 1
+
+   one, "two
+   lines"
+   three, four
+   five, six
+   seven
+""",
+"""\
+<document source="test data">
+    <table>
+        <title>
+            selected rows
+        <tgroup cols="2">
+            <colspec colwidth="50">
+            <colspec colwidth="50">
+            <thead>
+                <row>
+                    <entry>
+                        <paragraph>
+                            three
+                    <entry>
+                        <paragraph>
+                            four
+            <tbody>
+                <row>
+                    <entry>
+                        <paragraph>
+                            five
+                    <entry>
+                        <paragraph>
+                            six
+"""],
+["""\
+.. csv-table:: bad row range
+   :rows: 3-2
+
+   one, two
+""",
+"""\
+<document source="test data">
+    <system_message level="3" line="1" source="test data" type="ERROR">
+        <paragraph>
+            Error in "csv-table" directive:
+            invalid option value: (option: "rows"; value: '3-2')
+            empty row range "3-2".
+        <literal_block xml:space="preserve">
+            .. csv-table:: bad row range
+               :rows: 3-2
+            \n\
+               one, two
+"""],
+["""\
 .. csv-table:: no CSV data
    :file: %s
 """ % empty_txt,
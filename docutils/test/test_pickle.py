@@ -23,6 +23,17 @@ class PickleTests(unittest.TestCase):
         reconstituted = pickle.loads(dill)
         self.assertEqual(doctree.pformat(), reconstituted.pformat())
 
+    def test_pickle_protocols(self):
+        doctree = core.publish_doctree(
+            source='Title\n=====\n\nparagraph [#]_\n\n.. [#] note\n',
+            settings_overrides={'_disable_config': True})
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            reconstituted = pickle.loads(pickle.dumps(doctree, protocol))
+            self.assertEqual(doctree.pformat(), reconstituted.pformat())
+            paragraph = reconstituted[1]
+            self.assertEqual(paragraph.attributes['ids'], [])
+            self.assertTrue(paragraph.parent is reconstituted)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -8,17 +8,27 @@
 Test the `Publisher` facade and the ``publish_*`` convenience functions.
 """
 
+import json
+import os
 import pickle
+import shutil
 import sys
+import tempfile
 
 import DocutilsTestSupport              # must be imported before docutils
 import docutils
-from docutils import core, nodes, io
+from docutils import core, nodes, io, utils
+from docutils.readers import standalone
+from docutils.utils import binary_doctree
+from docutils.utils.doctree_cache import DoctreeCache
+from docutils.utils.stage_profile import StageProfiler
 
 if sys.version_info < (3, 0):
     u_prefix = 'u'
+    from StringIO import StringIO
 else:
     u_prefix = b''
+    from io import StringIO
 
 
 test_document = """\
@@ -166,6 +176,370 @@ class PublishDoctreeTestCase(DocutilsTestSupport.StandardTestCase, docutils.Sett
             settings_spec=self)
         self.assertEqual(output, pseudoxml_output)
 
+    def test_frozen_settings(self):
+        settings = core.frozen_settings(
+            settings_spec=self, settings_overrides={'tab_width': 4})
+        self.assertTrue(isinstance(settings, docutils.frontend.FrozenValues))
+        self.assertTrue(settings.traceback)
+        for i in range(2):
+            output = core.publish_string(test_document, settings=settings)
+            self.assertEqual(output, pseudoxml_output)
+        self.assertEqual(settings._source, None)
+        pub = core.Publisher(settings=settings)
+        self.assertFalse(pub.settings is settings)
+        pub.settings.tab_width = 8
+        self.assertEqual(settings.tab_width, 4)
+
+class PublishFormatsTestCase(DocutilsTestSupport.StandardTestCase,
+                             docutils.SettingsSpec):
+
+    settings_default_overrides = {
+        '_disable_config': True,
+        'output_encoding': 'unicode',
+        'warning_stream': io.NullOutput()}
+
+    source = """\
+Title
+=====
+
+.. contents::
+.. sectnum::
+   :depth: 2
+   :start: 3
+
+Section
+-------
+
+Text with a footnote [#]_.
+
+.. meta::
+   :keywords: spam
+
+.. [#] A footnote.
+"""
+
+    writers = ('html5', 'html4', 'latex', 'pseudoxml')
+
+    def expected_outputs(self, settings_overrides=None):
+        return [core.publish_string(self.source, writer_name=writer_name,
+                                    settings_spec=self,
+                                    settings_overrides=settings_overrides)
+                for writer_name in self.writers]
+
+    def test_publish_formats(self):
+        outputs = core.publish_formats(self.source, writers=self.writers,
+                                       settings_spec=self)
+        self.assertEqual(outputs, self.expected_outputs())
+
+    def test_settings_changed_while_reading(self):
+        # Without "sectnum_xform", the SectNum transform stores its
+        # details in the settings, for the writer:
+        overrides = {'sectnum_xform': False}
+        outputs = core.publish_formats(self.source, writers=self.writers,
+                                       settings_spec=self,
+                                       settings_overrides=overrides)
+        self.assertEqual(outputs, self.expected_outputs(overrides))
+
+    def test_processes(self):
+        outputs = core.publish_formats(self.source, writers=self.writers,
+                                       settings_spec=self, processes=2)
+        self.assertEqual(outputs, self.expected_outputs())
+
+    def test_publish_cmdline_formats(self):
+        directory = tempfile.mkdtemp()
+        try:
+            source_path = os.path.join(directory, 'source.txt')
+            source = open(source_path, 'w')
+            source.write(self.source)
+            source.close()
+            overrides = {'_disable_config': True, 'report_level': 5}
+            argv = ['--no-section-numbering', source_path]
+            for writer_name in self.writers:
+                argv.append('--writer=%s:%s' % (
+                    writer_name, os.path.join(directory, writer_name)))
+            core.publish_cmdline_formats(argv=argv,
+                                         settings_overrides=overrides)
+            overrides['sectnum_xform'] = False
+            for writer_name in self.writers:
+                output = open(os.path.join(directory, writer_name), 'rb')
+                expected = core.publish_string(
+                    self.source, source_path=source_path,
+                    writer_name=writer_name,
+                    settings_overrides=overrides)
+                self.assertEqual(output.read(), expected)
+                output.close()
+        finally:
+            shutil.rmtree(directory)
+
+    def test_read_formats(self):
+        pub = core.Publisher(source_class=io.StringInput)
+        pub.set_components('standalone', 'restructuredtext', 'null')
+        writer_settings = []
+        for writer_name in self.writers:
+            writer_pub = core.writer_publisher(pub, writer_name)
+            writer_pub.process_programmatic_settings(self, None, None)
+            writer_settings.append((writer_pub.writer, writer_pub.settings))
+        pub.settings = writer_settings[0][1]
+        pub.set_source(self.source)
+        documents = core.read_formats(pub, writer_settings)
+        # The html writers share the document tree, the latex writer
+        # (setting "use_latex_toc") and the pseudoxml writer (no setting
+        # "footnote_references") do not:
+        self.assertTrue(documents[0] is documents[1])
+        self.assertEqual(len(set(id(document) for document in documents)), 3)
+
+    def test_copy_documents(self):
+        a, b = utils.new_document('a'), utils.new_document('b')
+        copies = core.copy_documents([a, b, a], False)
+        self.assertTrue(isinstance(copies[0], bytes))
+        self.assertTrue(copies[1] is b)
+        self.assertTrue(copies[2] is a)
+        copies = core.copy_documents([a, b], True)
+        self.assertTrue(isinstance(copies[0], bytes))
+        self.assertTrue(isinstance(copies[1], bytes))
+
+    def test_unserializable_document(self):
+        # The source is read again for the html5 writer, which shares the
+        # document tree with the html4 writer:
+        for processes in (1, 2):
+            CountingReader.documents_read = 0
+            outputs = core.publish_formats(
+                self.source, reader=CallbackReader(), writers=self.writers,
+                settings_spec=self, processes=processes)
+            self.assertEqual(outputs, self.expected_outputs())
+            self.assertEqual(CountingReader.documents_read, 4)
+
+
+class CountingReader(standalone.Reader):
+
+    """Standalone reader counting the documents read."""
+
+    documents_read = 0
+
+    def read(self, source, parser, settings):
+        CountingReader.documents_read += 1
+        return standalone.Reader.read(self, source, parser, settings)
+
+
+class CallbackReader(CountingReader):
+
+    """Reader storing a local function in the document tree."""
+
+    def read(self, source, parser, settings):
+        document = CountingReader.read(self, source, parser, settings)
+        document.callback = lambda: None
+        return document
+
+
+class DoctreeCacheTestCase(DocutilsTestSupport.StandardTestCase):
+
+    source = """\
+Title
+=====
+
+.. include:: included.txt
+
+Short
+----
+
+Text.
+"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_directory = os.path.join(self.directory, 'cache')
+        self.source_path = os.path.join(self.directory, 'source.txt')
+        self.write_file('included.txt', 'Included text.\n')
+        CountingReader.documents_read = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_file(self, name, text):
+        f = open(os.path.join(self.directory, name), 'w')
+        f.write(text)
+        f.close()
+
+    def publish(self, writer_name='html5', reader_class=CountingReader,
+                **overrides):
+        """Return the output and the warnings."""
+        warnings = StringIO()
+        overrides.update({'_disable_config': True,
+                          'output_encoding': 'unicode',
+                          'warning_stream': warnings})
+        output = core.publish_string(
+            self.source, source_path=self.source_path,
+            reader=reader_class(), writer_name=writer_name,
+            settings_overrides=overrides)
+        return output, warnings.getvalue()
+
+    def publish_cached(self, writer_name='html5', reader_class=CountingReader,
+                       **overrides):
+        return self.publish(writer_name, reader_class,
+                            doctree_cache=self.cache_directory, **overrides)
+
+    def test_cached_output(self):
+        for writer_name in ('html5', 'latex', 'pseudoxml'):
+            expected = self.publish(writer_name)
+            self.assertTrue('Title underline too short' in expected[1])
+            self.assertEqual(self.publish_cached(writer_name), expected)
+            self.assertEqual(self.publish_cached(writer_name), expected)
+        self.assertEqual(len(os.listdir(self.cache_directory)), 1)
+
+    def test_cache_hit(self):
+        self.publish_cached()
+        self.publish_cached('pseudoxml')
+        self.assertEqual(CountingReader.documents_read, 1)
+
+    def test_dependency_changed(self):
+        self.publish_cached()
+        self.write_file('included.txt', 'Changed text.\n')
+        output, warnings = self.publish_cached()
+        self.assertTrue('Changed text.' in output)
+        self.assertEqual(CountingReader.documents_read, 2)
+
+    def test_settings_changed(self):
+        expected = self.publish_cached()
+        output = self.publish_cached(doctitle_xform=False)
+        self.assertNotEqual(output, expected)
+        # Both variants are kept:
+        self.assertEqual(self.publish_cached(), expected)
+        self.assertEqual(CountingReader.documents_read, 2)
+
+    def test_unserializable_document(self):
+        expected = self.publish(reader_class=CallbackReader)
+        self.assertEqual(self.publish_cached(reader_class=CallbackReader),
+                         expected)
+        self.assertEqual(self.publish_cached(reader_class=CallbackReader),
+                         expected)
+        # The document tree is not cached:
+        self.assertEqual(CountingReader.documents_read, 3)
+        self.assertFalse(os.path.exists(self.cache_directory)
+                         and os.listdir(self.cache_directory))
+
+    def test_least_recently_used_removed(self):
+        cache = DoctreeCache(self.cache_directory, 2**20)
+        for i, key in enumerate(('a', 'b', 'c')):
+            cache.put(key, [{'document': b'x' * 1000}])
+            os.utime(cache.entry_path(key), (i, i))
+        entry_size = os.path.getsize(cache.entry_path('a'))
+        cache.max_size = 2 * entry_size
+        self.assertEqual(cache.get('a'), [{'document': b'x' * 1000}])
+        cache.put('d', [{'document': b'x' * 1000}])
+        self.assertEqual(sorted(os.listdir(self.cache_directory)),
+                         ['a.doctree', 'd.doctree'])
+        cache.clear()
+        self.assertEqual(os.listdir(self.cache_directory), [])
+
+    def test_directory_scanned_if_too_large(self):
+        cache = DoctreeCache(self.cache_directory, 2**20)
+        scans = []
+        def evict():
+            scans.append(True)
+            DoctreeCache.evict(cache)
+        cache.evict = evict
+        cache.clear()
+        for i, key in enumerate(('b', 'a', 'a')):
+            cache.put(key, [{'document': b'x' * 1000}])
+            os.utime(cache.entry_path(key), (i, i))
+        self.assertEqual(scans, [])
+        cache.max_size = 2 * os.path.getsize(cache.entry_path('a'))
+        cache.put('c', [{'document': b'x' * 1000}])
+        self.assertEqual(scans, [True])
+        self.assertEqual(sorted(os.listdir(self.cache_directory)),
+                         ['a.doctree', 'c.doctree'])
+
+    def test_pickled_entry_ignored(self):
+        cache = DoctreeCache(self.cache_directory, 2**20)
+        cache.put('a', [{'document': b'x'}])
+        f = open(cache.entry_path('a'), 'wb')
+        pickle.dump([{'document': b'x'}], f)
+        f.close()
+        self.assertEqual(cache.get('a'), [])
+        self.assertRaises(binary_doctree.SerializationError,
+                          cache.put, 'b', [{'document': set([1])}])
+
+
+class ProfileStagesTestCase(DocutilsTestSupport.StandardTestCase):
+
+    settings = {'_disable_config': True, 'output_encoding': 'unicode'}
+
+    def test_profiler(self):
+        output, pub = core.publish_programmatically(
+            source_class=io.StringInput, source=test_document,
+            source_path=None, destination_class=io.StringOutput,
+            destination=None, destination_path=None,
+            reader=None, reader_name='standalone',
+            parser=None, parser_name='restructuredtext',
+            writer=None, writer_name='html5',
+            settings=None, settings_spec=None,
+            settings_overrides=dict(self.settings, profile_stages_json=None,
+                                    warning_stream=StringIO()),
+            config_section=None, enable_exit_status=False)
+        self.assertEqual(pub.profiler, None)
+        pub = core.Publisher(source_class=io.StringInput,
+                             destination_class=io.StringOutput)
+        pub.set_components('standalone', 'restructuredtext', 'html5')
+        pub.process_programmatic_settings(
+            None, dict(self.settings, warning_stream=StringIO()), None)
+        pub.set_source(test_document)
+        pub.profiler = StageProfiler(trace_memory=False)
+        self.assertEqual(pub.publish(), output)
+        stages = [record['stage'] for record in pub.profiler.records]
+        self.assertEqual(stages[0], 'read')
+        self.assertEqual(stages[-2:], ['translate', 'encode'])
+        transforms = [record for record in pub.profiler.records
+                      if record['stage'] == 'transform']
+        # transforms applied in one traversal share a record:
+        names = [name for record in transforms
+                 for name in record['name'].split(' + ')]
+        self.assertEqual(len(names), len(pub.document.transformer.applied))
+        self.assertTrue('docutils.transforms.references.ExternalTargets + '
+                        'docutils.transforms.references.InternalTargets'
+                        in [record['name'] for record in transforms])
+        self.assertEqual([record['priority'] for record in transforms],
+                         sorted([record['priority'] for record in transforms]))
+        for record in pub.profiler.records:
+            self.assertTrue(record['wall_time'] >= 0)
+            self.assertTrue(record['cpu_time'] >= 0)
+            self.assertEqual(record['peak_memory'], None)
+
+    def test_report(self):
+        warnings = StringIO()
+        core.publish_string(test_document, writer_name='pseudoxml',
+                            settings_overrides=dict(
+                                self.settings, profile_stages=True,
+                                warning_stream=warnings))
+        report = warnings.getvalue()
+        self.assertTrue('Unknown target name: "nonexistent"' in report)
+        self.assertTrue('::: Stage profile' in report)
+        self.assertTrue(
+            'transform 220 docutils.transforms.references.Substitutions'
+            in report)
+        self.assertTrue('translate docutils.writers.pseudoxml.Writer'
+                        in report)
+        self.assertTrue(report.rstrip().endswith('total'))
+
+    def test_json(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'profile.json')
+            warnings = StringIO()
+            core.publish_string(test_document, writer_name='pseudoxml',
+                                settings_overrides=dict(
+                                    self.settings, profile_stages_json=path,
+                                    warning_stream=warnings))
+            self.assertFalse('::: Stage profile' in warnings.getvalue())
+            f = open(path)
+            records = json.load(f)['stages']
+            f.close()
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual(records[0]['stage'], 'read')
+        self.assertEqual(records[0]['name'],
+                         'docutils.readers.standalone.Reader')
+        self.assertEqual(records[-1]['stage'], 'encode')
+
 
 if __name__ == '__main__':
     import unittest
@@ -0,0 +1,149 @@
+#! /usr/bin/env python
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+Tests of the render server (`docutils.server`).
+"""
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+from io import BytesIO
+
+import DocutilsTestSupport              # must be imported before docutils
+from docutils import core, server
+
+
+source = u"""\
+Title
+=====
+
+Text with *emphasis* and a broken reference_.
+"""
+
+
+class RenderServerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.server = server.RenderServer(
+            settings_overrides={'_disable_config': True})
+
+    def test_render(self):
+        response = self.server.render({'id': 7, 'source': source,
+                                       'writer': 'html5'})
+        expected = core.publish_parts(
+            source, writer_name='html5',
+            settings_overrides={'_disable_config': True,
+                                'warning_stream': BytesIO()})
+        self.assertEqual(response['id'], 7)
+        self.assertEqual(response['parts']['body'], expected['body'])
+        self.assertEqual(response['parts']['title'], u'Title')
+        self.assertEqual(response['max_level'], 3)
+        self.assertTrue('Unknown target name: "reference"'
+                        in response['warnings'])
+
+    def test_settings(self):
+        response = self.server.render({'source': source,
+                                       'writer': 'pseudoxml',
+                                       'settings': {'doctitle_xform': False}})
+        self.assertTrue('<section' in response['parts']['whole'])
+
+    def test_errors(self):
+        for request, error in (
+            ({}, 'invalid request: "source" must be a string'),
+            ({'source': u'x', 'settings': {'_source': 'file'}},
+             'invalid request: setting "_source" cannot be overridden'),
+            ({'source': u'x', 'settings': {'warning_stream': 'file'}},
+             'invalid request: setting "warning_stream" cannot be '
+             'overridden'),
+            ({'source': u'x', 'settings': {'profile_stages_json': 'file'}},
+             'invalid request: setting "profile_stages_json" cannot be '
+             'overridden'),
+            ({'source': u'x', 'settings': {'doctree_cache': 'directory'}},
+             'invalid request: setting "doctree_cache" cannot be '
+             'overridden'),
+            ({'source': u'x', 'settings': {'record_dependencies': 'file'}},
+             'invalid request: setting "record_dependencies" cannot be '
+             'overridden')):
+            self.assertEqual(self.server.render(request),
+                             {'id': None, 'error': error})
+        response = self.server.render({'source': u'broken_\n',
+                                       'settings': {'halt_level': 3}})
+        self.assertTrue(response['error'].startswith('SystemMessage'))
+        response = self.server.render({'source': u'x',
+                                       'writer': 'no such writer'})
+        self.assertTrue('error' in response)
+
+    def test_isolation(self):
+        response = self.server.render({
+            'source': u'.. role:: custom\n\n:custom:`text`\n',
+            'writer': 'pseudoxml'})
+        self.assertEqual(response['max_level'], -1)
+        response = self.server.render({'source': u':custom:`text`\n',
+                                       'writer': 'pseudoxml'})
+        self.assertTrue('Unknown interpreted text role "custom"'
+                        in response['warnings'])
+
+    def test_serve_lines(self):
+        requests = [json.dumps({'id': 1, 'source': source}),
+                    '',
+                    'not JSON',
+                    json.dumps({'id': 2, 'source': u'\xe4'})]
+        outfile = BytesIO()
+        self.server.serve_lines(
+            BytesIO(('\n'.join(requests) + '\n').encode('utf-8')), outfile)
+        responses = [json.loads(line.decode('ascii'))
+                     for line in outfile.getvalue().splitlines()]
+        self.assertEqual([response['id'] for response in responses],
+                         [1, None, 2])
+        self.assertTrue(responses[1]['error'].startswith('invalid request'))
+        self.assertTrue(u'<p>\xe4</p>' in responses[2]['parts']['body'])
+
+    if hasattr(socket, 'AF_UNIX'):
+        def test_concurrent_clients(self):
+            directory = tempfile.mkdtemp()
+            path = os.path.join(directory, 'socket')
+            unix_server = self.server.unix_server(path)
+            thread = threading.Thread(target=unix_server.serve_forever)
+            thread.daemon = True
+            thread.start()
+            results = {}
+            def client(n):
+                connection = socket.socket(socket.AF_UNIX)
+                connection.connect(path)
+                stream = connection.makefile('rwb')
+                for i in range(3):
+                    request = {'id': [n, i],
+                               'source': u'Client %d, request %d.' % (n, i)}
+                    stream.write(json.dumps(request).encode('ascii') + b'\n')
+                    stream.flush()
+                    response = json.loads(stream.readline().decode('ascii'))
+                    results[n, i] = (response['id'],
+                                     response['parts']['body'])
+                stream.close()
+                connection.close()
+            try:
+                clients = [threading.Thread(target=client, args=(n,))
+                           for n in range(8)]
+                for thread in clients:
+                    thread.start()
+                for thread in clients:
+                    thread.join()
+            finally:
+                unix_server.shutdown()
+                unix_server.server_close()
+                shutil.rmtree(directory)
+            self.assertEqual(len(results), 24)
+            for (n, i), (id, body) in results.items():
+                self.assertEqual(id, [n, i])
+                self.assertEqual(body, u'<p>Client %d, request %d.</p>\n'
+                                 % (n, i))
+
+
+if __name__ == '__main__':
+    unittest.main()
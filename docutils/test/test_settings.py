@@ -14,10 +14,12 @@ import sys
 import os
 import difflib
 import pprint
+import shutil
+import tempfile
 import warnings
 import unittest
 import DocutilsTestSupport              # must be imported before docutils
-from docutils import frontend, utils
+from docutils import core, frontend, utils
 from docutils.writers import html4css1, pep_html
 from docutils.parsers import rst
 
@@ -173,6 +175,130 @@ class ConfigEnvVarFileTests(ConfigFileTests):
         os.environ = self.orig_environ
 
 
+class ComponentSettingsTests(unittest.TestCase):
+
+    components = (pep_html.Writer, rst.Parser)
+
+    def setUp(self):
+        self.orig_environ = os.environ
+        os.environ = os.environ.copy()
+        self.config_file = fixpath('data/config_cached.txt')
+        self.write_config('[general]\ntab_width: 4\n')
+        os.environ['DOCUTILSCONFIG'] = self.config_file
+        frontend.clear_settings_cache()
+
+    def tearDown(self):
+        os.environ = self.orig_environ
+        os.remove(self.config_file)
+        frontend.clear_settings_cache()
+
+    def write_config(self, content, mtime=None):
+        config = open(self.config_file, 'w')
+        config.write(content)
+        config.close()
+        if mtime is not None:
+            os.utime(self.config_file, (mtime, mtime))
+
+    def test_shared_instance(self):
+        component_settings = frontend.get_component_settings(self.components)
+        self.assertTrue(isinstance(component_settings,
+                                   frontend.ComponentSettings))
+        self.assertTrue(frontend.get_component_settings(
+            (pep_html.Writer(), rst.Parser())) is component_settings)
+        self.assertFalse(frontend.get_component_settings(
+            (html4css1.Writer, rst.Parser)) is component_settings)
+
+    def test_default_values(self):
+        defaults = {'report_level': 4, 'strip_classes': ['spam']}
+        option_parser = frontend.OptionParser(
+            components=self.components, defaults=defaults,
+            read_config_files=True)
+        expected = option_parser.get_default_values().__dict__
+        settings = frontend.get_component_settings(
+            self.components).get_default_values(defaults).__dict__
+        del expected['record_dependencies'], settings['record_dependencies']
+        self.assertEqual(settings, expected)
+        self.assertEqual(settings['tab_width'], 4)
+        self.assertEqual(settings['_config_files'], [self.config_file])
+
+    def test_disable_config(self):
+        settings = frontend.get_component_settings(
+            self.components).get_default_values({'_disable_config': True})
+        self.assertEqual(settings.tab_width, 8)
+        self.assertEqual(settings._config_files, [])
+
+    def test_config_file_changes(self):
+        component_settings = frontend.get_component_settings(self.components)
+        self.write_config('[general]\ntab_width: 4\n', mtime=1000000)
+        self.assertEqual(component_settings.get_default_values().tab_width, 4)
+        # Not read again, if the modification time is unchanged:
+        self.write_config('[general]\ntab_width: 6\n', mtime=1000000)
+        self.assertEqual(component_settings.get_default_values().tab_width, 4)
+        self.write_config('[general]\ntab_width: 6\n', mtime=2000000)
+        self.assertEqual(component_settings.get_default_values().tab_width, 6)
+
+    def test_list_settings(self):
+        component_settings = frontend.get_component_settings(self.components)
+        defaults = {'strip_classes': ['spam']}
+        settings = component_settings.get_default_values(defaults)
+        settings.strip_classes.append('eggs')
+        self.assertEqual(defaults, {'strip_classes': ['spam']})
+        settings = component_settings.get_default_values(defaults)
+        self.assertEqual(settings.strip_classes, ['spam'])
+
+    def test_dependency_lists(self):
+        component_settings = frontend.get_component_settings(self.components)
+        settings = component_settings.get_default_values()
+        settings.record_dependencies.add('ham')
+        settings = component_settings.get_default_values()
+        self.assertEqual(settings.record_dependencies.list, [])
+        # every publish records its own dependencies:
+        directory = tempfile.mkdtemp()
+        try:
+            dependencies = []
+            for name in ('inc0.txt', 'inc1.txt'):
+                path = os.path.join(directory, name)
+                f = open(path, 'w')
+                f.write('Included.\n')
+                f.close()
+                document = core.publish_doctree(
+                    '.. include:: %s\n' % name,
+                    source_path=os.path.join(directory, 'source.txt'),
+                    settings_overrides={'warning_stream': ''})
+                dependencies.append(document.settings.record_dependencies.list)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual([[os.path.basename(path) for path in paths]
+                          for paths in dependencies],
+                         [['inc0.txt'], ['inc1.txt']])
+
+
+class FrozenValuesTests(unittest.TestCase):
+
+    def test_frozen(self):
+        frozen = frontend.Values({'tab_width': 4,
+                                  'strip_classes': ['spam']}).freeze()
+        self.assertTrue(isinstance(frozen, frontend.FrozenValues))
+        self.assertTrue(frozen.freeze() is frozen)
+        self.assertEqual(frozen.tab_width, 4)
+        self.assertRaises(AttributeError, setattr, frozen, 'tab_width', 8)
+        self.assertRaises(AttributeError, delattr, frozen, 'tab_width')
+        self.assertRaises(AttributeError, frozen.ensure_value, 'spam', 1)
+
+    def test_copy(self):
+        frozen = frontend.FrozenValues({'tab_width': 4,
+                                        'strip_classes': ['spam']})
+        self.assertEqual(frozen.record_dependencies, None)
+        settings = frozen.copy()
+        self.assertFalse(isinstance(settings, frontend.FrozenValues))
+        settings.tab_width = 8
+        settings.strip_classes.append('eggs')
+        settings.record_dependencies.add('ham')
+        self.assertEqual(frozen.tab_width, 4)
+        self.assertEqual(frozen.strip_classes, ['spam'])
+        self.assertEqual(frozen.copy().record_dependencies.list, [])
+
+
 class HelperFunctionsTests(unittest.TestCase):
 
     pathdict = {'foo': 'hallo', 'ham': u'h\xE4m', 'spam': u'spam'}
@@ -268,6 +268,65 @@ class EmptyStateTests(unittest.TestCase):
                             'nop3': (dummy, self.state.nop3, 'bogus')}))
 
 
+class CombinedTransitionsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.state = statemachine.State(EmptyClass(), debug=debug)
+        self.state.patterns = {'nop': 'a+',
+                               'nop2': r'(b)\1',
+                               'nop3': 'a'}
+        self.state.nop2 = self.state.nop3 = self.state.nop
+        self.state.add_initial_transitions = lambda: None
+        names, transitions = self.state.make_transitions(
+            ['nop', 'nop2', 'nop3'])
+        self.state.add_transitions(names, transitions)
+
+    def test_first_match_wins(self):
+        pattern, group_names = self.state.get_combined_transitions()
+        match = pattern.match('aaa')
+        self.assertEqual(group_names[match.lastindex], 'nop')
+        match = pattern.match('bb')
+        self.assertEqual(group_names[match.lastindex], 'nop2')
+        self.assertEqual(pattern.match('bc'), None)
+
+    def test_invalidation(self):
+        combined = self.state.get_combined_transitions()
+        self.state.remove_transition('nop')
+        pattern, group_names = self.state.get_combined_transitions()
+        self.assertEqual(group_names[pattern.match('aaa').lastindex], 'nop3')
+        self.state.add_transition('nop', self.state.make_transition('nop'))
+        self.assertEqual(self.state.get_combined_transitions(), combined)
+
+    def test_combine_patterns(self):
+        combined, group_indices = statemachine.combine_patterns(
+            [re.compile(r'(x)\1'), re.compile(r'(y)[\1]\1\101')])
+        self.assertEqual(combined.pattern, r'((x)\2)|((y)[\1]\4\101)')
+        self.assertEqual(group_indices, {1: 0, 3: 1})
+        self.assertEqual(statemachine.combine_patterns(
+            [re.compile('x'), re.compile('y', re.IGNORECASE)]), None)
+        self.assertEqual(statemachine.combine_patterns(
+            [re.compile('x'), re.compile('(?P<a>y)(?(a)z)')]), None)
+        self.assertEqual(statemachine.combine_patterns(
+            [re.compile('(?P<a>x)'), re.compile('(?P<a>y)')]), None)
+
+    def test_check_line(self):
+        sm = statemachine.StateMachine([], None)
+        self.state.nop = lambda match, context, next_state: (
+            context, next_state, [match.group(), match.groups()])
+        self.state.nop2 = self.state.nop
+        self.state.remove_transition('nop')
+        self.state.remove_transition('nop2')
+        self.state.add_transitions(['nop', 'nop2'], {
+            'nop': self.state.make_transition('nop'),
+            'nop2': self.state.make_transition('nop2')})
+        sm.line = 'bbb'
+        self.assertEqual(sm.check_line(None, self.state),
+                         (None, 'State', ['bb', ('b',)]))
+        self.state.combine_transitions = False
+        self.assertEqual(sm.check_line(None, self.state),
+                         (None, 'State', ['bb', ('b',)]))
+
+
 class MiscTests(unittest.TestCase):
 
     s2l_string = "hello\tthere\thow are\tyou?\n\tI'm fine\tthanks.\n"
@@ -277,6 +336,15 @@ class MiscTests(unittest.TestCase):
         self.assertEqual(statemachine.string2lines(self.s2l_string),
                           self.s2l_expected)
 
+    def test_get_2D_block(self):
+        lines = statemachine.StringList([u'| ab | cd |',
+                                         u'| \xe4b | cd |',
+                                         u'| a\u0306b | c  |'], 'test')
+        self.assertEqual(list(lines.get_2D_block(0, 1, 3, 5)),
+                         [u'ab', u'\xe4b', u'a\u0306b'])
+        self.assertEqual(list(lines.get_2D_block(0, 6, 3, 10)),
+                         [u'cd', u'cd', u'c'])
+
 
 if __name__ == '__main__':
     unittest.main()
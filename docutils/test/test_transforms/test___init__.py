@@ -14,7 +14,7 @@ import unittest
 if __name__ == '__main__':
     import __init__
 from test_transforms import DocutilsTestSupport # before importing docutils!
-from docutils import transforms, utils
+from docutils import nodes, transforms, utils
 
 
 class TestTransform(transforms.Transform):
@@ -41,5 +41,100 @@ class KwargsTestCase(unittest.TestCase):
         self.assertEqual(transform_record[3], {'foo': 42})
 
 
+visits = []
+
+class RecordingTransform(transforms.NodeTransform):
+
+    node_classes = (nodes.paragraph,)
+    changes_tree = False
+
+    def visit_node(self, node):
+        visits.append((self.__class__.__name__, node.astext()))
+
+class First(RecordingTransform):
+    default_priority = 810
+
+class Second(RecordingTransform):
+    default_priority = 820
+    node_classes = (nodes.paragraph, nodes.emphasis)
+
+class Disabled(RecordingTransform):
+    default_priority = 830
+
+    def prepare(self):
+        return False
+
+class Removing(RecordingTransform):
+    default_priority = 840
+    changes_tree = True
+
+    def visit_node(self, node):
+        RecordingTransform.visit_node(self, node)
+        node.parent.remove(node)
+
+class Late(RecordingTransform):
+    default_priority = 850
+
+class OtherBand(RecordingTransform):
+    default_priority = 910
+
+class OverridingApply(RecordingTransform):
+    default_priority = 815
+
+    def apply(self):
+        visits.append(('OverridingApply', None))
+
+
+class NodeTransformTestCase(unittest.TestCase):
+
+    def setUp(self):
+        del visits[:]
+        self.document = utils.new_document('test data')
+        self.document += nodes.paragraph('', 'one')
+        self.document += nodes.paragraph('', '', nodes.emphasis('', 'two'))
+
+    def apply(self, *transform_classes):
+        transformer = self.document.transformer
+        transformer.add_transforms(transform_classes)
+        transformer.apply_transforms()
+        return transformer.applied
+
+    def test_combined(self):
+        applied = self.apply(First, Second, Disabled, Removing, Late)
+        self.assertEqual([entry[1] for entry in applied],
+                         [First, Second, Disabled, Removing, Late])
+        # one traversal for the first four transforms, "Late" comes
+        # after a tree change:
+        self.assertEqual(visits, [('First', 'one'), ('Second', 'one'),
+                                  ('Removing', 'one'),
+                                  ('First', 'two'), ('Second', 'two'),
+                                  ('Removing', 'two'),
+                                  ('Second', 'two')])
+        self.assertEqual(len(self.document), 0)
+
+    def test_separate(self):
+        self.apply(Removing, Late)
+        self.assertEqual(visits, [('Removing', 'one'), ('Removing', 'two')])
+        self.setUp()
+        self.apply(First, OtherBand)
+        self.assertEqual(visits, [('First', 'one'), ('First', 'two'),
+                                  ('OtherBand', 'one'), ('OtherBand', 'two')])
+        self.setUp()
+        self.apply(First, OverridingApply, Second)
+        self.assertEqual(visits, [('First', 'one'), ('First', 'two'),
+                                  ('OverridingApply', None),
+                                  ('Second', 'one'), ('Second', 'two'),
+                                  ('Second', 'two')])
+
+    def test_pending(self):
+        pending = nodes.pending(Second)
+        self.document += pending
+        self.document.transformer.add_pending(pending)
+        self.assertEqual(len(self.apply(First)), 2)
+        self.assertEqual(visits, [('First', 'one'), ('First', 'two'),
+                                  ('Second', 'one'), ('Second', 'two'),
+                                  ('Second', 'two')])
+
+
 if __name__ == '__main__':
     unittest.main()
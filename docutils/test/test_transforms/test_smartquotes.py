@@ -426,6 +426,10 @@ u"""\
 <document source="test data">
     <paragraph>
         German „smart quotes“ and ‚secondary smart quotes‘.
+    <system_message level="1" line="3" source="test data" type="INFO">
+        <paragraph>
+            No directive entry for "class" in module "docutils.parsers.rst.languages.de".
+            Using English fallback for directive "class".
     <paragraph classes="language-en">
         English “smart quotes” and ‘secondary smart quotes’.
 """],
@@ -452,6 +456,10 @@ u"""\
         Alternative German »smart quotes« and ›secondary smart quotes‹.
     <paragraph>
         In this case, the apostrophe isn’t a closing secondary quote!
+    <system_message level="1" line="5" source="test data" type="INFO">
+        <paragraph>
+            No directive entry for "class" in module "docutils.parsers.rst.languages.de".
+            Using English fallback for directive "class".
     <paragraph classes="language-en-uk">
         British ‘quotes’ use single and “secondary quotes” double quote signs
         (there are no alternative quotes defined).
@@ -472,6 +480,10 @@ u"""\
 <document source="test data">
     <paragraph>
         German «smart quotes» and (secondary smart quotes).
+    <system_message level="1" line="3" source="test data" type="INFO">
+        <paragraph>
+            No directive entry for "class" in module "docutils.parsers.rst.languages.de".
+            Using English fallback for directive "class".
     <paragraph classes="language-nl">
         Dutch „smart quotes” and ’s Gravenhage (leading apostrophe).
 """],
@@ -150,6 +150,80 @@ class ViewListTests(unittest.TestCase):
         self.assertEqual(a, self.a)
         self.assertEqual(s, a[2:-2])
 
+    def test_shared_slice(self):
+        a = statemachine.ViewList(self.a[:])
+        s = a[1:-1]
+        self.assertTrue(s._data is a._data)
+        # copy on write, in the child ...
+        s.trim_start(1)
+        s[0] = 'C'
+        self.assertEqual(a, list('abCdefg'))
+        self.assertEqual(s, list('Cdef'))
+        self.assertEqual(s.info(0), ('a', 2))
+        # ... and in the parent:
+        s = a[1:3]
+        a[1] = 'B'
+        self.assertEqual(s, list('bC'))
+        self.assertEqual(a, list('aBCdefg'))
+
+    def test_exposed_data(self):
+        a = statemachine.ViewList(self.a[:])
+        s = a[2:4]
+        s.data.append('x')
+        s.items.append(('x', 0))
+        self.assertEqual(a, self.a)
+        self.assertEqual(s, list('cdx'))
+        self.assertEqual(s.info(-1), ('x', 0))
+
+    def test_source_offset_list(self):
+        items = [('a', 0), ('a', 1), (None, None), ('b', 7)]
+        sol = statemachine.SourceOffsetList(items)
+        self.assertEqual(list(sol), items)
+        self.assertEqual(sol, items)
+        self.assertEqual(sol[2], (None, None))
+        self.assertEqual(sol[1:3], items[1:3])
+        sol.insert(0, ('c', 3))
+        sol[-1] = ('a', 2)
+        del sol[2]
+        self.assertEqual(sol, [('c', 3), ('a', 0), (None, None), ('a', 2)])
+        self.assertEqual(sol.pop(), ('a', 2))
+        self.assertEqual(statemachine.SourceOffsetList.from_source('d', 2),
+                         [('d', 0), ('d', 1)])
+
+    def test_source_tables(self):
+        # every list has its own table of sources, shared with its copies
+        sol = statemachine.SourceOffsetList([('a', 0), ('b', 0)])
+        other = statemachine.SourceOffsetList([('c', 5), ('a', 1)])
+        self.assertFalse(sol.sources is other.sources)
+        self.assertTrue(sol[1:].sources is sol.sources)
+        self.assertEqual(sol + other, [('a', 0), ('b', 0),
+                                       ('c', 5), ('a', 1)])
+        sol[0:1] = other
+        sol.extend(statemachine.SourceOffsetList.from_source('d', 1))
+        self.assertEqual(sol, [('c', 5), ('a', 1), ('b', 0), ('d', 0)])
+        self.assertEqual(statemachine.SourceOffsetList([('a', 1)]),
+                         other[1:])
+        del sol, other
+        # a fresh list does not see the sources of other lists
+        self.assertEqual(statemachine.SourceOffsetList().sources, [None])
+
+    def test_negative_offsets(self):
+        # -1 is a valid offset (e.g. of the padding lines of included files)
+        items = [('pad', -1), ('a', None), ('a', 0)]
+        sol = statemachine.SourceOffsetList(items)
+        self.assertEqual(list(sol), items)
+        sol.append(('pad', -1))
+        sol[1] = ('b', -1)
+        sol.insert(0, ('c', None))
+        self.assertEqual(sol, [('c', None), ('pad', -1), ('b', -1), ('a', 0),
+                               ('pad', -1)])
+        view = statemachine.ViewList(['x', 'y'], items=[('pad', -1),
+                                                        ('a', None)])
+        self.assertEqual(view.info(0), ('pad', -1))
+        self.assertEqual(view.offset(1), None)
+        self.assertEqual(list(view.xitems()), [('pad', -1, 'x'),
+                                               ('a', None, 'y')])
+
     def test_info(self):
         ab = self.a + self.b
         self.assertEqual(ab.info(0), ('a', 0))
@@ -25,6 +25,9 @@ import sys
 import os
 import os.path
 import copy
+import hashlib
+import json
+import multiprocessing
 from fnmatch import fnmatch
 import docutils
 from docutils import ApplicationError
@@ -34,6 +37,11 @@ from docutils.parsers import rst
 from docutils.readers import standalone, pep
 from docutils.writers import html4css1, html5_polyglot, pep_html
 
+if sys.version_info >= (3, 0):
+    from io import StringIO
+else:
+    from StringIO import StringIO
+
 
 usage = '%prog [options] [<directory> ...]'
 description = ('Generates .html from all the reStructuredText .txt files '
@@ -86,9 +94,18 @@ class SettingsSpec(docutils.SettingsSpec):
           {'action': 'store_true', 'validator': frontend.validate_boolean}),
          ('Do not process files, show files that would be processed.',
           ['--dry-run'],
-          {'action': 'store_true', 'validator': frontend.validate_boolean}),))
-
-    relative_path_settings = ('prune',)
+          {'action': 'store_true', 'validator': frontend.validate_boolean}),
+         ('Number of worker processes used to process files in parallel.  '
+          'Default: 1 (process files one after another in this process).',
+          ['--jobs', '-j'],
+          {'metavar': '<N>', 'type': 'int', 'default': 1,
+           'validator': frontend.validate_nonnegative_int}),
+         ('Keep a build manifest in <file> and skip source files whose '
+          'output is up to date (incremental build).',
+          ['--manifest'],
+          {'metavar': '<file>'}),))
+
+    relative_path_settings = ('prune', 'manifest')
     config_section = 'buildhtml application'
     config_section_dependencies = ('applications',)
 
@@ -121,6 +138,138 @@ class Struct(object):
         self.__dict__.update(keywordargs)
 
 
+def publish_job(job):
+    """
+    Process one source file in a worker process (see `Builder.run`).
+
+    `job` is a ``(settings, reader_name, writer_name)`` tuple.  Return a
+    ``(failed, report, dependencies)`` tuple; `report` holds the warning and
+    error output collected while processing the file, `dependencies` the
+    list of recorded dependencies.
+    """
+    settings, reader_name, writer_name = job
+    report = StringIO()
+    if not settings.warning_stream:
+        settings.warning_stream = report
+    errout = ErrorOutput(report, encoding=settings.error_encoding)
+    failed = False
+    # The publisher reports fatal errors to `sys.stderr` and exits:
+    stderr, sys.stderr = sys.stderr, report
+    try:
+        core.publish_file(source_path=settings._source,
+                          destination_path=settings._destination,
+                          reader_name=reader_name,
+                          parser_name='restructuredtext',
+                          writer_name=writer_name,
+                          settings=settings)
+    except ApplicationError:
+        error = sys.exc_info()[1]  # get exception in Python 3.x
+        errout.write('        %s\n' % ErrorString(error))
+        failed = True
+    except SystemExit:
+        failed = True
+    finally:
+        sys.stderr = stderr
+    return failed, report.getvalue(), settings.record_dependencies.list
+
+
+class BuildManifest(object):
+
+    """
+    Record of the generated files, used for incremental builds.
+
+    For every output file, the manifest stores hashes of the source, the
+    effective settings, and the dependencies recorded while processing
+    (see `utils.DependencyList`).  A file is up to date if none of them
+    changed since the last run with the same Docutils version.
+    """
+
+    ignored_settings = ('recurse', 'prune', 'ignore', 'html_writer', 'silent',
+                        'dry_run', 'jobs', 'manifest', 'record_dependencies',
+                        'warning_stream')
+    """Settings that do not influence the output."""
+
+    def __init__(self, path):
+        self.path = path
+        self.version = docutils.__version__
+        if docutils.__version_details__:
+            self.version += ' [%s]' % docutils.__version_details__
+        self.entries = {}
+        try:
+            manifest_file = open(path)
+            try:
+                data = json.load(manifest_file)
+            finally:
+                manifest_file.close()
+        except (IOError, ValueError):
+            return
+        if data.get('docutils_version') == self.version:
+            self.entries = data.get('files', {})
+
+    def save(self):
+        manifest_file = open(self.path, 'w')
+        try:
+            json.dump({'docutils_version': self.version,
+                       'files': self.entries},
+                      manifest_file, indent=1, sort_keys=True)
+        finally:
+            manifest_file.close()
+
+    def file_hash(self, path):
+        try:
+            input_file = open(path, 'rb')
+        except IOError:
+            return None
+        try:
+            return hashlib.sha1(input_file.read()).hexdigest()
+        finally:
+            input_file.close()
+
+    def settings_hash(self, settings):
+        items = []
+        for key, value in sorted(settings.__dict__.items()):
+            if key.startswith('_') or key in self.ignored_settings:
+                continue
+            if isinstance(value, list):
+                # list settings grow duplicate entries as we recurse
+                value = utils.uniq(value)
+            items.append((key, value))
+        return hashlib.sha1(repr(items).encode('utf-8')).hexdigest()
+
+    def is_current(self, settings, settings_hash):
+        """Return True if the output of `settings._source` is up to date."""
+        entry = self.entries.get(os.path.abspath(settings._destination))
+        if (not entry or not os.path.exists(settings._destination)
+            or entry['settings'] != settings_hash
+            or entry['source'] != self.file_hash(settings._source)):
+            return False
+        for path, digest in entry['dependencies'].items():
+            if self.file_hash(path) != digest:
+                return False
+        return True
+
+    def dependencies(self, settings):
+        """
+        Return the dependencies recorded for the output of
+        `settings._source` (absolute paths).
+        """
+        entry = self.entries.get(os.path.abspath(settings._destination))
+        if not entry:
+            return []
+        return sorted(entry['dependencies'])
+
+    def record(self, settings, settings_hash, dependencies):
+        dependencies = [os.path.abspath(path) for path in dependencies]
+        self.entries[os.path.abspath(settings._destination)] = {
+            'source': self.file_hash(settings._source),
+            'settings': settings_hash,
+            'dependencies': dict((path, self.file_hash(path))
+                                 for path in dependencies)}
+
+    def discard(self, settings):
+        self.entries.pop(os.path.abspath(settings._destination), None)
+
+
 class Builder(object):
 
     def __init__(self):
@@ -193,7 +342,20 @@ class Builder(object):
         return settings
 
     def run(self, directory=None, recurse=1):
+        """
+        Process the source files; return the number of failed files.
+
+        With ``--jobs`` greater than 1, the files are published by a pool
+        of worker processes.  Settings are still resolved here (including
+        directory-local config files); the reports of the workers are
+        written in the order the files were found.
+        """
         recurse = recurse and self.initial_settings.recurse
+        self.failures = 0
+        self.jobs = []
+        self.manifest = None
+        if self.initial_settings.manifest and not self.initial_settings.dry_run:
+            self.manifest = BuildManifest(self.initial_settings.manifest)
         if directory:
             self.directories = [directory]
         elif self.settings_spec._directories:
@@ -207,6 +369,15 @@ class Builder(object):
                 if not recurse:
                     del dirs[:]
                 self.visit(root, files, dirs)
+        if self.jobs:
+            self.process_jobs()
+        if self.manifest:
+            self.manifest.save()
+        dependencies = self.initial_settings.record_dependencies
+        if dependencies.file is not None and dependencies.list:
+            # the file is opened with the first dependency written
+            dependencies.close()
+        return self.failures
 
     def visit(self, directory, names, subdirectories):
         settings = self.get_settings('', directory)
@@ -241,6 +412,26 @@ class Builder(object):
         pub_struct = self.publishers[publisher]
         settings._source = os.path.normpath(os.path.join(directory, name))
         settings._destination = settings._source[:-4]+'.html'
+        settings_hash = None
+        if self.manifest:
+            settings_hash = self.manifest.settings_hash(settings)
+            if self.manifest.is_current(settings, settings_hash):
+                if not self.initial_settings.silent:
+                    errout.write('    ::: Skipping (up to date): %s\n' % name)
+                    sys.stderr.flush()
+                settings.record_dependencies.add(
+                    *self.manifest.dependencies(settings))
+                return
+        dependency_list = settings.record_dependencies
+        if self.manifest or self.initial_settings.jobs > 1:
+            # Record the dependencies of this file separately; they are
+            # added to `dependency_list` (--record-dependencies) afterwards:
+            settings.record_dependencies = utils.DependencyList()
+        if self.initial_settings.jobs > 1 and not settings.dry_run:
+            self.jobs.append(((settings, pub_struct.reader_name,
+                               pub_struct.writer_name), settings_hash,
+                              dependency_list))
+            return
         if not self.initial_settings.silent:
             errout.write('    ::: Processing: %s\n' % name)
             sys.stderr.flush()
@@ -255,7 +446,44 @@ class Builder(object):
         except ApplicationError:
             error = sys.exc_info()[1]  # get exception in Python 3.x
             errout.write('        %s\n' % ErrorString(error))
+            self.failures += 1
+            if self.manifest:
+                self.manifest.discard(settings)
+        else:
+            if self.manifest:
+                self.manifest.record(settings, settings_hash,
+                                     settings.record_dependencies.list)
+        if settings.record_dependencies is not dependency_list:
+            dependency_list.add(*settings.record_dependencies.list)
+
+    def process_jobs(self):
+        """Publish the collected jobs with a pool of worker processes."""
+        errout = ErrorOutput(encoding=self.initial_settings.error_encoding)
+        pool = multiprocessing.Pool(self.initial_settings.jobs)
+        try:
+            results = pool.imap(publish_job, [job for job, settings_hash,
+                                              dependency_list in self.jobs])
+            for ((job, settings_hash, dependency_list),
+                 (failed, report, dependencies)) in zip(self.jobs, results):
+                dependency_list.add(*dependencies)
+                settings = job[0]
+                if not self.initial_settings.silent:
+                    errout.write('    ::: Processing: %s\n' % settings._source)
+                errout.write(report)
+                sys.stderr.flush()
+                if failed:
+                    self.failures += 1
+                    if self.manifest:
+                        self.manifest.discard(settings)
+                elif self.manifest:
+                    self.manifest.record(settings, settings_hash,
+                                         dependencies)
+        finally:
+            pool.close()
+            pool.join()
+        self.jobs = []
 
 
 if __name__ == "__main__":
-    Builder().run()
+    if Builder().run():
+        sys.exit(1)
@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+
+# $Id$
+# Copyright: This script has been placed in the public domain.
+
+"""
+Benchmark suite for Docutils.
+
+Workloads:
+
+parse
+  Read (decode and parse) the sources with the standalone reader and the
+  reStructuredText parser.
+transform
+  Apply the transforms of the reader, the parser, and the "null" writer
+  to freshly parsed document trees.
+html4css1, html5, latex2e, xetex, manpage, odf_odt, xml, pseudoxml
+  Write transformed document trees with the writer (translation and
+  output encoding).  Documents the writer fails on are skipped (e.g.
+  images with odf_odt if PIL is missing).
+
+Corpora:
+
+functional
+  The input files of the functional tests (``test/functional/input/``).
+synthetic-<scale>
+  The synthetic document generated by ``generate_corpus.py`` (default
+  feature mix, seed 0); its size grows linearly with <scale>.
+
+Every workload runs over every corpus for a number of rounds (after
+warm-up rounds, with the garbage collector disabled while timing).  The
+minimum, median, and relative standard deviation of the round times are
+reported.  Results can be stored as a baseline (JSON) and compared with
+a later run; median times that changed more than a threshold are flagged
+and regressions make the script exit with status 1.
+
+With ``--scaling``, the workloads run over synthetic documents of the
+given scales instead.  The median time per scale unit is compared with
+the one of the smallest scale; growth beyond near-linear is flagged
+(exit status 1).
+
+With ``--node-index``, the transforms are applied with the node index
+(the "node_index" setting); compare with a baseline saved without it.
+
+Examples::
+
+  benchmark.py --save=baseline.json
+  benchmark.py --compare=baseline.json --workloads=parse,html5
+  benchmark.py --profile --workloads=parse --corpora=synthetic-10
+  benchmark.py --scaling=1,10,100 --workloads=parse,transform
+  benchmark.py --workloads=transform --node-index --compare=baseline.json
+"""
+
+from __future__ import print_function
+import argparse
+import atexit
+import cProfile
+import gc
+import glob
+import json
+import os
+import platform
+import pstats
+import shutil
+import sys
+import tempfile
+import time
+
+import docutils
+from docutils import core, io
+
+from generate_corpus import CorpusGenerator, write_files
+
+try:
+    clock = time.perf_counter
+except AttributeError:                  # Python 2
+    clock = time.time
+
+
+writer_names = ('html4css1', 'html5', 'latex2e', 'xetex', 'manpage',
+                'odf_odt', 'xml', 'pseudoxml')
+
+workload_names = ('parse', 'transform') + writer_names
+
+settings_overrides = {'report_level': 5,
+                      'halt_level': 5,
+                      'input_encoding': 'utf-8',
+                      'output_encoding': 'utf-8',
+                      'embed_stylesheet': False,
+                      '_disable_config': True}
+
+def functional_corpus():
+    """Return the functional test inputs as ``(source_path, text)`` pairs."""
+    input_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '..', '..', 'test', 'functional', 'input')
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(input_dir, '*.txt'))):
+        f = open(path, 'rb')
+        corpus.append((path, f.read().decode('utf-8')))
+        f.close()
+    return corpus
+
+def synthetic_corpus(scale):
+    """
+    Return the document generated by `generate_corpus` with `scale` (the
+    files are written to a temporary directory, for the included files).
+    """
+    files = CorpusGenerator(scale=scale).generate()
+    directory = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, directory, True)
+    write_files(files, directory)
+    return [(os.path.join(directory, CorpusGenerator.main_name),
+             files[CorpusGenerator.main_name])]
+
+def get_corpus(name):
+    if name == 'functional':
+        return functional_corpus()
+    if name.startswith('synthetic-'):
+        return synthetic_corpus(int(name[len('synthetic-'):]))
+    raise ValueError('unknown corpus "%s"' % name)
+
+
+def new_publisher(source_path, text, writer_name='null'):
+    pub = core.Publisher(source_class=io.StringInput,
+                         destination_class=io.StringOutput)
+    pub.set_components('standalone', 'restructuredtext', writer_name)
+    pub.process_programmatic_settings(None, settings_overrides, None)
+    pub.set_source(text, source_path)
+    pub.set_destination()
+    return pub
+
+def prepare_parse(corpus):
+    """Return a function reading all documents of `corpus`."""
+    publishers = [new_publisher(path, text) for path, text in corpus]
+    def run():
+        start = clock()
+        for pub in publishers:
+            pub.reader.read(pub.source, pub.parser, pub.settings)
+        return clock() - start
+    return run, len(publishers)
+
+def prepare_transform(corpus):
+    """Return a function transforming all documents of `corpus`."""
+    publishers = [new_publisher(path, text) for path, text in corpus]
+    def run():
+        seconds = 0
+        for pub in publishers:
+            pub.document = pub.reader.read(pub.source, pub.parser,
+                                           pub.settings)
+            start = clock()
+            pub.apply_transforms()
+            seconds += clock() - start
+        return seconds
+    return run, len(publishers)
+
+def prepare_writer(corpus, writer_name):
+    """Return a function writing all documents of `corpus` supported by
+    the writer `writer_name`."""
+    publishers = []
+    for path, text in corpus:
+        pub = new_publisher(path, text, writer_name)
+        pub.document = pub.reader.read(pub.source, pub.parser, pub.settings)
+        pub.apply_transforms()
+        try:
+            pub.writer.write(pub.document.deepcopy(), pub.destination)
+        except Exception:
+            # not supported (or requiring a missing optional package)
+            continue
+        publishers.append(pub)
+    def run():
+        seconds = 0
+        for pub in publishers:
+            document = pub.document.deepcopy()
+            start = clock()
+            pub.writer.write(document, pub.destination)
+            seconds += clock() - start
+        return seconds
+    return run, len(publishers)
+
+def prepare(workload, corpus):
+    """Return a ``(function, number of documents)`` tuple."""
+    if workload == 'parse':
+        return prepare_parse(corpus)
+    if workload == 'transform':
+        return prepare_transform(corpus)
+    return prepare_writer(corpus, workload)
+
+
+def measure(run, rounds, warmup):
+    """Return the times of `rounds` calls of `run` (after `warmup` calls)."""
+    for i in range(warmup):
+        run()
+    times = []
+    for i in range(rounds):
+        gc.collect()
+        gc.disable()
+        try:
+            times.append(run())
+        finally:
+            gc.enable()
+    return times
+
+def statistics(times):
+    """Return a dictionary with statistics of `times`."""
+    times = sorted(times)
+    n = len(times)
+    median = (times[(n - 1) // 2] + times[n // 2]) / 2
+    mean = sum(times) / n
+    if n > 1:
+        stdev = (sum([(t - mean) ** 2 for t in times]) / (n - 1)) ** 0.5
+    else:
+        stdev = 0.0
+    return {'times': times, 'min': times[0], 'max': times[-1],
+            'median': median, 'mean': mean, 'stdev': stdev}
+
+def environment():
+    return {'docutils': docutils.__version__,
+            'docutils_details': docutils.__version_details__,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform()}
+
+
+def run_suite(workloads, corpora, rounds, warmup, out=sys.stdout):
+    """Run the benchmarks, print a table, and return the results."""
+    results = {}
+    print('%-10s %-14s %5s %11s %11s %7s' % (
+        'workload', 'corpus', 'docs', 'min [ms]', 'median [ms]', 'rsd [%]'),
+          file=out)
+    for corpus_name in corpora:
+        corpus = get_corpus(corpus_name)
+        for workload in workloads:
+            run, documents = prepare(workload, corpus)
+            result = statistics(measure(run, rounds, warmup))
+            result['documents'] = documents
+            results['%s/%s' % (workload, corpus_name)] = result
+            print('%-10s %-14s %5d %11.2f %11.2f %7.1f' % (
+                workload, corpus_name, documents, result['min'] * 1e3,
+                result['median'] * 1e3,
+                100 * result['stdev'] / (result['mean'] or 1)), file=out)
+            out.flush()
+    return results
+
+def compare(results, baseline, threshold, out=sys.stdout):
+    """
+    Print the changes of the median times against the `baseline` results.
+    Return the number of regressions (slower by more than `threshold`).
+    """
+    regressions = 0
+    print('\n%-25s %12s %12s %8s' % ('benchmark', 'base [ms]', 'new [ms]',
+                                      'ratio'), file=out)
+    for key in sorted(results):
+        if key not in baseline:
+            continue
+        base = baseline[key]['median']
+        new = results[key]['median']
+        ratio = new / base if base else 1.0
+        if ratio > 1 + threshold:
+            flag = 'REGRESSION'
+            regressions += 1
+        elif ratio < 1 - threshold:
+            flag = 'improved'
+        else:
+            flag = ''
+        print('%-25s %12.2f %12.2f %8.3f  %s' % (
+            key, base * 1e3, new * 1e3, ratio, flag), file=out)
+    return regressions
+
+def profile(workloads, corpora, out=sys.stdout):
+    """
+    Run every benchmark once with `cProfile` (after one warm-up run) and
+    print the statistics.
+    """
+    for corpus_name in corpora:
+        corpus = get_corpus(corpus_name)
+        for workload in workloads:
+            run, documents = prepare(workload, corpus)
+            run()                       # warm up (compile patterns, ...)
+            profiler = cProfile.Profile()
+            profiler.runcall(run)
+            print('\n::: %s/%s' % (workload, corpus_name), file=out)
+            stats = pstats.Stats(profiler, stream=out)
+            stats.strip_dirs()
+            stats.sort_stats('time')
+            stats.print_stats(40)
+
+def check_scaling(workloads, scales, rounds, warmup, tolerance,
+                  out=sys.stdout):
+    """
+    Print the median time per scale unit for synthetic documents of the
+    given `scales`.  Return the number of workloads where the time per
+    unit grows by more than `tolerance` (relative to the smallest scale).
+    """
+    superlinear = 0
+    print('%-10s %7s %12s %15s %8s' % ('workload', 'scale', 'median [ms]',
+                                        'per unit [ms]', 'ratio'), file=out)
+    corpora = [(scale, synthetic_corpus(scale)) for scale in sorted(scales)]
+    for workload in workloads:
+        base = None
+        flagged = False
+        for scale, corpus in corpora:
+            run, documents = prepare(workload, corpus)
+            median = statistics(measure(run, rounds, warmup))['median']
+            per_unit = median / scale
+            if base is None:
+                base = per_unit
+            ratio = per_unit / base if base else 1.0
+            flag = ''
+            if ratio > 1 + tolerance:
+                flag = 'SUPERLINEAR'
+                flagged = True
+            print('%-10s %7d %12.2f %15.3f %8.3f  %s' % (
+                workload, scale, median * 1e3, per_unit * 1e3,
+                ratio, flag), file=out)
+            out.flush()
+        superlinear += flagged
+    return superlinear
+
+def comma_separated(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--workloads', type=comma_separated,
+                        default=list(workload_names),
+                        help='comma-separated list of workloads '
+                        '(default: all)')
+    parser.add_argument('--corpora', type=comma_separated,
+                        default=['functional', 'synthetic-1',
+                                 'synthetic-10'],
+                        help='comma-separated list of corpora (default: '
+                        'functional,synthetic-1,synthetic-10)')
+    parser.add_argument('--rounds', type=int, default=7,
+                        help='timed rounds per benchmark (default: 7)')
+    parser.add_argument('--warmup', type=int, default=1,
+                        help='untimed rounds per benchmark (default: 1)')
+    parser.add_argument('--save', metavar='FILE',
+                        help='store the results as JSON in FILE')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare with the results stored in FILE')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative change of the median time flagged '
+                        'when comparing (default: 0.1)')
+    parser.add_argument('--scaling', type=comma_separated, metavar='SCALES',
+                        help='check the growth of the times with the '
+                        'comma-separated scales of the synthetic corpus '
+                        '(e.g. 1,10,100)')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='relative growth of the time per scale unit '
+                        'flagged by --scaling (default: 0.5)')
+    parser.add_argument('--profile', action='store_true',
+                        help='run every benchmark once with cProfile and '
+                        'print the statistics instead of timing')
+    parser.add_argument('--node-index', action='store_true',
+                        help='apply the transforms with the node index')
+    args = parser.parse_args(argv)
+    for workload in args.workloads:
+        if workload not in workload_names:
+            parser.error('unknown workload "%s"' % workload)
+    for corpus_name in args.corpora:
+        if not (corpus_name == 'functional'
+                or corpus_name.startswith('synthetic-')
+                and corpus_name[len('synthetic-'):].isdigit()):
+            parser.error('unknown corpus "%s"' % corpus_name)
+    if args.rounds < 1:
+        parser.error('at least one round is required')
+    if args.node_index:
+        settings_overrides['node_index'] = True
+
+    if args.profile:
+        profile(args.workloads, args.corpora)
+        return 0
+    if args.scaling:
+        if not all([scale.isdigit() and int(scale) for scale in args.scaling]):
+            parser.error('scales must be positive integers')
+        scales = [int(scale) for scale in args.scaling]
+        if check_scaling(args.workloads, scales, args.rounds, args.warmup,
+                         args.tolerance):
+            return 1
+        return 0
+    results = run_suite(args.workloads, args.corpora, args.rounds,
+                        args.warmup)
+    if args.save:
+        f = open(args.save, 'w')
+        json.dump({'environment': environment(), 'rounds': args.rounds,
+                   'results': results}, f, indent=1, sort_keys=True)
+        f.close()
+    if args.compare:
+        f = open(args.compare)
+        baseline = json.load(f)
+        f.close()
+        if baseline['environment'] != environment():
+            print('\nWarning: the baseline was measured in another '
+                  'environment:\n  %s' % baseline['environment'])
+        if compare(results, baseline['results'], args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
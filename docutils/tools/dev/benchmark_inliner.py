@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+# $Id$
+# Copyright: This script has been placed in the public domain.
+
+"""
+Benchmark inline markup parsing of paragraphs with many inline constructs.
+
+Parse one paragraph with an increasing number of inline constructs and
+print the time per construct.  With a linear-time scanner, the time per
+construct stays (roughly) constant as the paragraph grows.
+
+Call: benchmark_inliner.py [<max number of constructs>]
+"""
+
+from __future__ import print_function
+import sys
+import timeit
+
+import docutils.frontend
+import docutils.utils
+from docutils.parsers import rst
+
+
+constructs = ('*emphasis*', '**strong**', '``literal``', '`interpreted`',
+              ':sub:`role`', 'reference_', '`phrase reference`_',
+              '`embedded <http://example.org/>`__', '[1]_', '[CIT2020]_',
+              '|substitution|', '_`target`', 'http://example.org/standalone')
+
+def make_paragraph(count):
+    """Return a paragraph with `count` inline constructs."""
+    words = []
+    for i in range(count):
+        words.append(constructs[i % len(constructs)])
+        words.append('plain text\n' if i % 5 == 4 else 'plain text')
+    return ' '.join(words)
+
+def parse(parser, text, settings):
+    document = docutils.utils.new_document('<benchmark>', settings)
+    parser.parse(text, document)
+    return document
+
+def main(max_count=3200):
+    parser = rst.Parser()
+    settings = docutils.frontend.OptionParser(
+        components=(rst.Parser,)).get_default_values()
+    settings.report_level = 5
+    settings.halt_level = 5
+    count = 100
+    base = None
+    print('%10s %12s %16s %8s' % ('constructs', 'time [ms]',
+                                   'per construct [us]', 'ratio'))
+    while count <= max_count:
+        text = make_paragraph(count)
+        seconds = min(timeit.repeat(lambda: parse(parser, text, settings),
+                                    number=1, repeat=5))
+        per_construct = seconds / count
+        if base is None:
+            base = per_construct
+        print('%10d %12.2f %16.2f %8.2f' % (count, seconds * 1e3,
+                                             per_construct * 1e6,
+                                             per_construct / base))
+        count *= 2
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
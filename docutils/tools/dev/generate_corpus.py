@@ -0,0 +1,349 @@
+#!/usr/bin/env python
+
+# $Id$
+# Copyright: This script has been placed in the public domain.
+
+"""
+Generate synthetic reStructuredText documents for load and scaling tests.
+
+The generated document consists of ``sections * scale`` sections (on
+three levels).  Every section holds a few body blocks; the kind of each
+block is picked with the relative weights given for the features:
+
+paragraphs
+  Paragraphs with dense inline markup (emphasis, literals, roles,
+  hyperlink, footnote, and citation references).
+tables
+  Grid tables with ``table_rows`` rows and ``table_columns`` columns.
+lists
+  Bullet and enumerated lists nested ``list_depth`` levels deep.
+footnotes
+  Paragraphs with many footnote and citation references.
+substitutions
+  References to chains of ``chain_length`` nested substitutions.
+includes
+  "include" directives (for included files with a section body).
+misc
+  Literal blocks, admonitions, definition lists, and field lists.
+
+The output only depends on the parameters (the same seed gives the same
+documents with Python 2 and 3) and is valid: processing it reports no
+warnings.
+
+Call: generate_corpus.py [options] <directory>
+"""
+
+from __future__ import print_function
+import argparse
+import io
+import os
+import random
+import sys
+
+
+features = ('paragraphs', 'tables', 'lists', 'footnotes', 'substitutions',
+            'includes', 'misc')
+
+section_adornments = '=-~'
+
+words = (u'lorem ipsum dolor sit amet consectetur adipiscing elit sed do '
+         u'eiusmod tempor incididunt ut labore et dolore magna aliqua ut '
+         u'enim ad minim veniam quis nostrud exercitation ullamco laboris '
+         u'nisi aliquip ex ea commodo consequat duis aute irure in '
+         u'reprehenderit voluptate velit esse cillum fugiat nulla pariatur '
+         u'\xe4rger \u0441\u043b\u043e\u0432\u043e').split()
+
+
+class CorpusGenerator(object):
+
+    """
+    Generate a synthetic document and the files it includes.
+
+    The size and feature mix are set by the keyword arguments (see the
+    module docstring); `weights` maps feature names to relative weights
+    (missing features have weight 1, weight 0 disables a feature).
+    """
+
+    main_name = 'index.txt'
+    """File name of the main document."""
+
+    def __init__(self, seed=0, scale=1, sections=20, weights=None,
+                 inline_density=8, table_rows=20, table_columns=4,
+                 list_depth=6, chain_length=10):
+        self.random = random.Random(seed)
+        self.seed = seed
+        self.scale = scale
+        self.sections = sections
+        self.weights = [(feature, (weights or {}).get(feature, 1))
+                        for feature in features]
+        self.inline_density = inline_density
+        self.table_rows = table_rows
+        self.table_columns = table_columns
+        self.list_depth = list_depth
+        self.chain_length = chain_length
+
+    def generate(self):
+        """
+        Return a dictionary mapping file names to file contents (text);
+        the main document is `self.main_name`.
+        """
+        self.files = {}
+        self.citations = 0
+        self.chains = 0
+        self.include_count = 0
+        self.note_count = 0
+        self.section_count = self.sections * self.scale
+        lines = ['==================',
+                 ' Synthetic Corpus',
+                 '==================',
+                 '',
+                 ':seed: %s' % self.seed,
+                 ':scale: %s' % self.scale,
+                 '',
+                 '.. contents::',
+                 '']
+        level = 0
+        for n in range(self.section_count):
+            level = self.integer(0, min(level + 1, 2)) if n else 0
+            lines.extend(self.section(n, level))
+        lines.extend(self.definitions())
+        self.files[self.main_name] = u'\n'.join(lines)
+        return self.files
+
+    # random choices (using only `random.random()`, which gives the same
+    # sequence of numbers with Python 2 and 3)
+
+    def integer(self, low, high):
+        """Return a random integer N with low <= N <= high."""
+        return low + int(self.random.random() * (high - low + 1))
+
+    def choice(self, sequence):
+        return sequence[self.integer(0, len(sequence) - 1)]
+
+    def feature(self):
+        total = sum([weight for feature, weight in self.weights])
+        if not total:
+            return 'paragraphs'
+        x = self.random.random() * total
+        for feature, weight in self.weights:
+            x -= weight
+            if x < 0:
+                return feature
+        return self.weights[-1][0]
+
+    def text(self, count):
+        return u' '.join([self.choice(words) for i in range(count)])
+
+    # document parts
+
+    def section(self, n, level):
+        title = u'Section %d' % n
+        lines = [title, section_adornments[level] * len(title), '']
+        self.notes = []
+        for i in range(self.integer(2, 4)):
+            lines.extend(getattr(self, self.feature())())
+        for label in self.notes:
+            lines.extend(['.. [#%s] Footnote %s.' % (label, self.text(4)),
+                          ''])
+        return lines
+
+    def inline(self):
+        """Return a random inline construct (registering references)."""
+        kind = self.integer(0, 9)
+        if kind == 0:
+            return u'*%s*' % self.text(2)
+        if kind == 1:
+            return u'**%s**' % self.text(2)
+        if kind == 2:
+            return u'``%s``' % self.text(2)
+        if kind == 3:
+            return u':sub:`%s`' % self.text(1)
+        if kind == 4:
+            return u'`%s`' % self.text(2)
+        if kind == 5:
+            return u'`Section %d`_' % self.integer(0, self.section_count - 1)
+        if kind == 6:
+            return u'`%s <http://example.org/%d>`__' % (
+                self.text(2), self.integer(0, 10**6))
+        if kind == 7:
+            return u'[#%s]_' % self.footnote_label()
+        if kind == 8:
+            self.citations += 1
+            return u'[CIT%d]_' % (self.citations - 1)
+        return u'http://example.org/%s' % self.choice(words[:10])
+
+    def footnote_label(self):
+        """Return a new footnote label (defined at the end of the section)."""
+        self.notes.append(u'note%d' % self.note_count)
+        self.note_count += 1
+        return self.notes[-1]
+
+    def paragraph_text(self, density):
+        parts = []
+        for i in range(density):
+            parts.append(self.text(self.integer(2, 6)))
+            parts.append(self.inline())
+        parts.append(self.text(3) + u'.')
+        return parts
+
+    def wrap(self, parts):
+        """Return `parts` joined by spaces as lines of at most 72 chars."""
+        lines = []
+        line = u''
+        for part in parts:
+            if line and len(line) + len(part) > 72:
+                lines.append(line)
+                line = u''
+            line += (line and u' ') + part
+        lines.append(line)
+        return lines
+
+    def paragraphs(self):
+        return self.wrap(self.paragraph_text(self.inline_density)) + ['']
+
+    def footnotes(self):
+        parts = []
+        for i in range(self.inline_density):
+            parts.append(self.text(3))
+            if i % 2:
+                parts.append(u'[#%s]_' % self.footnote_label())
+            else:
+                parts.append(u'[CIT%d]_' % self.citations)
+                self.citations += 1
+        return self.wrap(parts + [u'end.']) + ['']
+
+    def tables(self):
+        columns = self.table_columns
+        rows = [[u'Header %d' % (i + 1) for i in range(columns)]]
+        for row in range(self.table_rows):
+            rows.append([u'%s %s' % (self.text(2), self.inline())
+                         for i in range(columns)])
+        widths = [max([len(row[i]) for row in rows]) + 2
+                  for i in range(columns)]
+        separator = u'+' + u'+'.join([u'-' * width for width in widths]) + u'+'
+        lines = [separator]
+        for i, row in enumerate(rows):
+            lines.append(u'|' + u'|'.join([u' %s ' % cell.ljust(width - 2)
+                                         for cell, width in zip(row, widths)])
+                         + u'|')
+            lines.append(separator.replace(u'-', u'=') if i == 0
+                         else separator)
+        return lines + ['']
+
+    def lists(self):
+        lines = []
+        indent = ''
+        for depth in range(self.list_depth):
+            if depth % 2:
+                markers = (u'1. ', u'2. ')
+            else:
+                markers = (u'- ', u'- ')
+            lines.extend([indent + markers[0] + self.text(5), '',
+                          indent + markers[1] + self.text(3) + u' '
+                          + self.inline(), ''])
+            indent += ' ' * len(markers[1])
+        return lines
+
+    def substitutions(self):
+        self.chains += 1
+        return self.wrap([self.text(4), u'|chain%d-0|' % (self.chains - 1),
+                          self.text(2) + u'.']) + ['']
+
+    def includes(self):
+        name = u'include-%d.txt' % self.include_count
+        self.include_count += 1
+        saved = self.notes
+        self.notes = []
+        lines = self.paragraphs() + self.lists()
+        for label in self.notes:
+            lines.extend(['.. [#%s] Footnote.' % label, ''])
+        self.notes = saved
+        self.files[name] = u'\n'.join(lines)
+        return [u'.. include:: %s' % name, '']
+
+    def misc(self):
+        kind = self.integer(0, 3)
+        if kind == 0:
+            return ['::', '', '    ' + self.text(6),
+                    '      ' + self.text(4), '']
+        if kind == 1:
+            return ['.. note:: ' + self.text(6), '']
+        if kind == 2:
+            return [self.text(2), '    ' + self.text(8), '',
+                    self.text(1), '    ' + self.text(5), '']
+        return [u':%s: %s' % (self.text(1), self.text(4)),
+                u':%s: %s' % (self.text(2), self.text(3)), '']
+
+    def definitions(self):
+        """Return the citations and substitution definitions."""
+        lines = []
+        if self.citations:
+            lines.extend([u'Citations', u'=========', ''])
+            for n in range(self.citations):
+                lines.extend([u'.. [CIT%d] %s.' % (n, self.text(5)), ''])
+        for chain in range(self.chains):
+            for i in range(self.chain_length):
+                lines.append(u'.. |chain%d-%d| replace:: %s %s' % (
+                    chain, i, self.text(2),
+                    u'|chain%d-%d|' % (chain, i + 1)
+                    if i + 1 < self.chain_length else u'end'))
+            lines.append('')
+        return lines
+
+
+def parse_weights(value):
+    """Parse "feature[:weight],..." into a dictionary of weights."""
+    weights = dict([(feature, 0) for feature in features])
+    for item in value.split(','):
+        name, sep, weight = item.strip().partition(':')
+        if name not in features:
+            raise argparse.ArgumentTypeError('unknown feature "%s"' % name)
+        weights[name] = float(weight or 1)
+    return weights
+
+def write_files(files, directory):
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    for name, text in files.items():
+        with io.open(os.path.join(directory, name), 'w',
+                     encoding='utf-8') as f:
+            f.write(text)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('directory',
+                        help='output directory (the main document is '
+                        '"%s")' % CorpusGenerator.main_name)
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random seed (default: 0)')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='size factor (default: 1)')
+    parser.add_argument('--sections', type=int, default=20,
+                        help='sections per scale unit (default: 20)')
+    parser.add_argument('--features', type=parse_weights,
+                        help='features to use, with optional weights, '
+                        'e.g. "paragraphs:2,tables" (default: all, '
+                        'weight 1)')
+    parser.add_argument('--inline-density', type=int, default=8,
+                        help='inline constructs per paragraph (default: 8)')
+    parser.add_argument('--table-rows', type=int, default=20,
+                        help='rows per table (default: 20)')
+    parser.add_argument('--table-columns', type=int, default=4,
+                        help='columns per table (default: 4)')
+    parser.add_argument('--list-depth', type=int, default=6,
+                        help='nesting depth of lists (default: 6)')
+    parser.add_argument('--chain-length', type=int, default=10,
+                        help='length of substitution chains (default: 10)')
+    args = parser.parse_args(argv)
+    generator = CorpusGenerator(
+        seed=args.seed, scale=args.scale, sections=args.sections,
+        weights=args.features, inline_density=args.inline_density,
+        table_rows=args.table_rows, table_columns=args.table_columns,
+        list_depth=args.list_depth, chain_length=args.chain_length)
+    write_files(generator.generate(), args.directory)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+A long-running render server: process render requests (JSON objects, one
+per line) from standard input or from clients of a Unix domain socket and
+return the document parts.  See `docutils.server`.
+"""
+
+try:
+    import locale
+    locale.setlocale(locale.LC_ALL, '')
+except:
+    pass
+
+from docutils.server import main
+
+
+if __name__ == '__main__':
+    main()
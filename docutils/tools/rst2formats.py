@@ -0,0 +1,27 @@
+#!/usr/bin/env python
+
+# $Id$
+# Copyright: This module has been placed in the public domain.
+
+"""
+A front end to the Docutils Publisher, reading a reStructuredText source
+once and writing it in several output formats.
+"""
+
+try:
+    import locale
+    locale.setlocale(locale.LC_ALL, '')
+except:
+    pass
+
+from docutils.core import (publish_cmdline_formats,
+                           default_formats_description)
+
+
+description = ('Generates several output formats from a standalone '
+               'reStructuredText source, parsing it only once.  '
+               + default_formats_description)
+
+if __name__ == '__main__':
+    publish_cmdline_formats(config_section='rst2formats application',
+                            description=description)
@@ -20,6 +20,10 @@ Build-HTML Options
                         (separated by colons).  Default: ".svn:CVS"
 --silent                Work silently (no progress messages).  Independent of
                         "--quiet".
+--jobs=<N>, -j <N>      Number of worker processes used to process files in
+                        parallel.
+--manifest=<file>       Keep a build manifest in <file> and skip source files
+                        whose output is up to date (incremental build).
 """
 
 import unittest
@@ -90,6 +94,8 @@ class BuildHtmlTests(unittest.TestCase):
                 os.rmdir(s)
             else:
                 os.remove(s)
+                if os.path.exists(s[:-4] + '.html'):
+                    os.remove(s[:-4] + '.html')
         os.rmdir(self.root)
 
     def test_1(self):
@@ -103,5 +109,68 @@ class BuildHtmlTests(unittest.TestCase):
         self.assertEqual( len(dirs), 1)
         self.assertEqual( files, [])
 
+    def test_jobs(self):
+        opts = ["--jobs=2", "--quiet", self.root]
+        dirs, files = process_and_return_filelist( opts )
+        self.assertEqual(len(dirs), 5)
+        self.assertEqual(len(files), 8)
+        self.assertTrue(os.path.exists(os.path.join(
+            self.root, "_tmp_test_tree/dir2/sub/two.html")))
+
+    def test_manifest(self):
+        manifest = os.path.join(self.root, "manifest.json")
+        opts = ["--manifest=" + manifest, "--quiet",
+                os.path.join(self.root, "_tmp_test_tree/dir2")]
+        def skipped_files(opts):
+            p = Popen([sys.executable, buildhtml_path] + opts,
+                      stdout=PIPE, stderr=STDOUT)
+            output = p.communicate()[0].decode('ascii', 'replace')
+            return [line.split(": ")[-1] for line in output.splitlines()
+                    if "Skipping (up to date)" in line]
+        try:
+            self.assertEqual(skipped_files(opts), [])
+            # second run: nothing changed
+            self.assertEqual(len(skipped_files(opts)), 4)
+            # modified source
+            fd_s = open(os.path.join(self.root,
+                                     "_tmp_test_tree/dir2/sub/one.txt"), "w")
+            fd_s.write("changed")
+            fd_s.close()
+            self.assertEqual(sorted(skipped_files(opts)),
+                             ["one.txt", "two.txt", "two.txt"])
+            # modified settings
+            self.assertEqual(skipped_files(opts + ["--no-toc-backlinks"]), [])
+        finally:
+            os.remove(manifest)
+
+    def test_manifest_record_dependencies(self):
+        manifest = os.path.join(self.root, "manifest.json")
+        dependencies = os.path.join(self.root, "dependencies.out")
+        for jobs in ("1", "2"):
+            opts = ["--manifest=" + manifest, "--quiet", "--jobs=" + jobs,
+                    "--record-dependencies=" + dependencies,
+                    os.path.join(self.root, "_tmp_test_tree/dir1")]
+            try:
+                process_and_return_filelist(opts)
+                fd_s = open(dependencies)
+                recorded = fd_s.read().splitlines()
+                fd_s.close()
+                # the stylesheet is embedded in the output of both files:
+                self.assertEqual(len(recorded), 1)
+                self.assertTrue(recorded[0].endswith(".css"))
+                # second run: the files are skipped, the dependencies
+                # stored in the manifest are recorded
+                os.remove(dependencies)
+                process_and_return_filelist(opts)
+                fd_s = open(dependencies)
+                self.assertEqual(
+                    [os.path.abspath(path)
+                     for path in fd_s.read().splitlines()],
+                    [os.path.abspath(path) for path in recorded])
+                fd_s.close()
+            finally:
+                os.remove(manifest)
+                os.remove(dependencies)
+
 if __name__ == '__main__':
     unittest.main()